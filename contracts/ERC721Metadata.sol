@@ -0,0 +1,31 @@
+// "SPDX-License-Identifier: UNLICENSED"
+
+pragma solidity 0.8.0;
+
+/// @title The external contract that is responsible for generating metadata for the fighters,
+///  it has one function that will return the data as bytes.
+/// @dev Placeholder until the metadata service is defined, returns sample strings for
+///  fighters 1 to 3 and an empty string for every other fighter.
+contract ERC721Metadata {
+    /// @dev Given a token Id, returns a byte array that is supposed to be converted into string.
+    function getMetadata(uint256 _tokenId, string calldata)
+        external
+        pure
+        returns (bytes32[4] memory buffer, uint256 count)
+    {
+        if (_tokenId == 1) {
+            buffer[0] = "Hello World! :D";
+            count = 15;
+        } else if (_tokenId == 2) {
+            buffer[0] = "I would definitely choose a medi";
+            buffer[1] = "um length string.";
+            count = 49;
+        } else if (_tokenId == 3) {
+            buffer[0] = "Lorem ipsum dolor sit amet, mi e";
+            buffer[1] = "st accumsan dapibus augue lorem,";
+            buffer[2] = " tristique vestibulum id, libero";
+            buffer[3] = " suscipit varius sapien aliquam.";
+            count = 128;
+        }
+    }
+}
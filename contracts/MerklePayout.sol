@@ -0,0 +1,69 @@
+// "SPDX-License-Identifier: UNLICENSED"
+
+pragma solidity 0.8.0;
+
+import "@openzeppelin/contracts/utils/cryptography/MerkleProof.sol";
+
+/// @title Pays out a settled election from a single Merkle root.
+/// @dev The payout table (voter refunds and the elected candidate's funds) is computed
+///  off chain by scripts/merkle_payouts.py. The payout replaces the per-address claims of
+///  its source (the Voting contract), so it can only be funded by the source, when the
+///  source hands its balance over and stops paying claims itself. Leaf i is keccak256(abi.encodePacked(i, account, amount)) and pairs are
+///  hashed sorted, as MerkleProof expects. A claim costs the same whatever the size of
+///  the electorate, up to the proof length.
+contract MerklePayout {
+    /// @notice Root of the payout table.
+    bytes32 public immutable merkleRoot;
+
+    /// @notice Contract whose claims this payout takes over, the only one that can fund it.
+    address public immutable source;
+
+    // One bit per entry of the table, set once it has been paid.
+    mapping(uint256 => uint256) private claimedBitMap;
+
+    /// @dev Emitted when an entry of the table has been paid.
+    event Claimed(uint256 index, address account, uint256 amount);
+
+    /// @param _merkleRoot Root of the payout table.
+    /// @param _source Contract that funds the payout when it hands its claims over.
+    constructor(bytes32 _merkleRoot, address _source) {
+        merkleRoot = _merkleRoot;
+        source = _source;
+    }
+
+    /// @dev A second, independently funded copy of the claims could pay every entry twice.
+    receive() external payable {
+        require(msg.sender == source, "Only the source funds the payout");
+    }
+
+    /// @notice Whether the entry at index has already been paid.
+    function isClaimed(uint256 _index) public view returns (bool) {
+        uint256 word = claimedBitMap[_index / 256];
+        uint256 mask = 1 << (_index % 256);
+        return word & mask == mask;
+    }
+
+    /// @notice Pays the entry at index to its account.
+    /// @dev Anyone can submit a claim, the amount always goes to the account of the entry.
+    /// @param _index Position of the entry in the table.
+    /// @param _account Account the entry pays.
+    /// @param _amount Amount of the entry, in wei.
+    /// @param _merkleProof Sibling hashes from the leaf up to the root.
+    function claim(
+        uint256 _index,
+        address payable _account,
+        uint256 _amount,
+        bytes32[] calldata _merkleProof
+    ) external {
+        require(!isClaimed(_index), "Payout already claimed");
+        bytes32 leaf = keccak256(abi.encodePacked(_index, _account, _amount));
+        require(
+            MerkleProof.verify(_merkleProof, merkleRoot, leaf),
+            "Invalid proof"
+        );
+        claimedBitMap[_index / 256] |= 1 << (_index % 256);
+        emit Claimed(_index, _account, _amount);
+        (bool success, ) = _account.call{value: _amount}("");
+        require(success, "Transfer failed");
+    }
+}
@@ -0,0 +1,42 @@
+// "SPDX-License-Identifier: UNLICENSED"
+
+pragma solidity 0.8.0;
+
+/// @title Aggregates many read-only calls into a single eth_call.
+/// @dev Used by scripts/multicall.py to read WSKCore and Voting state in bulk. The
+///  contract holds no state and never writes, it only forwards static calls.
+contract Multicall {
+    struct Call {
+        // The contract to call.
+        address target;
+        // The ABI encoded function selector and arguments.
+        bytes callData;
+    }
+
+    struct Result {
+        // False when the call reverted, in which case returnData holds the revert data.
+        bool success;
+        // The raw ABI encoded return value of the call.
+        bytes returnData;
+    }
+
+    /// @notice Executes every call and returns their raw results, together with the
+    ///  block number they were read at.
+    /// @dev A failing call does not revert the whole batch, it is reported with
+    ///  success set to false so that the client can decide what to do with it.
+    /// @param _calls The calls to execute, in order.
+    function tryAggregate(Call[] calldata _calls)
+        external
+        view
+        returns (uint256 blockNumber, Result[] memory results)
+    {
+        blockNumber = block.number;
+        results = new Result[](_calls.length);
+        for (uint256 i = 0; i < _calls.length; i++) {
+            (bool success, bytes memory returnData) = _calls[i].target.staticcall(
+                _calls[i].callData
+            );
+            results[i] = Result(success, returnData);
+        }
+    }
+}
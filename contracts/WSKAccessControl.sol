@@ -108,7 +108,7 @@ contract WSKAccessControl {
     ///  compromised.
     /// @notice This is public rather than external so it can be called by
     ///  derived contracts.
-    function unpause() public onlyCEO whenPaused {
+    function unpause() public virtual onlyCEO whenPaused {
         // can't unpause if contract was upgraded
         paused = false;
     }
@@ -87,32 +87,31 @@ contract WSKBase is WSKAccessControl {
 
     /// @dev A mapping from fighter IDs to the address that owns them. All cats have
     ///  some valid owner address, even gen0 cats are created with a non-zero owner.
-    mapping(uint256 => address) public kittyIndexToOwner;
+    mapping(uint256 => address) public fighterIndexToOwner;
 
     // @dev A mapping from owner address to count of tokens that address owns.
     //  Used internally inside balanceOf() to resolve ownership count.
     mapping(address => uint256) ownershipTokenCount;
 
+    /// @dev A mapping from owner address to the IDs of the fighters it owns, in no
+    ///  particular order. Kept up to date by _transfer() so that listing the fighters
+    ///  of an owner costs O(balance) instead of a walk over the whole Fighter array.
+    mapping(address => uint256[]) ownedTokens;
+
+    /// @dev A mapping from fighter IDs to their position in the ownedTokens list of
+    ///  their owner, so that a fighter can be removed from that list in O(1).
+    mapping(uint256 => uint256) ownedTokensIndex;
+
     /// @dev A mapping from KittyIDs to an address that has been approved to call
     ///  transferFrom(). Each Fighter can only have one approved address for transfer
     ///  at any time. A zero value means no approval is outstanding.
-    mapping(uint256 => address) public kittyIndexToApproved;
+    mapping(uint256 => address) public fighterIndexToApproved;
 
     /// @dev A mapping from KittyIDs to an address that has been approved to use
     ///  this Fighter for siring via breedWith(). Each Fighter can only have one approved
     ///  address for siring at any time. A zero value means no approval is outstanding.
     mapping(uint256 => address) public sireAllowedToAddress;
 
-    /// @dev The address of the ClockAuction contract that handles sales of Kitties. This
-    ///  same contract handles both peer-to-peer sales as well as the gen0 sales which are
-    ///  initiated every 15 minutes.
-    SaleClockAuction public saleAuction;
-
-    /// @dev The address of a custom ClockAuction subclassed contract that handles siring
-    ///  auctions. Needs to be separate from saleAuction because the actions taken on success
-    ///  after a sales and siring auction are quite different.
-    SiringClockAuction public siringAuction;
-
     /// @dev Assigns ownership of a specific Fighter to an address.
     function _transfer(
         address _from,
@@ -122,77 +121,70 @@ contract WSKBase is WSKAccessControl {
         // Since the number of fighters is capped to 2^32 we can't overflow this
         ownershipTokenCount[_to]++;
         // transfer ownership
-        kittyIndexToOwner[_tokenId] = _to;
+        fighterIndexToOwner[_tokenId] = _to;
         // When creating new fighters _from is 0x0, but we can't account that address.
         if (_from != address(0)) {
             ownershipTokenCount[_from]--;
+            _removeOwnedToken(_from, _tokenId);
             // once the fighter is transferred also clear sire allowances
             delete sireAllowedToAddress[_tokenId];
             // clear any previously approved ownership exchange
-            delete kittyIndexToApproved[_tokenId];
+            delete fighterIndexToApproved[_tokenId];
         }
+        _addOwnedToken(_to, _tokenId);
         // Emit the transfer event.
-        Transfer(_from, _to, _tokenId);
+        emit Transfer(_from, _to, _tokenId);
+    }
+
+    /// @dev Appends a fighter to the list of fighters of its new owner.
+    function _addOwnedToken(address _to, uint256 _tokenId) internal {
+        ownedTokensIndex[_tokenId] = ownedTokens[_to].length;
+        ownedTokens[_to].push(_tokenId);
+    }
+
+    /// @dev Removes a fighter from the list of fighters of its previous owner by
+    ///  moving the last fighter of that list into its place (swap and pop).
+    function _removeOwnedToken(address _from, uint256 _tokenId) internal {
+        uint256 lastIndex = ownedTokens[_from].length - 1;
+        uint256 tokenIndex = ownedTokensIndex[_tokenId];
+
+        if (tokenIndex != lastIndex) {
+            uint256 lastTokenId = ownedTokens[_from][lastIndex];
+            ownedTokens[_from][tokenIndex] = lastTokenId;
+            ownedTokensIndex[lastTokenId] = tokenIndex;
+        }
+
+        ownedTokens[_from].pop();
+        delete ownedTokensIndex[_tokenId];
     }
 
     /// @dev An internal method that creates a new fighter and stores it. This
     ///  method doesn't do any checking and should only be called when the
     ///  input data is known to be valid. Will generate both a Birth event
     ///  and a Transfer event.
-    /// @param _matronId The fighter ID of the matron of this fighter (zero for gen0)
-    /// @param _sireId The fighter ID of the sire of this fighter (zero for gen0)
-    /// @param _generation The generation number of this fighter, must be computed by caller.
     /// @param _genes The fighter's genetic code.
     /// @param _owner The inital owner of this fighter, must be non-zero (except for the unKitty, ID 0)
-    function _createKitty(
-        uint256 _matronId,
-        uint256 _sireId,
-        uint256 _generation,
-        uint256 _genes,
-        address _owner
-    ) internal returns (uint256) {
-        // These requires are not strictly necessary, our calling code should make
-        // sure that these conditions are never broken. However! _createKitty() is already
-        // an expensive call (for storage), and it doesn't hurt to be especially careful
-        // to ensure our data structures are always valid.
-        require(_matronId == uint256(uint32(_matronId)));
-        require(_sireId == uint256(uint32(_sireId)));
-        require(_generation == uint256(uint16(_generation)));
-
-        // New fighter starts with the same cooldown as parent gen/2
-        uint16 cooldownIndex = uint16(_generation / 2);
-        if (cooldownIndex > 13) {
-            cooldownIndex = 13;
-        }
-
-        Fighter memory _fighter = Fighter({
-            genes: _genes,
-            birthTime: uint64(now),
-            cooldownEndBlock: 0,
-            matronId: uint32(_matronId),
-            sireId: uint32(_sireId),
-            siringWithId: 0,
-            cooldownIndex: cooldownIndex,
-            generation: uint16(_generation)
-        });
-        uint256 newFighterId = kitties.push(_fighter) - 1;
-
-        // It's probably never going to happen, 4 billion cats is A LOT, but
+    function _createFighter(uint256 _genes, address _owner)
+        internal
+        returns (uint256)
+    {
+        // New fighters start at level 0 with no fights, their characteristics are
+        // derived from their genes off chain. Only the genes word is written, the
+        // other members of the struct stay zero.
+        fighters.push();
+        uint256 newFighterId = fighters.length - 1;
+        fighters[newFighterId].genes = _genes;
+
+        // It's probably never going to happen, 4 billion fighters is A LOT, but
         // let's just be 100% sure we never let this happen.
         require(newFighterId == uint256(uint32(newFighterId)));
 
         // emit the birth event
-        Birth(
-            _owner,
-            newFighterId,
-            uint256(_fighter.matronId),
-            uint256(_fighter.sireId),
-            _fighter.genes
-        );
+        emit Birth(_owner, newFighterId, _genes);
 
         // This will assign ownership, and also emit the Transfer event as
         // per ERC721 draft
-        _transfer(0, _owner, newFighterId);
+        _transfer(address(0), _owner, newFighterId);
 
         return newFighterId;
     }
@@ -36,7 +36,7 @@ contract WSKCore is WSKMinting {
     // INHERITANCE:
     //       - contract WSKAccessControl 
     //       - contract WSKBase is WSKAccessControl
-    //       - contract WSKOwnership is WSKBase, ERC721
+    //       - contract WSKOwnership is WSKBase
     //       - contract WSKFighting is WSKOwnership
     //       - contract WSKMinting is WSKFighting
     //       - contract WSKCore is WSKMinting
@@ -45,7 +45,7 @@ contract WSKCore is WSKMinting {
     address public newContractAddress;
 
     /// @notice Creates the main World Of Street Kombat smart contract instance.
-    function WSKCore() public {
+    constructor() {
         // Starts paused.
         paused = true;
 
@@ -56,7 +56,7 @@ contract WSKCore is WSKMinting {
         cooAddress = msg.sender;
 
         // start with the mythical fighter 0
-        _createFighter(0, 0, 0, uint256(-1), address(0));
+        _createFighter(type(uint256).max, address(0));
     }
 
     /// @dev Used to mark the smart contract as upgraded, in case there is a serious
@@ -67,7 +67,7 @@ contract WSKCore is WSKMinting {
     /// @param _v2Address new address
     function setNewAddress(address _v2Address) external onlyCEO whenPaused {
         newContractAddress = _v2Address;
-        ContractUpgrade(_v2Address);
+        emit ContractUpgrade(_v2Address);
     }
 
     /// @notice Returns all the relevant information about a specific fighter.
@@ -97,13 +97,12 @@ contract WSKCore is WSKMinting {
         speed = fight.speed;
         strengh = fight.strengh;
     }
-    }
 
     /// @dev Override unpause so it requires the newContractAddress not to be set either, 
     /// (we want to keep the contract paused if it was upgraded)
     /// @notice This is public rather than external so we can call super.unpause
     ///  without using an expensive CALL.
-    function unpause() public onlyCEO whenPaused {
+    function unpause() public override onlyCEO whenPaused {
         require(newContractAddress == address(0));
 
         // Actually unpause the contract.
@@ -112,7 +111,7 @@ contract WSKCore is WSKMinting {
 
     // @dev Allows the CFO to capture the balance available to the contract.
     function withdrawBalance() external onlyCFO {
-        uint256 balance = this.balance;
-        cfoAddress.send(balance);
+        uint256 balance = address(this).balance;
+        payable(cfoAddress).transfer(balance);
     }
 }
\ No newline at end of file
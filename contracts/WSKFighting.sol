@@ -0,0 +1,12 @@
+// "SPDX-License-Identifier: UNLICENSED"
+
+pragma solidity 0.8.0;
+
+import "./WSKOwnership.sol";
+
+/// @title The facet of the World Of Street Kombat core contract that makes fighters fight.
+/// @dev Fights are resolved off chain by scripts/fight_engine.py for now, this facet keeps
+///  their place in the inheritance chain until the fight rules move on chain.
+contract WSKFighting is WSKOwnership {
+
+}
@@ -0,0 +1,77 @@
+// "SPDX-License-Identifier: UNLICENSED"
+
+pragma solidity 0.8.0;
+
+import "./WSKFighting.sol";
+
+/// @title All functions related to creating gen0 fighters.
+/// @dev Up to PROMO_CREATION_LIMIT fighters can be given away as promo fighters, and there is
+///  a hard limit of GEN0_CREATION_LIMIT gen0 fighters whatever way they are created. The batch
+///  functions mint many fighters in one transaction for scripts/bulk_mint.py, each fighter
+///  still gets its own Birth and Transfer events.
+contract WSKMinting is WSKFighting {
+    // Limits the number of fighters the contract owner can ever create.
+    uint256 public constant PROMO_CREATION_LIMIT = 5000;
+    uint256 public constant GEN0_CREATION_LIMIT = 50000;
+
+    // Counts the number of fighters the contract owner has created.
+    uint256 public promoCreatedCount;
+    uint256 public gen0CreatedCount;
+
+    /// @dev We can create promo fighters, up to a limit. Only callable by COO.
+    /// @param _genes the encoded genes of the fighter to be created, any value is accepted
+    /// @param _owner the future owner of the created fighter. Default to contract COO
+    function createPromoFighter(uint256 _genes, address _owner) external onlyCOO {
+        address fighterOwner = _owner;
+        if (fighterOwner == address(0)) {
+            fighterOwner = cooAddress;
+        }
+        require(promoCreatedCount < PROMO_CREATION_LIMIT);
+        require(gen0CreatedCount < GEN0_CREATION_LIMIT);
+
+        promoCreatedCount++;
+        gen0CreatedCount++;
+        _createFighter(_genes, fighterOwner);
+    }
+
+    /// @dev Creates a batch of promo fighters, counted against the promo limit. Only callable
+    ///  by COO. The batch should be sized to fit the block gas limit.
+    /// @param _genes the encoded genes of every fighter to be created
+    /// @param _owners the owner of every fighter, address(0) defaults to the COO
+    function createPromoFighters(uint256[] calldata _genes, address[] calldata _owners)
+        external
+        onlyCOO
+    {
+        require(promoCreatedCount + _genes.length <= PROMO_CREATION_LIMIT);
+        promoCreatedCount += _genes.length;
+        _createGen0Fighters(_genes, _owners);
+    }
+
+    /// @dev Creates a batch of gen0 fighters for their owners, counted against the gen0 limit
+    ///  only. Only callable by COO. The batch should be sized to fit the block gas limit.
+    /// @param _genes the encoded genes of every fighter to be created
+    /// @param _owners the owner of every fighter, address(0) defaults to the COO
+    function createGen0Fighters(uint256[] calldata _genes, address[] calldata _owners)
+        external
+        onlyCOO
+    {
+        _createGen0Fighters(_genes, _owners);
+    }
+
+    function _createGen0Fighters(uint256[] calldata _genes, address[] calldata _owners)
+        internal
+    {
+        require(_genes.length == _owners.length);
+        require(gen0CreatedCount + _genes.length <= GEN0_CREATION_LIMIT);
+        gen0CreatedCount += _genes.length;
+
+        address coo = cooAddress;
+        for (uint256 i = 0; i < _genes.length; i++) {
+            address fighterOwner = _owners[i];
+            if (fighterOwner == address(0)) {
+                fighterOwner = coo;
+            }
+            _createFighter(_genes[i], fighterOwner);
+        }
+    }
+}
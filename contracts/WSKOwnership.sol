@@ -4,14 +4,13 @@ pragma solidity 0.8.0;
 
 import "./WSKBase.sol";
 import "./ERC721Metadata.sol";
-import "@openzeppelin/contracts/token/ERC721/ERC721.sol";
 
 ///  World of Street Kombat org
 /*
 INHERITANCE:
     contract WSKAccessControl 
     contract WSKBase is WSKAccessControl
-    contract WSKOwnership is WSKBase, ERC721
+    contract WSKOwnership is WSKBase
     contract WSKMinting is WSKOwnership
     contract WSKCore is WSKMinting
 
@@ -27,7 +26,13 @@ DEFINITIONS:
 */
 
 /// @title The facet of the Wolrd Of Street Kombat core contract that manages ownership, ERC-721 compliant.
-contract WSKOwnership is WSKBase, ERC721 {
+/// @dev Implements the ERC-721 draft on top of the WSKBase storage rather than inheriting
+///  the OpenZeppelin ERC721, whose own owner and approval storage would shadow ours.
+contract WSKOwnership is WSKBase {
+    /// @dev Approval event as defined in current draft of ERC721. Emitted when an owner
+    ///  grants transfer approval for one of its fighters.
+    event Approval(address owner, address approved, uint256 tokenId);
+
     /// @notice Name and symbol of the non fungible token, as defined in ERC721.
     string public constant name = "WolrdOfStreetKombat";
     string public constant symbol = "WSK";
@@ -96,11 +101,6 @@ contract WSKOwnership is WSKBase, ERC721 {
         // The contract should never own any fighters (except very briefly
         // after a gen0 cat is created and before it goes on auction).
         require(_to != address(this));
-        // Disallow transfers to the auction contracts to prevent accidental
-        // misuse. Auction contracts should only take ownership of fighters
-        // through the allow + transferFrom flow.
-        require(_to != address(saleAuction));
-        require(_to != address(siringAuction));
 
         // You can only send your own cat.
         require(_owns(msg.sender, _tokenId));
@@ -123,7 +123,7 @@ contract WSKOwnership is WSKBase, ERC721 {
         _approve(_tokenId, _to);
 
         // Emit approval event.
-        Approval(msg.sender, _to, _tokenId);
+        emit Approval(msg.sender, _to, _tokenId);
     }
 
     /// @notice Transfer a Fighter owned by another address, for which the calling address
@@ -161,44 +161,51 @@ contract WSKOwnership is WSKBase, ERC721 {
     /// @notice Returns the address currently assigned ownership of a given Fighter.
     /// @dev Required for ERC-721 compliance.
     function ownerOf(uint256 _tokenId) external view returns (address owner) {
-        owner = kittyIndexToOwner[_tokenId];
+        owner = fighterIndexToOwner[_tokenId];
 
         require(owner != address(0));
     }
 
     /// @notice Returns a list of all Fighter IDs assigned to an address.
     /// @param _owner The owner whose fighters we are interested in.
-    /// @dev This method MUST NEVER be called by smart contract code. First, it's fairly
-    ///  expensive (it walks the entire Fighter array looking for cats belonging to owner),
-    ///  but it also returns a dynamic array, which is only supported for web3 calls, and
-    ///  not contract-to-contract calls.
+    /// @dev This method MUST NEVER be called by smart contract code. It returns a
+    ///  dynamic array, which is only supported for web3 calls, and not contract-to-contract
+    ///  calls. The cost is linear in the balance of the owner, not in the total supply.
+    ///  IDs are in no particular order: transfers move the last fighter of the
+    ///  previous owner into the place of the one that left.
     function tokensOfOwner(address _owner)
         external
         view
-        returns (uint256[] ownerTokens)
+        returns (uint256[] memory ownerTokens)
     {
-        uint256 tokenCount = balanceOf(_owner);
+        return ownedTokens[_owner];
+    }
 
-        if (tokenCount == 0) {
-            // Return an empty array
+    /// @notice Returns at most _limit Fighter IDs assigned to an address, starting
+    ///  at position _offset of the list returned by tokensOfOwner(_owner).
+    /// @param _owner The owner whose fighters we are interested in.
+    /// @param _offset Position of the first fighter to return.
+    /// @param _limit Maximum number of fighters to return.
+    /// @dev Pages of the same owner are only consistent with each other when they
+    ///  are read at the same block.
+    function tokensOfOwner(
+        address _owner,
+        uint256 _offset,
+        uint256 _limit
+    ) external view returns (uint256[] memory ownerTokens) {
+        uint256[] storage tokens = ownedTokens[_owner];
+
+        if (_offset >= tokens.length) {
             return new uint256[](0);
-        } else {
-            uint256[] memory result = new uint256[](tokenCount);
-            uint256 totalCats = totalSupply();
-            uint256 resultIndex = 0;
-
-            // We count on the fact that all cats have IDs starting at 1 and increasing
-            // sequentially up to the totalCat count.
-            uint256 IDFighter;
-
-            for (IDFighter = 1; IDFighter <= totalCats; IDFighter++) {
-                if (kittyIndexToOwner[IDFighter] == _owner) {
-                    result[resultIndex] = IDFighter;
-                    resultIndex++;
-                }
-            }
+        }
+        uint256 count = tokens.length - _offset;
+        if (_limit < count) {
+            count = _limit;
+        }
 
-            return result;
+        ownerTokens = new uint256[](count);
+        for (uint256 i = 0; i < count; i++) {
+            ownerTokens[i] = tokens[_offset + i];
         }
     }
 
@@ -209,7 +216,7 @@ contract WSKOwnership is WSKBase, ERC721 {
         uint256 _dest,
         uint256 _src,
         uint256 _len
-    ) private view {
+    ) private pure {
         // Copy word-length chunks while possible
         for (; _len >= 32; _len -= 32) {
             assembly {
@@ -219,8 +226,11 @@ contract WSKOwnership is WSKBase, ERC721 {
             _src += 32;
         }
 
-        // Copy remaining bytes
-        uint256 mask = 256**(32 - _len) - 1;
+        // Copy remaining bytes, 256**32 would overflow when there are none
+        uint256 mask = type(uint256).max;
+        if (_len > 0) {
+            mask = 256**(32 - _len) - 1;
+        }
         assembly {
             let srcpart := and(mload(_src), not(mask))
             let destpart := and(mload(_dest), mask)
@@ -231,12 +241,12 @@ contract WSKOwnership is WSKBase, ERC721 {
     /// @dev Adapted from toString(slice) by @arachnid (Nick Johnson <arachnid@notdot.net>)
     ///  This method is licenced under the Apache License.
     ///  Ref: https://github.com/Arachnid/solidity-stringutils/blob/2f6ca9accb48ae14c66f1437ec50ed19a0616f78/strings.sol
-    function _toString(bytes32[4] _rawBytes, uint256 _stringLength)
+    function _toString(bytes32[4] memory _rawBytes, uint256 _stringLength)
         private
-        view
-        returns (string)
+        pure
+        returns (string memory)
     {
-        string outputString = new string(_stringLength);
+        string memory outputString = new string(_stringLength);
         uint256 outputPtr;
         uint256 bytesPtr;
 
@@ -253,12 +263,12 @@ contract WSKOwnership is WSKBase, ERC721 {
     /// @notice Returns a URI pointing to a metadata package for this token conforming to
     ///  ERC-721 (https://github.com/ethereum/EIPs/issues/721)
     /// @param _tokenId The ID number of the Fighter whose metadata should be returned.
-    function tokenMetadata(uint256 _tokenId, string _preferredTransport)
+    function tokenMetadata(uint256 _tokenId, string calldata _preferredTransport)
         external
         view
-        returns (string infoUrl)
+        returns (string memory infoUrl)
     {
-        require(erc721Metadata != address(0));
+        require(address(erc721Metadata) != address(0));
         bytes32[4] memory buffer;
         uint256 count;
         (buffer, count) = erc721Metadata.getMetadata(
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { ethers } from "ethers";
 
 import { contractABI, contractAddress } from "../utils/constants";
@@ -6,6 +6,7 @@ import { contractABI, contractAddress } from "../utils/constants";
 export const TransactionContext = React.createContext();
 
 const { ethereum } = window;
+const READ_API = import.meta.env.VITE_READ_API_URL;
 
 const createEthereumContract = () => {
   const provider = new ethers.providers.Web3Provider(ethereum);
@@ -21,14 +22,49 @@ export const TransactionsProvider = ({ children }) => {
   const [isLoading, setIsLoading] = useState(false);
   const [transactionCount, setTransactionCount] = useState(localStorage.getItem("transactionCount"));
   const [transactions, setTransactions] = useState([]);
+  const events = useRef(null);
 
   const handleChange = (e, name) => {
     setformData((prevState) => ({ ...prevState, [name]: e.target.value }));
   };
 
+  const structureIndexed = (transaction) => ({
+    addressTo: transaction.addressTo,
+    addressFrom: transaction.addressFrom,
+    timestamp: new Date(transaction.timestamp * 1000).toLocaleString(),
+    message: transaction.message,
+    keyword: transaction.keyword,
+    amount: parseFloat(ethers.utils.formatEther(transaction.amount))
+  });
+
+  const getIndexedTransactions = async () => {
+    // One page from the read API (scripts/read_api.py), newest first
+    const response = await fetch(`${READ_API}/transactions?limit=50`);
+    if (!response.ok) throw new Error(`Read API answered ${response.status}`);
+    const page = await response.json();
+
+    setTransactions(page.items.reverse().map(structureIndexed));
+
+    const lastId = page.items.length ? page.items[page.items.length - 1].id : 0;
+    // One stream at a time, closed again when the provider re-runs its effect or unmounts
+    closeEvents();
+    events.current = new EventSource(`${READ_API}/events?after=${lastId}`);
+    events.current.addEventListener("transaction", (event) => {
+      const transaction = structureIndexed(JSON.parse(event.data));
+      setTransactions((previous) => [...previous, transaction]);
+    });
+  };
+
+  const closeEvents = () => {
+    if (events.current) events.current.close();
+    events.current = null;
+  };
+
   const getAllTransactions = async () => {
     try {
-      if (ethereum) {
+      if (READ_API) {
+        await getIndexedTransactions();
+      } else if (ethereum) {
         const transactionsContract = createEthereumContract();
 
         const availableTransactions = await transactionsContract.getAllTransactions();
@@ -143,6 +179,8 @@ export const TransactionsProvider = ({ children }) => {
   useEffect(() => {
     checkIfWalletIsConnect();
     checkIfTransactionsExists();
+
+    return closeEvents;
   }, [transactionCount]);
 
   return (
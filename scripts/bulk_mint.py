@@ -0,0 +1,313 @@
+import collections
+import csv
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+from brownie import WSKCore, accounts, network, web3
+from scripts.event_indexer import event_topic, scan_logs
+from scripts.genes import from_limbs, random_genes
+from scripts.helpful_scripts import get_account
+from scripts.receipt_tracker import shared_tracker
+from scripts.tx_pipeline import PipelineError, TxPipeline
+
+# Mints gen0 fighters at volume from a file of (genes, owner) records.
+#
+#   brownie run scripts/bulk_mint.py main fighters.csv     # or resume it
+#   brownie run scripts/bulk_mint.py main                  # 2000 random records
+#
+# Records are read lazily, one "genes,owner" line at a time (genes in decimal
+# or 0x hex, an empty owner means the COO), and sent through
+# createGen0Fighters (createPromoFighters with promo=True) in batches sized
+# from a gas estimate to stay under `max_gas`. `window` batches are broadcast
+# back to back through the TxPipeline and their receipts resolved by the
+# shared ReceiptTracker before the next window goes out.
+#
+# Progress is kept per network, WSKCore address and record file in
+# reports/bulk_mint_state.json, written before anything is sent: the ranges of
+# records known to be minted, and the batches of the window on the way. Once
+# a window is back its mined batches join the minted ranges. Nothing more is
+# sent after a batch fails; the run stops with the PipelineError and a restart
+# sends the records that are not minted, wherever they are in the file.
+#
+# When a run is interrupted with a window on the way, the restart waits for
+# its transactions to leave the pending pool, then looks for the Birth events
+# of each of its batches from the block the window went out: a batch whose
+# fighters were born is minted, any other one is sent again. Fighters per
+# second and gas per fighter go to reports/bulk_mint.json.
+
+STATE_PATH = os.path.join("reports", "bulk_mint_state.json")
+REPORT_PATH = os.path.join("reports", "bulk_mint.json")
+MAX_GAS = 10_000_000
+WINDOW = 4
+# Fighters in the batch used to estimate the gas per fighter
+PROBE_SIZE = 10
+PENDING_POLL = 1
+
+
+def read_records(path):
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().lower() == "genes":
+                continue
+            owner = row[1].strip() if len(row) > 1 else ""
+            yield int(row[0], 0), owner or "0x0000000000000000000000000000000000000000"
+
+
+def write_records(path, count, owners, seed=0):
+    rng = np.random.default_rng(seed)
+    owners = itertools.cycle(str(owner) for owner in owners)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["genes", "owner"])
+        for genes in from_limbs(random_genes(count, rng)):
+            writer.writerow([hex(genes), next(owners)])
+
+
+def chunks(records, size):
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def batch_size(method, records, sender, max_gas):
+    # Fighters per batch under max_gas, from the gas of 1 and of PROBE_SIZE
+    # fighters. Estimated with the records that are minted first.
+    genes, owners = zip(*records[:PROBE_SIZE])
+    one = method.estimate_gas(genes[:1], owners[:1], {"from": sender})
+    if len(genes) == 1:
+        return max(1, max_gas // one)
+    many = method.estimate_gas(genes, owners, {"from": sender})
+    per_fighter = max(1, (many - one) // (len(genes) - 1))
+    return max(1, (max_gas - (one - per_fighter)) // per_fighter)
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(states):
+    os.makedirs("reports", exist_ok=True)
+    with open(STATE_PATH, "w") as f:
+        json.dump(states, f, indent=2)
+
+
+def state_key(core, path):
+    return f"{network.show_active()}:{core.address}:{os.path.abspath(path)}"
+
+
+def covered(ranges, index):
+    return any(start <= index < end for start, end in ranges)
+
+
+def add_range(ranges, indices):
+    # Merges the record indices into the sorted list of [start, end) ranges
+    merged = []
+    for start, end in sorted(ranges + [[i, i + 1] for i in indices]):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def wait_for_pending(sender):
+    # Transactions of an interrupted run can still be mined, wait for them
+    address = str(sender)
+    while web3.eth.get_transaction_count(address, "pending") > (
+        web3.eth.get_transaction_count(address)
+    ):
+        time.sleep(PENDING_POLL)
+
+
+def born_batches(core, batches, from_block):
+    # Which of the batches (lists of (genes, owner) records) have their
+    # fighters born in a single transaction since from_block
+    births = {}
+    birth = web3.eth.contract(address=str(core.address), abi=core.abi).events.Birth()
+    head = web3.eth.block_number
+    for _, _, logs in scan_logs(
+        core.address, [event_topic(core, "Birth")], from_block, head
+    ):
+        for log in logs:
+            args = birth.processLog(log).args
+            fighters = births.setdefault(log["transactionHash"].hex(), [])
+            fighters.append((args.genes, str(args.owner).lower()))
+    coo = str(core.cooAddress()).lower()
+    unclaimed = list(births.values())
+    born = []
+    for batch in batches:
+        expected = [
+            (genes, coo if int(str(owner), 16) == 0 else str(owner).lower())
+            for genes, owner in batch
+        ]
+        match = next((b for b in unclaimed if b == expected), None)
+        if match is not None:
+            unclaimed.remove(match)
+        born.append(match is not None)
+    return born
+
+
+def outcome(pipeline, name):
+    # True when the batch was mined, False when it certainly was not (never
+    # broadcast or reverted), None when its receipt never came back
+    step = pipeline.step(name)
+    if step.error is None:
+        return True
+    if step.receipt is None or step.receipt.status == 0:
+        return False
+    return None
+
+
+def mint(
+    core,
+    records,
+    sender,
+    promo=False,
+    max_gas=MAX_GAS,
+    window=WINDOW,
+    sending=None,
+    checkpoint=None,
+):
+    # Mints the records, returns (fighters minted, gas used, batches sent).
+    # sending(batches) is called before a window is broadcast and
+    # checkpoint(batches, outcomes, gas) once it is back. After a window with
+    # a batch that was not mined nothing more is sent and the PipelineError
+    # is raised.
+    method = core.createPromoFighters if promo else core.createGen0Fighters
+    records = iter(records)
+    probe = list(itertools.islice(records, PROBE_SIZE))
+    if not probe:
+        return 0, 0, 0
+    size = batch_size(method, probe, sender, max_gas)
+    pipeline = TxPipeline(gas_limit=max_gas, tracker=shared_tracker())
+    minted = gas = sent = 0
+    batches = chunks(itertools.chain(probe, records), size)
+    for group in chunks(batches, window):
+        if sending is not None:
+            sending(group)
+        names = []
+        for batch in group:
+            genes, owners = zip(*batch)
+            names.append(
+                pipeline.call(method, list(genes), list(owners), sender=sender)
+            )
+        failure = None
+        try:
+            pipeline.run()
+        except PipelineError as error:
+            failure = error
+        outcomes = [outcome(pipeline, name) for name in names]
+        window_gas = 0
+        for name, batch, mined in zip(names, group, outcomes):
+            if mined:
+                minted += len(batch)
+                window_gas += pipeline.receipt(name).gas_used
+        gas += window_gas
+        sent += len(group)
+        if checkpoint is not None:
+            checkpoint(group, outcomes, window_gas)
+        if failure is not None:
+            raise failure
+    return minted, gas, sent
+
+
+def main(path=None, promo=False, max_gas=MAX_GAS, window=WINDOW):
+    sender = get_account()
+    promo = promo in (True, "true", "promo")
+    core = WSKCore[-1]
+    if path is None:
+        path = os.path.join("reports", "bulk_mint_records.csv")
+        if not os.path.exists(path):
+            os.makedirs("reports", exist_ok=True)
+            write_records(path, 2000, accounts[:10])
+
+    states = load_state()
+    key = state_key(core, path)
+    state = states.setdefault(key, {"minted": [], "sent": [], "gas": 0})
+    save_state(states)
+    wait_for_pending(sender)
+    if state["sent"]:
+        # The window of an interrupted run, see which of its batches were mined
+        wanted = {i for batch in state["sent"] for i in batch}
+        records = {
+            i: record for i, record in enumerate(read_records(path)) if i in wanted
+        }
+        batches = [[records[i] for i in batch] for batch in state["sent"]]
+        for batch, born in zip(
+            state["sent"], born_batches(core, batches, state["from_block"])
+        ):
+            if born:
+                state["minted"] = add_range(state["minted"], batch)
+        state["sent"] = []
+        save_state(states)
+    done = sum(end - start for start, end in state["minted"])
+    if done:
+        print(f"Resuming after {done} fighters minted from {path}")
+
+    # Record indices in the order mint() draws the records, to name the batches
+    indices = collections.deque()
+
+    def remaining():
+        for index, record in enumerate(read_records(path)):
+            if not covered(state["minted"], index):
+                indices.append(index)
+                yield record
+
+    def sending(batches):
+        state["sent"] = [[indices.popleft() for _ in batch] for batch in batches]
+        state["from_block"] = web3.eth.block_number
+        save_state(states)
+
+    def checkpoint(batches, outcomes, gas):
+        unknown = []
+        for batch, mined in zip(state["sent"], outcomes):
+            if mined:
+                state["minted"] = add_range(state["minted"], batch)
+            elif mined is None:
+                unknown.append(batch)
+        state["sent"] = unknown
+        state["gas"] += gas
+        save_state(states)
+
+    start = time.perf_counter()
+    minted, gas, sent = mint(
+        core,
+        remaining(),
+        sender,
+        promo,
+        int(max_gas),
+        int(window),
+        sending,
+        checkpoint,
+    )
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "network": network.show_active(),
+        "core": core.address,
+        "source": path,
+        "fighters": minted,
+        "batches": sent,
+        "elapsed": round(elapsed, 3),
+        "fighters_per_second": round(minted / elapsed, 1) if minted else 0,
+        "gas_per_fighter": gas // minted if minted else None,
+        "total_supply": core.totalSupply(),
+    }
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(
+        f"Minted {minted} fighters in {sent} batches, {elapsed:.1f}s, "
+        f"{report['fighters_per_second']} fighters/s, "
+        f"{report['gas_per_fighter']} gas per fighter"
+    )
+    return report
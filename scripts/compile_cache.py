@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import yaml
+from brownie import project
+
+# Content-addressed compile cache in front of the brownie project load, and
+# lazy access to the contract containers.
+#
+#   from scripts.compile_cache import WSKCore   # nothing is loaded yet
+#   WSKCore.deploy({"from": account})           # loads the project here
+#
+# Every source in contracts/ is keyed by the hash of its own content, of every
+# file it imports (transitively, @-remapped imports resolved in the brownie
+# packages folder, so a dependency bump changes the key) and of the compiler
+# settings and dependencies of brownie-config.yaml. After a compilation the
+# build artifacts of every source are stored under its key in STORE, and the
+# keys and artifacts of the build folder are listed in
+# build/compile_cache.json.
+#
+# On load, a source whose key matches the manifest is up to date. A stale one
+# is restored from STORE when that key was compiled before (a branch switch,
+# a reverted edit, an empty build folder), without running the compiler. When
+# every source is up to date the project is loaded from its artifacts with
+# compile=False. Otherwise the artifacts of the sources that are still stale
+# are removed, so that brownie recompiles them and their dependents, and only
+# them, even for changes brownie does not see itself (remappings, sources of
+# the dependencies).
+#
+# Inside `brownie run` and `brownie test` the project is already loaded and
+# the containers are returned as they are. WSK_COMPILE_CACHE moves STORE.
+
+MANIFEST = os.path.join("build", "compile_cache.json")
+STORE = os.environ.get(
+    "WSK_COMPILE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".brownie", "wsk_compile_cache"),
+)
+PACKAGES = os.path.join(os.path.expanduser("~"), ".brownie", "packages")
+IMPORT_PATTERN = re.compile(
+    r"""^\s*import\s+(?:[^"']*from\s+)?["']([^"']+)["']""", re.M
+)
+CONTRACT_PATTERN = re.compile(r"^(?:abstract\s+)?(?:contract|library)\s+(\w+)", re.M)
+
+
+def _read_config(path):
+    config_path = os.path.join(path, "brownie-config.yaml")
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path) as f:
+        return yaml.safe_load(f) or {}
+
+
+def compiler_settings(path="."):
+    config = _read_config(path)
+    return {
+        "compiler": config.get("compiler", {}),
+        "dependencies": config.get("dependencies", []),
+    }
+
+
+def _remappings(path):
+    remappings = {}
+    solc = compiler_settings(path)["compiler"].get("solc", {})
+    for remapping in solc.get("remappings", []):
+        prefix, target = remapping.split("=", 1)
+        remappings[prefix] = os.path.join(PACKAGES, target)
+    return remappings
+
+
+def _resolve(source_path, target, remappings):
+    for prefix, folder in remappings.items():
+        if target.startswith(prefix):
+            return os.path.normpath(folder + target[len(prefix) :])
+    return os.path.normpath(os.path.join(os.path.dirname(source_path), target))
+
+
+def _sources(path):
+    contracts = os.path.join(path, "contracts")
+    return sorted(
+        os.path.normpath(os.path.join(root, name))
+        for root, _, names in os.walk(contracts)
+        for name in names
+        if name.endswith((".sol", ".vy"))
+    )
+
+
+def contract_names(path="."):
+    names = set()
+    for source in _sources(path):
+        with open(source) as f:
+            names.update(CONTRACT_PATTERN.findall(f.read()))
+    return names
+
+
+def import_graph(path="."):
+    # {source file: [imported files]} for contracts/ and everything they
+    # import. Imports that cannot be found are kept as they are, their hash
+    # is the hash of nothing and the compiler reports them.
+    remappings = _remappings(path)
+    todo = _sources(path)
+    graph = {}
+    while todo:
+        source = todo.pop()
+        if source in graph:
+            continue
+        graph[source] = []
+        if not os.path.exists(source):
+            continue
+        with open(source) as f:
+            for target in IMPORT_PATTERN.findall(f.read()):
+                resolved = _resolve(source, target, remappings)
+                graph[source].append(resolved)
+                todo.append(resolved)
+    return graph
+
+
+def _file_hash(source):
+    if not os.path.exists(source):
+        return ""
+    with open(source, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def content_hashes(path="."):
+    # {contract source: hash of its import closure and the compiler settings}
+    graph = import_graph(path)
+    files = {source: _file_hash(source) for source in graph}
+    settings = json.dumps(compiler_settings(path), sort_keys=True)
+    hashes = {}
+    for source in _sources(path):
+        closure, todo = set(), [source]
+        while todo:
+            current = todo.pop()
+            if current not in closure:
+                closure.add(current)
+                todo.extend(graph[current])
+        digest = hashlib.sha256(settings.encode())
+        for member in sorted(closure):
+            digest.update(f"{os.path.relpath(member, path)}:{files[member]}".encode())
+        hashes[os.path.relpath(source, path)] = digest.hexdigest()
+    return hashes
+
+
+def _load_manifest(path):
+    manifest = os.path.join(path, MANIFEST)
+    if not os.path.exists(manifest):
+        return {}
+    with open(manifest) as f:
+        return json.load(f)
+
+
+def _save_manifest(path, manifest):
+    with open(os.path.join(path, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _built(path, entry):
+    build = os.path.join(path, "build")
+    return all(os.path.exists(os.path.join(build, a)) for a in entry["artifacts"])
+
+
+def stale_contracts(path=".", hashes=None):
+    hashes = hashes or content_hashes(path)
+    manifest = _load_manifest(path)
+    return sorted(
+        source
+        for source, key in hashes.items()
+        if source not in manifest
+        or manifest[source]["key"] != key
+        or not _built(path, manifest[source])
+    )
+
+
+def build_artifacts(path="."):
+    # {contract source: artifacts of build/ it produced, the artifacts of the
+    # dependencies it pulled in included}
+    build = os.path.join(path, "build")
+    artifacts = {}
+    for name in sorted(os.listdir(os.path.join(build, "contracts"))):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(build, "contracts", name)) as f:
+            data = json.load(f)
+        files = artifacts.setdefault(data["sourcePath"], [])
+        files.append(f"contracts/{name}")
+        for dependency in data.get("dependencies", []):
+            alias = f"contracts/dependencies/{dependency}.json"
+            if os.path.exists(os.path.join(build, alias)) and alias not in files:
+                files.append(alias)
+    return artifacts
+
+
+def _store(path, key, files):
+    entry = os.path.join(STORE, key)
+    if os.path.isdir(entry):
+        return
+    os.makedirs(STORE, exist_ok=True)
+    # written aside and renamed, a concurrent reader never sees half an entry
+    staging = tempfile.mkdtemp(dir=STORE)
+    for name in files:
+        target = os.path.join(staging, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(os.path.join(path, "build", name), target)
+    try:
+        os.rename(staging, entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _restore(path, key):
+    entry = os.path.join(STORE, key)
+    if not os.path.isdir(entry):
+        return None
+    files = []
+    for root, _, names in os.walk(entry):
+        for name in names:
+            files.append(os.path.relpath(os.path.join(root, name), entry))
+    for name in files:
+        target = os.path.join(path, "build", name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(os.path.join(entry, name), target)
+    return sorted(files)
+
+
+def load_project(path="."):
+    # The loaded project, loading it when needed. Returns the project and the
+    # contract sources that had to be compiled.
+    loaded = project.get_loaded_projects()
+    if loaded:
+        return loaded[0], []
+    hashes = content_hashes(path)
+    manifest = _load_manifest(path)
+    compiled = []
+    for source in stale_contracts(path, hashes):
+        files = _restore(path, hashes[source])
+        if files is None:
+            compiled.append(source)
+        else:
+            manifest[source] = {"key": hashes[source], "artifacts": files}
+    if not compiled:
+        _save_manifest(path, manifest)
+        return project.load(path, compile=False), []
+
+    for source in compiled:
+        for name in manifest.pop(source, {}).get("artifacts", []):
+            artifact = os.path.join(path, "build", name)
+            if os.path.exists(artifact):
+                os.remove(artifact)
+    loaded = project.load(path)
+    artifacts = build_artifacts(path)
+    for source, key in hashes.items():
+        files = artifacts.get(source.replace(os.sep, "/"), [])
+        _store(path, key, files)
+        manifest[source] = {"key": key, "artifacts": files}
+    _save_manifest(path, manifest)
+    return loaded, compiled
+
+
+class LazyContainer:
+    # Stands for a contract container until it is first used, the project is
+    # loaded (through the cache) at that point and not before.
+    def __init__(self, name, path="."):
+        self._name = name
+        self._path = path
+        self._container = None
+
+    def _load(self):
+        if self._container is None:
+            containers = load_project(self._path)[0].dict()
+            if self._name not in containers:
+                raise AttributeError(f"No contract named {self._name} in the project")
+            self._container = containers[self._name]
+        return self._container
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __len__(self):
+        return len(self._load())
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __repr__(self):
+        if self._container is None:
+            return f"<LazyContainer '{self._name}' (not loaded)>"
+        return repr(self._container)
+
+
+def __getattr__(name):
+    # `from scripts.compile_cache import WSKCore` does not load anything yet
+    if name.startswith("__") or name not in contract_names():
+        raise AttributeError(name)
+    return LazyContainer(name)
+
+
+def main():
+    start = time.perf_counter()
+    hashes = content_hashes()
+    stale = stale_contracts(hashes=hashes)
+    elapsed = time.perf_counter() - start
+    print(f"Hashed {len(hashes)} contracts in {elapsed * 1000:.1f}ms")
+    for source in stale:
+        stored = os.path.isdir(os.path.join(STORE, hashes[source]))
+        print(f"  {'restorable' if stored else 'needs compiling'}: {source}")
+    if not stale:
+        print("Every contract is up to date")
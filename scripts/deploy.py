@@ -1,5 +1,7 @@
 from brownie import Voting, network, config, accounts
 from scripts.helpful_scripts import get_account
+from scripts.receipt_tracker import shared_tracker
+from scripts.tx_pipeline import TxPipeline
 from web3 import Web3
 
 
@@ -13,8 +15,9 @@ def deploy():
     voting = Voting.deploy({"from": account})
     print(f"Contract deployed to {voting.address}")
 
-    transaction = voting.startVotingPeriod(1, {"from": account})
-    transaction.wait(1)
+    pipeline = TxPipeline()
+    pipeline.call(voting.startVotingPeriod, 1, sender=account)
+    pipeline.run()
     print(f"The voting has started")
 
 
@@ -22,17 +25,18 @@ def test():
 
     voting = Voting[-1]
     account = get_account()
+    pipeline = TxPipeline()
 
     # Candidates running
     # name = ("Michel").encode("utf-8")  # convert to bytes32
     name = "Michel"
-    transaction = voting.runAsCandidate(name, {"from": account})
-    transaction.wait(1)
-    print(f"{account} ({name}) is running for candidate")
+    running = pipeline.call(voting.runAsCandidate, name, sender=account)
 
     # Voting
-    transaction = voting.vote(account, {"from": account})
-    transaction.wait(1)
+    pipeline.call(voting.vote, account, sender=account, after=[running])
+
+    pipeline.run()
+    print(f"{account} ({name}) is running for candidate")
     print(f"{account} voted for {account}")
 
 
@@ -41,20 +45,53 @@ def test2():
     voting = Voting[-1]
     account = get_account()
     amount = Web3.toWei("0.003", "ether")
+    pipeline = TxPipeline()
 
     # Funding
-    transaction = voting.fund(account, {"from": account, "amount": amount})
-    transaction.wait(1)
-    print(f"{account} funded {account} for {account} ether")
+    funding = pipeline.call(voting.fund, account, sender=account, value=amount)
 
     # Election
-    transaction = voting.electCandidate({"from": account})
-    transaction.wait(1)
+    pipeline.call(voting.electCandidate, sender=account, after=[funding])
+
+    pipeline.run()
+    print(f"{account} funded {account} for {account} ether")
     print(f"{voting.electedCandidate()} has been elected!!!")
 
     return voting
 
 
+def seed(number_of_candidates=3):
+    # Seeds a fresh election from the local accounts: every independent call is
+    # sent back-to-back and only the ordering below is enforced.
+    #   startVotingPeriod -> runAsCandidate -> vote -> fund
+    account = get_account()
+    amount = Web3.toWei("0.01", "ether")
+    voting = Voting.deploy({"from": account})
+    print(f"Contract deployed to {voting.address}")
+
+    pipeline = TxPipeline(tracker=shared_tracker())
+    start = pipeline.call(voting.startVotingPeriod, 1, sender=account)
+
+    candidates = accounts[1 : int(number_of_candidates) + 1]
+    voters = accounts[int(number_of_candidates) + 1 :]
+    running = {}
+    for candidate in candidates:
+        running[candidate] = pipeline.call(
+            voting.runAsCandidate, f"{candidate}"[:8], sender=candidate, after=[start]
+        )
+
+    for i, voter in enumerate(voters):
+        candidate = candidates[i % len(candidates)]
+        voted = pipeline.call(
+            voting.vote, candidate, sender=voter, after=[running[candidate]]
+        )
+        pipeline.call(voting.fund, candidate, sender=voter, value=amount, after=[voted])
+
+    pipeline.run()
+    print(f"{len(candidates)} candidates and {len(voters)} voters seeded")
+    return voting
+
+
 def main():
     # deploy()
     # test()
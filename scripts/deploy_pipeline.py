@@ -0,0 +1,272 @@
+import json
+import os
+import time
+
+from brownie import accounts, network, project
+from scripts.helpful_scripts import get_account
+from scripts.tx_pipeline import PipelineError, TxPipeline
+
+# Brings up WSKCore and its sibling contracts as a graph of deployment and
+# configuration steps. Every step waits only for the steps it needs, so
+# independent deployments and setters are broadcast together by TxPipeline.
+#
+#   brownie run scripts/deploy_pipeline.py main                  # or resume
+#   brownie run scripts/deploy_pipeline.py main 0xCFO 0xCOO 0xCEO
+#
+# Confirmed steps are recorded per network in reports/deploy_state.json, and a
+# run after a failure or an interruption resumes from there with the
+# contracts already deployed.
+# Steps are grouped in stages (deploy, configure, launch, handover) for the
+# report in reports/deploy_pipeline.json, which has the time and gas of every
+# stage. A step is skipped when the contract or setter it needs is not part of
+# the project yet, along with the steps that depend on it. The CEO is handed
+# over last because every other setter is CEO-only.
+
+STATE_PATH = os.path.join("reports", "deploy_state.json")
+REPORT_PATH = os.path.join("reports", "deploy_pipeline.json")
+
+STAGES = ["deploy", "configure", "launch", "handover"]
+# Share of the auction price kept by the auctions, in basis points
+AUCTION_CUT = 375
+SECONDS_PER_BLOCK = 12
+
+
+def containers():
+    return project.get_loaded_projects()[0].dict()
+
+
+def available(requirement):
+    # "Contract" or "Contract.method"
+    name, _, method = requirement.partition(".")
+    container = containers().get(name)
+    return container is not None and (not method or method in container.signatures)
+
+
+def plan(roles, seconds_per_block):
+    # name: (stage, dependencies, requirements, call). A call receives the
+    # deployment and returns the function to send with its arguments. Steps
+    # without dependencies (None) come after every step of the earlier stages.
+    def deploy(name, *args):
+        return lambda d: (containers()[name].deploy, [arg(d) for arg in args])
+
+    def core_call(method, *args):
+        return lambda d: (getattr(d["WSKCore"], method), [arg(d) for arg in args])
+
+    def value(x):
+        return lambda d: x
+
+    def address(name):
+        return lambda d: d[name].address
+
+    steps = {
+        "WSKCore": ("deploy", [], ["WSKCore"], deploy("WSKCore")),
+        "ERC721Metadata": ("deploy", [], ["ERC721Metadata"], deploy("ERC721Metadata")),
+        "SaleClockAuction": (
+            "deploy",
+            ["WSKCore"],
+            ["SaleClockAuction"],
+            deploy("SaleClockAuction", address("WSKCore"), value(AUCTION_CUT)),
+        ),
+        "SiringClockAuction": (
+            "deploy",
+            ["WSKCore"],
+            ["SiringClockAuction"],
+            deploy("SiringClockAuction", address("WSKCore"), value(AUCTION_CUT)),
+        ),
+        "setCFO": (
+            "configure",
+            ["WSKCore"],
+            ["WSKCore.setCFO"],
+            core_call("setCFO", value(roles["cfo"])),
+        ),
+        "setCOO": (
+            "configure",
+            ["WSKCore"],
+            ["WSKCore.setCOO"],
+            core_call("setCOO", value(roles["coo"])),
+        ),
+        "setMetadataAddress": (
+            "configure",
+            ["WSKCore", "ERC721Metadata"],
+            ["WSKCore.setMetadataAddress"],
+            core_call("setMetadataAddress", address("ERC721Metadata")),
+        ),
+        "setSaleAuctionAddress": (
+            "configure",
+            ["WSKCore", "SaleClockAuction"],
+            ["WSKCore.setSaleAuctionAddress"],
+            core_call("setSaleAuctionAddress", address("SaleClockAuction")),
+        ),
+        "setSiringAuctionAddress": (
+            "configure",
+            ["WSKCore", "SiringClockAuction"],
+            ["WSKCore.setSiringAuctionAddress"],
+            core_call("setSiringAuctionAddress", address("SiringClockAuction")),
+        ),
+        "setSecondsPerBlock": (
+            "configure",
+            ["WSKCore"],
+            ["WSKCore.setSecondsPerBlock"],
+            core_call("setSecondsPerBlock", value(seconds_per_block)),
+        ),
+        "unpause": ("launch", None, ["WSKCore.unpause"], core_call("unpause")),
+        "setCEO": (
+            "handover",
+            None,
+            ["WSKCore.setCEO"],
+            core_call("setCEO", value(roles["ceo"])),
+        ),
+    }
+    # The deployer already holds these roles.
+    for role, step in [("coo", "setCOO"), ("ceo", "setCEO")]:
+        if roles[role] == roles["deployer"]:
+            del steps[step]
+    return steps
+
+
+def resolve(steps):
+    # Drops the steps that cannot run in this project and fills in the
+    # dependencies of the stage-level steps.
+    kept, skipped = {}, {}
+    for name, (stage, after, requirements, call) in steps.items():
+        missing = [r for r in requirements if not available(r)]
+        missing += [d for d in after or [] if d not in kept]
+        if missing:
+            skipped[name] = missing
+            continue
+        if after is None:
+            earlier = STAGES[: STAGES.index(stage)]
+            after = [n for n, step in kept.items() if step[0] in earlier]
+        kept[name] = (stage, after, call)
+    return kept, skipped
+
+
+class Deployment:
+    # Contracts deployed by the pipeline or by a previous run, by step name.
+    def __init__(self, state, pipeline):
+        self.state = state
+        self.pipeline = pipeline
+
+    def __getitem__(self, name):
+        address = self.state["steps"].get(name, {}).get("address")
+        if address is None:
+            address = self.pipeline.receipt(name).contract_address
+        return containers()[name].at(address)
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(states):
+    os.makedirs("reports", exist_ok=True)
+    with open(STATE_PATH, "w") as f:
+        json.dump(states, f, indent=2)
+
+
+def build_report(steps, pipeline, state, pending, skipped, elapsed):
+    report = {"elapsed": round(elapsed, 3), "stages": {}, "skipped": skipped}
+    for stage in STAGES:
+        names = [name for name in pending if steps[name][0] == stage]
+        sent = [pipeline.step(n).sent_at for n in names if pipeline.step(n).sent_at]
+        confirmed = [
+            pipeline.step(n).confirmed_at
+            for n in names
+            if pipeline.step(n).confirmed_at
+        ]
+        report["stages"][stage] = {
+            "steps": names,
+            "seconds": round(max(confirmed) - min(sent), 3) if confirmed else 0,
+            "gas": sum(state["steps"].get(n, {}).get("gas_used", 0) for n in names),
+        }
+    report["resumed"] = [name for name in steps if name not in pending]
+    report["gas"] = sum(stage["gas"] for stage in report["stages"].values())
+    return report
+
+
+def run(roles, seconds_per_block=SECONDS_PER_BLOCK):
+    states = load_state()
+    # The development chain starts empty on every run, nothing to resume.
+    if network.show_active() == "development":
+        states.pop("development", None)
+    state = states.setdefault(network.show_active(), {"steps": {}})
+    steps, skipped = resolve(plan(roles, seconds_per_block))
+
+    pipeline = TxPipeline()
+    deployment = Deployment(state, pipeline)
+    pending = [name for name in steps if name not in state["steps"]]
+    for name in pending:
+        stage, after, call = steps[name]
+
+        def send(tx, call=call):
+            method, args = call(deployment)
+            return method(*args, tx)
+
+        pipeline.add(
+            roles["deployer"],
+            send,
+            after=[d for d in after if d in pending],
+            name=name,
+        )
+
+    start = time.perf_counter()
+    error = None
+    try:
+        pipeline.run()
+    except PipelineError as e:
+        error = e
+    finally:
+        # Confirmed steps are recorded even when the run is interrupted
+        for name in pending:
+            step = pipeline.step(name)
+            if step.error is None and step.confirmed_at is not None:
+                state["steps"][name] = {
+                    "tx": step.receipt.txid,
+                    "gas_used": step.receipt.gas_used,
+                    "address": step.receipt.contract_address,
+                }
+        save_state(states)
+    elapsed = time.perf_counter() - start
+
+    report = build_report(steps, pipeline, state, pending, skipped, elapsed)
+    if error is not None:
+        report["failed"] = {name: str(e) for name, e in error.failures.items()}
+    return report, error
+
+
+def print_report(report):
+    for stage, result in report["stages"].items():
+        print(
+            f"{stage:<10} {len(result['steps']):>3} steps "
+            f"{result['seconds']:>8.2f}s {result['gas']:>10} gas"
+        )
+    print(f"Total: {report['elapsed']:.2f}s, {report['gas']} gas")
+    if report["resumed"]:
+        print(f"Already done: {', '.join(report['resumed'])}")
+    for name, missing in report["skipped"].items():
+        print(f"Skipped {name}: needs {', '.join(missing)}")
+
+
+def main(cfo=None, coo=None, ceo=None, seconds_per_block=SECONDS_PER_BLOCK):
+    deployer = get_account()
+    if network.show_active() == "development":
+        cfo = cfo or accounts[1]
+        coo = coo or accounts[2]
+    roles = {
+        "deployer": deployer,
+        "cfo": cfo or deployer,
+        "coo": coo or deployer,
+        "ceo": ceo or deployer,
+    }
+    report, error = run(roles, int(seconds_per_block))
+    print_report(report)
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {REPORT_PATH}")
+    if error is not None:
+        raise SystemExit(f"{error}, run again to resume")
+    return report
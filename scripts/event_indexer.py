@@ -0,0 +1,291 @@
+import os
+import sqlite3
+import time
+
+from brownie import WSKCore, web3
+
+# Keeps a local SQLite copy of fighter ownership built from the Birth and
+# Transfer events of WSKBase, so that tokensOfOwner / balanceOf style queries
+# are index lookups instead of a walk over every fighter on chain.
+#
+# Events are streamed block range by block range. After every range the last
+# block is checkpointed together with its hash; when a later sync finds that a
+# stored hash no longer matches the chain, everything above the most recent
+# block that still matches is rolled back and indexed again.
+#
+# A database holds the events of a single WSKCore, opening it for another
+# address raises. By default it is reports/fighters.db.
+
+DB_PATH = os.path.join("reports", "fighters.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fighters (
+    fighter_id INTEGER PRIMARY KEY,
+    owner TEXT,
+    genes TEXT,
+    birth_block INTEGER
+);
+CREATE INDEX IF NOT EXISTS fighters_by_owner ON fighters (owner, fighter_id);
+CREATE TABLE IF NOT EXISTS transfers (
+    block_number INTEGER,
+    log_index INTEGER,
+    from_address TEXT,
+    to_address TEXT,
+    fighter_id INTEGER,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_by_fighter ON transfers (fighter_id, block_number);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    address TEXT PRIMARY KEY,
+    block_number INTEGER
+);
+"""
+
+
+def event_topic(contract, name):
+    abi = next(i for i in contract.abi if i["type"] == "event" and i["name"] == name)
+    signature = ",".join(i["type"] for i in abi["inputs"])
+    return web3.keccak(text=f"{name}({signature})").hex()
+
+
+def scan_logs(address, topics, from_block, to_block, chunk_size=2000):
+    # Yields (start, end, logs) for consecutive block ranges. The range is
+    # halved whenever the node refuses a query for returning too much.
+    start = from_block
+    while start <= to_block:
+        end = min(start + chunk_size - 1, to_block)
+        try:
+            logs = web3.eth.get_logs(
+                {
+                    "address": str(address),
+                    "topics": [topics],
+                    "fromBlock": start,
+                    "toBlock": end,
+                }
+            )
+        except ValueError:
+            if end == start:
+                raise
+            chunk_size = max(1, (end - start + 1) // 2)
+            continue
+        yield start, end, sorted(
+            logs, key=lambda log: (log["blockNumber"], log["logIndex"])
+        )
+        start = end + 1
+
+
+class FighterIndexer:
+    def __init__(
+        self,
+        core,
+        path=DB_PATH,
+        start_block=0,
+        chunk_size=2000,
+        confirmations=2,
+        reorg_depth=64,
+    ):
+        self.core = core
+        self.address = str(core.address)
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+
+        self._events = web3.eth.contract(address=self.address, abi=core.abi).events
+        self._topics = {
+            event_topic(core, "Birth"): self._events.Birth(),
+            event_topic(core, "Transfer"): self._events.Transfer(),
+        }
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        indexed = self.db.execute(
+            "SELECT address FROM checkpoint WHERE lower(address) != ?",
+            (self.address.lower(),),
+        ).fetchone()
+        if indexed is not None:
+            self.db.close()
+            raise ValueError(
+                f"{path} holds the events of {indexed[0]}, not of {self.address}:"
+                " index into another path"
+            )
+
+    # Queries
+
+    def tokens_of_owner(self, owner):
+        rows = self.db.execute(
+            "SELECT fighter_id FROM fighters WHERE owner = ? ORDER BY fighter_id",
+            (str(owner),),
+        )
+        return [row[0] for row in rows]
+
+    def balance_of(self, owner):
+        (count,) = self.db.execute(
+            "SELECT COUNT(*) FROM fighters WHERE owner = ?", (str(owner),)
+        ).fetchone()
+        return count
+
+    def owner_of(self, fighter_id):
+        row = self.db.execute(
+            "SELECT owner FROM fighters WHERE fighter_id = ?", (fighter_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def fighter(self, fighter_id):
+        row = self.db.execute(
+            "SELECT fighter_id, owner, genes, birth_block FROM fighters WHERE fighter_id = ?",
+            (fighter_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "fighter_id": row[0],
+            "owner": row[1],
+            "genes": int(row[2]),
+            "birth_block": row[3],
+        }
+
+    # Indexing
+
+    @property
+    def checkpoint(self):
+        row = self.db.execute(
+            "SELECT block_number FROM checkpoint WHERE address = ?", (self.address,)
+        ).fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def sync(self):
+        self._handle_reorg()
+        head = web3.eth.block_number - self.confirmations
+        indexed = 0
+        for start, end, logs in scan_logs(
+            self.address,
+            list(self._topics),
+            self.checkpoint + 1,
+            head,
+            self.chunk_size,
+        ):
+            with self.db:
+                for log in logs:
+                    self._apply(log)
+                self._save_checkpoint(end)
+            indexed += len(logs)
+        return indexed
+
+    def follow(self, poll_interval=2):
+        while True:
+            indexed = self.sync()
+            if indexed:
+                print(f"Indexed {indexed} events up to block {self.checkpoint}")
+            time.sleep(poll_interval)
+
+    def _apply(self, log):
+        event = self._topics[log["topics"][0].hex()].processLog(log)
+        block_number = log["blockNumber"]
+        self._remember_block(block_number, log["blockHash"].hex())
+        if event.event == "Birth":
+            self.db.execute(
+                "INSERT INTO fighters (fighter_id, genes, birth_block) VALUES (?, ?, ?)"
+                " ON CONFLICT (fighter_id) DO UPDATE SET genes = excluded.genes,"
+                " birth_block = excluded.birth_block",
+                (event.args.fighterId, str(event.args.genes), block_number),
+            )
+        else:
+            self.db.execute(
+                "INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, ?)",
+                (
+                    block_number,
+                    log["logIndex"],
+                    event.args["from"],
+                    event.args.to,
+                    event.args.tokenId,
+                ),
+            )
+            self.db.execute(
+                "INSERT INTO fighters (fighter_id, owner) VALUES (?, ?)"
+                " ON CONFLICT (fighter_id) DO UPDATE SET owner = excluded.owner",
+                (event.args.tokenId, event.args.to),
+            )
+
+    def _remember_block(self, block_number, block_hash):
+        self.db.execute(
+            "INSERT OR REPLACE INTO blocks VALUES (?, ?)", (block_number, block_hash)
+        )
+
+    def _save_checkpoint(self, block_number):
+        if block_number >= 0:
+            self._remember_block(
+                block_number, web3.eth.get_block(block_number)["hash"].hex()
+            )
+        self.db.execute(
+            "INSERT OR REPLACE INTO checkpoint VALUES (?, ?)",
+            (self.address, block_number),
+        )
+        # Hashes further back than any reorg we expect to see are not needed.
+        self.db.execute(
+            "DELETE FROM blocks WHERE block_number < ?",
+            (block_number - self.reorg_depth,),
+        )
+
+    def _handle_reorg(self):
+        stored = self.db.execute(
+            "SELECT block_number, block_hash FROM blocks ORDER BY block_number DESC"
+        ).fetchall()
+        for block_number, block_hash in stored:
+            block = web3.eth.get_block(block_number)
+            if block["hash"].hex() == block_hash:
+                if block_number < self.checkpoint:
+                    self._rollback(block_number)
+                return
+        if stored:
+            self._rollback(self.start_block - 1)
+
+    def _rollback(self, block_number):
+        print(f"Chain reorganisation detected, rolling back to block {block_number}")
+        with self.db:
+            affected = [
+                row[0]
+                for row in self.db.execute(
+                    "SELECT DISTINCT fighter_id FROM transfers WHERE block_number > ?",
+                    (block_number,),
+                )
+            ]
+            self.db.execute(
+                "DELETE FROM transfers WHERE block_number > ?", (block_number,)
+            )
+            self.db.execute(
+                "DELETE FROM fighters WHERE birth_block > ?", (block_number,)
+            )
+            self.db.executemany(
+                "UPDATE fighters SET owner = (SELECT to_address FROM transfers t"
+                " WHERE t.fighter_id = fighters.fighter_id"
+                " ORDER BY block_number DESC, log_index DESC LIMIT 1)"
+                " WHERE fighter_id = ?",
+                [(fighter_id,) for fighter_id in affected],
+            )
+            self.db.execute(
+                "DELETE FROM blocks WHERE block_number > ?", (block_number,)
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoint VALUES (?, ?)",
+                (self.address, block_number),
+            )
+
+
+def main():
+    core = WSKCore[-1]
+    indexer = FighterIndexer(core)
+    start = time.time()
+    indexed = indexer.sync()
+    print(
+        f"Indexed {indexed} events up to block {indexer.checkpoint} in {time.time() - start:.2f}s"
+    )
+    owner = core.ceoAddress()
+    print(
+        f"{owner} owns {indexer.balance_of(owner)} fighters: {indexer.tokens_of_owner(owner)}"
+    )
@@ -0,0 +1,159 @@
+import time
+
+import numpy as np
+
+# Off-chain fight resolution for balancing tournaments. Fighters are the
+# columns of the fighter store (or of random_roster), indexed by fighter ID,
+# and fights are resolved a batch of pairs at a time.
+#
+# WSKFighting does not implement fights yet, so the rules live here:
+#   - a fighter lands a share speed / (speed + opponent agility) of its hits,
+#     each worth strengh, plus LEVEL_BONUS per level
+#   - the probability of winning is the fighter's share of the total damage
+#   - the winner gets WIN_EXPERIENCE, the loser LOSS_EXPERIENCE, and the level
+#     is the largest l with experience >= LEVEL_EXPERIENCE * l * l, capped at
+#     MAX_LEVEL
+# Fights of a batch are simultaneous: they all see the stats from before the
+# batch, and a fighter fighting twice in one batch gets both results.
+
+WIN_EXPERIENCE = 100
+LOSS_EXPERIENCE = 25
+LEVEL_EXPERIENCE = 100
+LEVEL_BONUS = 0.05
+MAX_LEVEL = 100
+
+ROSTER_COLUMNS = (
+    "level",
+    "experience",
+    "victories",
+    "defeats",
+    "agility",
+    "speed",
+    "strengh",
+)
+
+
+def random_roster(count, rng, max_stat=100):
+    return {
+        "level": np.zeros(count, dtype=np.uint64),
+        "experience": np.zeros(count, dtype=np.uint64),
+        "victories": np.zeros(count, dtype=np.uint64),
+        "defeats": np.zeros(count, dtype=np.uint64),
+        "agility": rng.integers(1, max_stat + 1, count).astype(np.uint32),
+        "speed": rng.integers(1, max_stat + 1, count).astype(np.uint32),
+        "strengh": rng.integers(1, max_stat + 1, count).astype(np.uint32),
+    }
+
+
+def load_roster(path="fighters"):
+    # Copies the counters out of the memory-mapped store so that simulations
+    # never write to it. The store needs the WSKCore project, so it is only
+    # imported here and the fight rules run without brownie.
+    from scripts.fighter_store import FighterStore
+
+    columns = FighterStore(path).load()
+    return {name: np.array(columns[name]) for name in ROSTER_COLUMNS}
+
+
+def level_for(experience):
+    level = np.floor(np.sqrt(experience / LEVEL_EXPERIENCE)).astype(np.uint64)
+    return np.minimum(level, MAX_LEVEL)
+
+
+def win_probability(roster, a, b):
+    def damage(attacker, defender):
+        speed = roster["speed"][attacker].astype(np.float64)
+        hits = speed / np.maximum(speed + roster["agility"][defender], 1)
+        bonus = 1 + LEVEL_BONUS * roster["level"][attacker]
+        return roster["strengh"][attacker] * hits * bonus
+
+    damage_a = damage(a, b)
+    damage_b = damage(b, a)
+    total = damage_a + damage_b
+    return np.divide(damage_a, total, out=np.full(len(a), 0.5), where=total > 0)
+
+
+def fight(roster, a, b, rng):
+    # Resolves the fights a[i] against b[i], updates the roster in place and
+    # returns the winners.
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    a_wins = rng.random(len(a)) < win_probability(roster, a, b)
+    winners = np.where(a_wins, a, b)
+    losers = np.where(a_wins, b, a)
+    size = len(roster["level"])
+    won = np.bincount(winners, minlength=size).astype(np.uint64)
+    lost = np.bincount(losers, minlength=size).astype(np.uint64)
+    roster["victories"] += won
+    roster["defeats"] += lost
+    roster["experience"] += won * WIN_EXPERIENCE + lost * LOSS_EXPERIENCE
+    touched = np.concatenate([winners, losers])
+    roster["level"][touched] = level_for(roster["experience"][touched])
+    return winners
+
+
+def bracket(roster, ids, rng):
+    # Single elimination in the given seeding order. When the field is not a
+    # power of two the top seeds get a bye in the first round.
+    ids = np.asarray(ids, dtype=np.int64)
+    rounds = []
+    size = 1 << int(np.ceil(np.log2(max(len(ids), 1))))
+    byes = size - len(ids)
+    advancing, contenders = ids[:byes], ids[byes:]
+    while len(advancing) + len(contenders) > 1:
+        winners = fight(roster, contenders[0::2], contenders[1::2], rng)
+        rounds.append(winners)
+        contenders = np.concatenate([advancing, winners])
+        advancing = contenders[:0]
+    return int(contenders[0]), rounds
+
+
+def round_robin(roster, ids, rng, legs=1):
+    # Everyone meets everyone `legs` times, one batch per round (circle
+    # method, nobody fights twice in a round). Returns the number of wins of
+    # each fighter of ids, in the same order.
+    ids = np.asarray(ids, dtype=np.int64)
+    field = ids if len(ids) % 2 == 0 else np.append(ids, -1)
+    n = len(field)
+    wins = dict.fromkeys(ids.tolist(), 0)
+    order = np.arange(n)
+    for _ in range(legs):
+        for _ in range(n - 1):
+            home = field[order[: n // 2]]
+            away = field[order[n // 2 :][::-1]]
+            playing = (home >= 0) & (away >= 0)
+            winners = fight(roster, home[playing], away[playing], rng)
+            for winner, count in zip(*np.unique(winners, return_counts=True)):
+                wins[int(winner)] += int(count)
+            order = np.concatenate([order[:1], np.roll(order[1:], 1)])
+    return np.array([wins[i] for i in ids.tolist()])
+
+
+def main(fighters=10000, fights=1_000_000, seed=0, path=None):
+    rng = np.random.default_rng(int(seed))
+    if path:
+        roster = load_roster(path)
+    else:
+        roster = random_roster(int(fighters), rng)
+    count = len(roster["level"])
+    a = rng.integers(0, count, int(fights))
+    b = (a + rng.integers(1, count, int(fights))) % count
+    start = time.time()
+    fight(roster, a, b, rng)
+    elapsed = time.time() - start
+    print(f"Resolved {int(fights)} fights in {elapsed:.2f}s")
+
+    power = roster["strengh"].astype(np.float64) * roster["speed"]
+    print("Victory rate by stat power quartile:")
+    quartiles = np.quantile(power, [0.25, 0.5, 0.75])
+    bucket = np.searchsorted(quartiles, power)
+    played = roster["victories"] + roster["defeats"]
+    for q in range(4):
+        selected = bucket == q
+        rate = roster["victories"][selected].sum() / max(played[selected].sum(), 1)
+        print(f"  Q{q + 1}: {rate:.3f}")
+    levels, counts = np.unique(roster["level"], return_counts=True)
+    print(f"Levels reached: {dict(zip(levels.tolist(), counts.tolist()))}")
+
+    champion, rounds = bracket(roster, rng.permutation(count)[:64], rng)
+    print(f"64-fighter bracket won by fighter {champion} in {len(rounds)} rounds")
@@ -0,0 +1,177 @@
+import json
+import os
+import time
+
+import numpy as np
+from brownie import WSKCore, web3
+from scripts.helpful_scripts import rpc_batch
+
+# Exports the `fighters` array of WSKBase into a columnar on-disk store, one
+# raw little-endian file per Fighter field, that analytics open with
+# np.memmap without copying or calling getFighter.
+#
+# Fighter is laid out over three storage words:
+#   word 0: genes (uint256)
+#   word 1: level | experience | victories | defeats (uint64 each, from the
+#           lowest-order bytes up)
+#   word 2: agility | speed | strengh (uint32 each, from the lowest-order
+#           bytes up)
+# Element i of the array starts at keccak256(slot) + 3 * i. The words are read
+# with batched eth_getStorageAt calls pinned to one block and decoded for the
+# whole batch at once.
+#
+# genes is stored as four uint64 limbs, least significant limb first, so that
+# bit n of the genes is bit n % 64 of limb n // 64.
+
+WORDS_PER_FIGHTER = 3
+# Slot of `fighters` for the current WSKAccessControl/WSKBase layout, checked
+# against totalSupply() before use.
+FIGHTERS_SLOT = 6
+
+COLUMNS = {
+    "genes": (np.uint64, (4,)),
+    "level": (np.uint64, ()),
+    "experience": (np.uint64, ()),
+    "victories": (np.uint64, ()),
+    "defeats": (np.uint64, ()),
+    "agility": (np.uint32, ()),
+    "speed": (np.uint32, ()),
+    "strengh": (np.uint32, ()),
+}
+
+
+class FighterStore:
+    def __init__(self, path="fighters"):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, "meta.json")
+        self.meta = {"count": 0, "block": None, "address": None}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.meta = json.load(f)
+
+    @property
+    def count(self):
+        return self.meta["count"]
+
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def column(self, name, mode="r"):
+        # Fighter IDs index the columns directly, fighter 0 included.
+        dtype, shape = COLUMNS[name]
+        if not self.count:
+            return np.zeros((0, *shape), dtype=dtype)
+        return np.memmap(
+            self._file(name), dtype=dtype, mode=mode, shape=(self.count, *shape)
+        )
+
+    def load(self):
+        return {name: self.column(name) for name in COLUMNS}
+
+    def write(self, start_id, columns, block):
+        # Writes fighters start_id .. start_id + n - 1, growing the files when
+        # the range goes past the end.
+        size = len(columns["level"])
+        for name, (dtype, _) in COLUMNS.items():
+            data = np.ascontiguousarray(columns[name], dtype=dtype)
+            with open(
+                self._file(name), "r+b" if os.path.exists(self._file(name)) else "wb"
+            ) as f:
+                f.seek(start_id * data[:1].nbytes)
+                f.write(data.tobytes())
+        self.meta["count"] = max(self.count, start_id + size)
+        self.meta["block"] = block
+        with open(self._meta_path, "w") as f:
+            json.dump(self.meta, f)
+
+
+def fighters_slot(core, block):
+    # `fighters` holds its length in its own slot: find the slot whose value
+    # is totalSupply() + 1 (the unKitty is fighter 0).
+    expected = core.totalSupply(block_identifier=block) + 1
+    for slot in [FIGHTERS_SLOT, *range(64)]:
+        value = web3.eth.get_storage_at(str(core.address), slot, block)
+        if int.from_bytes(value, "big") == expected:
+            return slot
+    raise ValueError("Could not locate the fighters array in storage")
+
+
+def element_slot(array_slot, index):
+    base = int.from_bytes(web3.keccak(array_slot.to_bytes(32, "big")), "big")
+    return base + WORDS_PER_FIGHTER * index
+
+
+def read_words(address, first_slot, count, block, batch_size=3000):
+    # Returns count consecutive storage words as a (count, 32) uint8 array.
+    words = np.zeros((count, 32), dtype=np.uint8)
+    block = hex(block)
+    for start in range(0, count, batch_size):
+        slots = range(first_slot + start, first_slot + min(start + batch_size, count))
+        results = rpc_batch(
+            [("eth_getStorageAt", [address, hex(slot), block]) for slot in slots]
+        )
+        raw = b"".join(bytes.fromhex(result[2:].rjust(64, "0")) for result in results)
+        words[start : start + len(results)] = np.frombuffer(
+            raw, dtype=np.uint8
+        ).reshape(-1, 32)
+    return words
+
+
+def decode(words):
+    # words is (n * 3, 32), big-endian storage words of n consecutive fighters.
+    words = words.reshape(-1, WORDS_PER_FIGHTER, 32)
+    genes = words[:, 0].copy().view(">u8").reshape(-1, 4)[:, ::-1]
+    counters = words[:, 1].copy().view(">u8").reshape(-1, 4)
+    stats = words[:, 2].copy().view(">u4").reshape(-1, 8)
+    return {
+        "genes": genes.astype(np.uint64),
+        "level": counters[:, 3].astype(np.uint64),
+        "experience": counters[:, 2].astype(np.uint64),
+        "victories": counters[:, 1].astype(np.uint64),
+        "defeats": counters[:, 0].astype(np.uint64),
+        "agility": stats[:, 7].astype(np.uint32),
+        "speed": stats[:, 6].astype(np.uint32),
+        "strengh": stats[:, 5].astype(np.uint32),
+    }
+
+
+def export(core, store, start_id=None, end_id=None, chunk=10000):
+    # Reads fighters start_id..end_id (by default the ones not exported yet)
+    # and writes them to the store. Use it with an explicit range to refresh
+    # fighters whose stats changed. A store holds the fighters of a single
+    # WSKCore, exporting another deployment into it raises.
+    exported_from = store.meta["address"]
+    if exported_from is not None and exported_from.lower() != str(core.address).lower():
+        raise ValueError(
+            f"{store.path} holds fighters of {exported_from}, not of {core.address}:"
+            " export to another path"
+        )
+    block = web3.eth.block_number
+    slot = fighters_slot(core, block)
+    if start_id is None:
+        start_id = store.count
+    if end_id is None:
+        end_id = core.totalSupply(block_identifier=block)
+    store.meta["address"] = str(core.address)
+    exported = 0
+    for first in range(start_id, end_id + 1, chunk):
+        last = min(first + chunk - 1, end_id)
+        words = read_words(
+            str(core.address),
+            element_slot(slot, first),
+            (last - first + 1) * WORDS_PER_FIGHTER,
+            block,
+        )
+        store.write(first, decode(words), block)
+        exported += last - first + 1
+    return exported
+
+
+def main():
+    core = WSKCore[-1]
+    store = FighterStore()
+    start = time.time()
+    exported = export(core, store)
+    elapsed = time.time() - start
+    print(f"Exported {exported} fighters in {elapsed:.2f}s, {store.count} in the store")
@@ -0,0 +1,264 @@
+import json
+import math
+import os
+
+from brownie import Voting, WSKCore, accounts, chain
+from scripts.bulk_mint import mint
+from scripts.receipt_tracker import shared_tracker
+from scripts.tx_pipeline import TxPipeline
+from web3 import Web3
+
+# Measures the gas used by the Voting and WSK entry points on top of growing
+# populations and compares it with a stored baseline.
+#
+#   brownie run scripts/gas_benchmark.py main                   # check
+#   brownie run scripts/gas_benchmark.py main 10,100 5 update   # new baseline
+#
+# The baseline is committed with the script, in scripts/gas_baseline.json. A
+# run without it, or measuring a size or an entry point it does not have,
+# fails until a baseline is recorded with `update` and committed.
+#
+# Every population is built once with the pipelined submitter, snapshotted,
+# and each entry point is measured from that snapshot. Results go to
+# reports/gas_benchmark.json with the gas per call for each size and the
+# log-log scaling exponent between the smallest and largest size (0 for a
+# constant cost, 1 for a cost linear in the population).
+
+SIZES = [10, 100, 1000, 10000]
+TOLERANCE = 10
+REPORT_PATH = os.path.join("reports", "gas_benchmark.json")
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "gas_baseline.json"
+)
+
+FUNDING_AMOUNT = Web3.toWei("0.01", "ether")
+ACCOUNT_BALANCE = Web3.toWei("0.1", "ether")
+
+
+def new_accounts(count, pipeline):
+    created = [accounts.add() for _ in range(count)]
+    steps = [
+        pipeline.transfer(accounts[0], account, ACCOUNT_BALANCE) for account in created
+    ]
+    return created, steps
+
+
+def gas_used(transaction):
+    transaction.wait(1)
+    return transaction.gas_used
+
+
+# Voting
+
+
+def build_election(size):
+    owner = accounts[0]
+    voting = Voting.deploy({"from": owner})
+    pipeline = TxPipeline(tracker=shared_tracker())
+    candidates, funded = new_accounts(size, pipeline)
+    voters, funded_voters = new_accounts(size + 1, pipeline)
+    start = pipeline.call(voting.startVotingPeriod, 1, sender=owner)
+
+    running = []
+    for candidate, funding in zip(candidates, funded):
+        running.append(
+            pipeline.call(
+                voting.runAsCandidate,
+                "Michel",
+                sender=candidate,
+                after=[start, funding],
+            )
+        )
+    # The last voter is kept aside to measure vote and fund on a full election.
+    for i, (voter, funding) in enumerate(zip(voters[:-1], funded_voters)):
+        voted = pipeline.call(
+            voting.vote,
+            candidates[i % size],
+            sender=voter,
+            after=[running[i % size], funding],
+        )
+        pipeline.call(
+            voting.fund,
+            candidates[i % size],
+            sender=voter,
+            value=FUNDING_AMOUNT,
+            after=[voted],
+        )
+    pipeline.run()
+    return voting, candidates, voters
+
+
+def measure_election(size):
+    owner = accounts[0]
+    voting, candidates, voters = build_election(size)
+    voter = voters[-1]
+    results = {}
+    chain.snapshot()
+
+    results["vote"] = gas_used(voting.vote(candidates[0], {"from": voter}))
+    results["fund"] = gas_used(
+        voting.fund(candidates[0], {"from": voter, "amount": FUNDING_AMOUNT})
+    )
+    # delegating takes a second candidate
+    if size > 1:
+        results["delegate"] = gas_used(
+            voting.delegate(candidates[0], {"from": candidates[1]})
+        )
+    chain.revert()
+
+    results["electCandidate"] = gas_used(voting.electCandidate({"from": owner}))
+    elected = voting.electedCandidate()
+    loser = next(v for v in voters[:-1] if voting.voterToCandidate(v) != elected)
+    results["voterFundClaim"] = gas_used(voting.voterFundClaim({"from": loser}))
+    results["ElectedCandidateFundClaim"] = gas_used(
+        voting.ElectedCandidateFundClaim({"from": elected})
+    )
+    chain.revert()
+    return results
+
+
+# WSK
+
+SMALL_BALANCE = 5
+PAGE_SIZE = 100
+
+
+def build_fighters(size):
+    owner = accounts[0]
+    core = WSKCore.deploy({"from": owner})
+    transaction = core.unpause({"from": owner})
+    transaction.wait(1)
+    # accounts[1] keeps SMALL_BALANCE fighters whatever the supply, the owner
+    # gets all the others.
+    records = (
+        (i + 1, accounts[1] if i < SMALL_BALANCE else owner) for i in range(size)
+    )
+    mint(core, records, owner)
+    return core
+
+
+def measure_fighters(size):
+    owner = accounts[0]
+    core = build_fighters(size)
+    # up to SMALL_BALANCE fighters the small holder has them all and moves one
+    holder = owner if core.balanceOf(owner) else accounts[1]
+    fighter_id = core.tokensOfOwner["address,uint256,uint256"](holder, 0, 1)[0]
+    results = {}
+    chain.snapshot()
+
+    # The cost of listing fighters follows the balance of the owner: flat for
+    # the small holder, linear for the owner, whatever the supply.
+    tokens_of_owner = core.tokensOfOwner["address"]
+    results["tokensOfOwner"] = tokens_of_owner.estimate_gas(owner)
+    results["tokensOfOwner(small holder)"] = tokens_of_owner.estimate_gas(accounts[1])
+    results["tokensOfOwner(page)"] = core.tokensOfOwner[
+        "address,uint256,uint256"
+    ].estimate_gas(owner, 0, PAGE_SIZE)
+    results["getFighter"] = core.getFighter.estimate_gas(fighter_id)
+    results["transfer"] = gas_used(
+        core.transfer(accounts[2], fighter_id, {"from": holder})
+    )
+    chain.revert()
+
+    results["approve"] = gas_used(
+        core.approve(accounts[2], fighter_id, {"from": holder})
+    )
+    results["transferFrom"] = gas_used(
+        core.transferFrom(holder, accounts[3], fighter_id, {"from": accounts[2]})
+    )
+    chain.revert()
+    return results
+
+
+SUITES = {
+    "Voting": (measure_election, lambda: True),
+    "WSKCore": (measure_fighters, lambda: "createGen0Fighters" in WSKCore.signatures),
+}
+
+
+# Reporting
+
+
+def scaling(curve):
+    sizes = sorted(curve, key=int)
+    first, last = sizes[0], sizes[-1]
+    if first == last or not curve[first]:
+        return 0.0
+    return math.log(curve[last] / curve[first]) / math.log(int(last) / int(first))
+
+
+def run_benchmarks(sizes):
+    report = {}
+    for suite, (measure, available) in SUITES.items():
+        if not available():
+            print(f"Skipping {suite}: no minting entry point to build a population")
+            continue
+        curves = {}
+        for size in sizes:
+            print(f"Measuring {suite} with a population of {size}")
+            for function, gas in measure(size).items():
+                curves.setdefault(function, {})[str(size)] = gas
+        report[suite] = {
+            function: {"gas": curve, "scaling": round(scaling(curve), 3)}
+            for function, curve in curves.items()
+        }
+    return report
+
+
+def regressions(report, baseline, tolerance):
+    found = []
+    for suite, functions in report.items():
+        for function, result in functions.items():
+            expected = baseline.get(suite, {}).get(function, {}).get("gas", {})
+            for size, gas in result["gas"].items():
+                if size not in expected:
+                    found.append(f"{suite}.{function} at {size}: not in the baseline")
+                elif gas > expected[size] * (1 + tolerance / 100):
+                    found.append(
+                        f"{suite}.{function} at {size}: {gas} gas, baseline {expected[size]}"
+                    )
+    return found
+
+
+def print_report(report):
+    for suite, functions in report.items():
+        print(f"\n{suite}")
+        for function, result in functions.items():
+            curve = ", ".join(f"{size}: {gas}" for size, gas in result["gas"].items())
+            print(f"  {function:<28} {curve}  (scaling {result['scaling']})")
+
+
+def main(sizes=None, tolerance=TOLERANCE, update_baseline=False):
+    sizes = [int(size) for size in sizes.split(",")] if sizes else SIZES
+    tolerance = float(tolerance)
+    update_baseline = update_baseline in (True, "true", "update")
+    if min(sizes) < 1:
+        raise ValueError(f"Population sizes must be at least 1, got {sizes}")
+    if not update_baseline and not os.path.exists(BASELINE_PATH):
+        raise SystemExit(
+            f"No gas baseline at {BASELINE_PATH}, record one with `update` "
+            "and commit it"
+        )
+
+    report = run_benchmarks(sizes)
+    print_report(report)
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {REPORT_PATH}")
+
+    if update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {BASELINE_PATH}")
+        return report
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    found = regressions(report, baseline, tolerance)
+    if found:
+        for regression in found:
+            print(f"Gas regression: {regression}")
+        raise SystemExit(f"{len(found)} gas regression(s) above {tolerance}%")
+    print(f"No gas regression above {tolerance}%")
+    return report
@@ -0,0 +1,157 @@
+import time
+
+import numpy as np
+
+# Codec for Fighter.genes. The 256 bits are split into TRAITS, each made of
+# GENES_PER_TRAIT genes of GENE_BITS bits starting from the least significant
+# bit: the first gene of a trait is the dominant one (the one the fighter
+# shows), the others are recessive. The top 16 bits are unused.
+#
+# Genes are handled as (n, 4) uint64 limbs, least significant limb first, the
+# format of the fighter store, so that whole populations are decoded with a
+# few shifts per gene instead of one Python int per fighter.
+
+GENE_BITS = 5
+GENES_PER_TRAIT = 4
+TRAITS = [
+    "body",
+    "skin",
+    "hair",
+    "hair_color",
+    "eyes",
+    "mouth",
+    "outfit",
+    "outfit_color",
+    "gloves",
+    "stance",
+    "aura",
+    "special",
+]
+VALUES = 1 << GENE_BITS
+TRAIT_BITS = GENE_BITS * GENES_PER_TRAIT
+
+
+def gene_offset(trait, gene=0):
+    return TRAITS.index(trait) * TRAIT_BITS + gene * GENE_BITS
+
+
+def to_limbs(genes):
+    # Python ints to (n, 4) uint64 limbs.
+    return np.array(
+        [[(value >> (64 * i)) & (2**64 - 1) for i in range(4)] for value in genes],
+        dtype=np.uint64,
+    ).reshape(-1, 4)
+
+
+def from_limbs(limbs):
+    return [
+        sum(int(limb) << (64 * i) for i, limb in enumerate(row))
+        for row in np.asarray(limbs)
+    ]
+
+
+def _read(columns, offset, bits):
+    # columns is the transposed limbs, one contiguous row per limb.
+    limb, shift = divmod(offset, 64)
+    value = columns[limb] >> np.uint64(shift)
+    if shift + bits > 64:
+        value |= columns[limb + 1] << np.uint64(64 - shift)
+    return value & np.uint64((1 << bits) - 1)
+
+
+def _write(limbs, offset, bits, values):
+    limb, shift = divmod(offset, 64)
+    values = np.asarray(values, dtype=np.uint64) & np.uint64((1 << bits) - 1)
+    limbs[:, limb] |= values << np.uint64(shift)
+    if shift + bits > 64:
+        limbs[:, limb + 1] |= values >> np.uint64(64 - shift)
+
+
+def decode(limbs):
+    # {trait: (n, GENES_PER_TRAIT) uint8}, column 0 is the dominant gene.
+    # A trait fits in 32 bits: it is read from the limbs once and split into
+    # genes on uint32.
+    columns = np.ascontiguousarray(np.asarray(limbs, dtype=np.uint64).T)
+    mask = np.uint32(VALUES - 1)
+    decoded = {}
+    for trait in TRAITS:
+        value = _read(columns, gene_offset(trait), TRAIT_BITS).astype(np.uint32)
+        genes = np.empty((len(value), GENES_PER_TRAIT), dtype=np.uint8)
+        for gene in range(GENES_PER_TRAIT):
+            genes[:, gene] = (value >> np.uint32(gene * GENE_BITS)) & mask
+        decoded[trait] = genes
+    return decoded
+
+
+def encode(traits, count=None):
+    # Inverse of decode. A trait may be given as one gene value per fighter
+    # (the dominant gene, the recessive ones stay 0) or as (n, GENES_PER_TRAIT)
+    # values, missing traits are 0.
+    if count is None:
+        count = len(np.atleast_1d(next(iter(traits.values()))))
+    limbs = np.zeros((count, 4), dtype=np.uint64)
+    for trait, values in traits.items():
+        values = np.asarray(values)
+        if values.ndim < 2:
+            values = np.broadcast_to(values, (count,))[:, None]
+        if (values >= VALUES).any():
+            raise ValueError(f"{trait} genes must be below {VALUES}")
+        for gene in range(values.shape[1]):
+            _write(limbs, gene_offset(trait, gene), GENE_BITS, values[:, gene])
+    return limbs
+
+
+def encode_one(**traits):
+    # Genes of a single fighter as an int, for minting.
+    return from_limbs(encode(traits, count=1))[0]
+
+
+def histograms(decoded):
+    # Frequency of each value of the dominant gene of every trait.
+    return {
+        trait: np.bincount(columns[:, 0], minlength=VALUES)
+        for trait, columns in decoded.items()
+    }
+
+
+def rarity(decoded, counts=None):
+    # Sum over the traits of -log2(share of the population showing the same
+    # value): higher is rarer.
+    counts = counts or histograms(decoded)
+    score = np.zeros(len(next(iter(decoded.values()))))
+    for trait, columns in decoded.items():
+        frequencies = counts[trait] / max(counts[trait].sum(), 1)
+        with np.errstate(divide="ignore"):
+            surprise = -np.log2(frequencies)
+        score += surprise[columns[:, 0]]
+    return score
+
+
+def random_genes(count, rng):
+    return rng.integers(0, 2**64, size=(count, 4), dtype=np.uint64, endpoint=False)
+
+
+def main(path="fighters", count=1_000_000, seed=0):
+    # The store needs the WSKCore project, the codec itself does not
+    from scripts.fighter_store import FighterStore
+
+    limbs = FighterStore(path).column("genes")
+    if not len(limbs):
+        print(f"No fighters in {path}, using {int(count)} random genes")
+        limbs = random_genes(int(count), np.random.default_rng(int(seed)))
+    start = time.time()
+    decoded = decode(limbs)
+    counts = histograms(decoded)
+    scores = rarity(decoded, counts)
+    elapsed = time.time() - start
+    print(f"Decoded {len(limbs)} genes in {elapsed:.3f}s")
+    for trait, histogram in counts.items():
+        common = np.argsort(histogram)[::-1][:3]
+        shares = ", ".join(
+            f"{value}: {histogram[value] / len(limbs):.2%}" for value in common
+        )
+        print(f"  {trait:<14} {shares}")
+    rarest = np.argsort(scores)[::-1][:5]
+    print("Rarest fighters:")
+    for fighter_id in rarest:
+        print(f"  #{fighter_id} score {scores[fighter_id]:.2f}")
@@ -1,11 +1,66 @@
-from brownie import network, config, accounts
+from brownie import network, config, accounts, web3
+import requests
+from scripts import key_agent
 
+# Accounts already loaded by this process, decrypted keystores are the slow part
+_loaded_accounts = {}
 
-def get_account():
+
+def get_account(name="testing"):
     if network.show_active() in ["development"]:
         return accounts[0]
     elif network.show_active() == "ganache-local":
-        print(f"Using the account testing saved locally")
-        return accounts.load("testing")
+        return load_account(name)
+    else:
+        if "from_key" not in _loaded_accounts:
+            _loaded_accounts["from_key"] = accounts.add(config["wallets"]["from_key"])
+        return _loaded_accounts["from_key"]
+
+
+def load_account(name):
+    # Each keystore is decrypted at most once per process. When the key agent
+    # (scripts/key_agent.py) is running, unlocked keys are also shared between
+    # processes until it expires them.
+    if name not in _loaded_accounts:
+        print(f"Using the account {name} saved locally")
+        private_key = key_agent.fetch(name)
+        if private_key is not None:
+            account = accounts.add(private_key)
+        else:
+            account = accounts.load(name)
+            key_agent.store(name, account.private_key)
+        _loaded_accounts[name] = account
+    return _loaded_accounts[name]
+
+
+def get_accounts(names):
+    return {name: load_account(name) for name in names}
+
+
+def rpc_batch(calls, errors=False):
+    # Sends [(method, params), ...] to the node as a single JSON-RPC batch and
+    # returns the results in the same order. Providers that are not HTTP get
+    # one request per call. With errors=True a failed call comes back as a
+    # ValueError in its place instead of failing the whole batch.
+    endpoint = getattr(web3.provider, "endpoint_uri", None)
+    if not endpoint or not str(endpoint).startswith("http"):
+        responses = [
+            web3.provider.make_request(method, params) for method, params in calls
+        ]
     else:
-        return accounts.add(config["wallets"]["from_key"])
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        response = requests.post(str(endpoint), json=payload, timeout=60)
+        response.raise_for_status()
+        responses = sorted(response.json(), key=lambda result: result["id"])
+    results = []
+    for result in responses:
+        if "error" in result:
+            if not errors:
+                raise ValueError(result["error"])
+            results.append(ValueError(result["error"]))
+        else:
+            results.append(result["result"])
+    return results
@@ -0,0 +1,381 @@
+import importlib
+import json
+import os
+import threading
+import time
+
+from brownie import web3
+from brownie.network.contract import _ContractMethod
+
+# Opt-in instrumentation of the contract calls and transactions made through
+# brownie objects, and of the RPC requests sent through the web3 provider.
+#
+#   instrumentation = enable()
+#   voting.vote(candidate, {"from": voter})
+#   instrumentation.write()      # reports/instrumentation.prom and .trace.json
+#
+#   brownie run scripts/instrumentation.py main deploy
+#   WSK_INSTRUMENT=1 brownie test
+#
+# For every function (contract, function, phase) it keeps a latency
+# histogram, where the phase is "call" for eth_call, "transaction" for the
+# whole transact() and, for transactions, "submit" (until the node accepted
+# it) and "confirm" (from then until the receipt was seen). Gas used,
+# reverts by reason and RPC requests by method are counted alongside.
+#
+# A transaction sent with required_confs=0 (the TxPipeline does) returns
+# before it is mined; it is confirmed when a receipt for it goes through the
+# provider, from any thread, e.g. brownie's own polling loop. Requests sent
+# outside of the provider (rpc_batch) are not seen.
+#
+# Metrics are exported in the Prometheus text format, and the spans in the
+# Chrome trace event format (chrome://tracing, ui.perfetto.dev, speedscope)
+# with the RPC requests nested inside the call that made them.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+MAX_TRACE_EVENTS = 100_000
+REPORT_PREFIX = os.path.join("reports", "instrumentation")
+SEND_METHODS = ("eth_sendTransaction", "eth_sendRawTransaction")
+MIDDLEWARE_NAME = "wsk_instrumentation"
+
+
+def _int(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def _txid(txid):
+    txid = txid.hex() if isinstance(txid, bytes) else str(txid)
+    txid = txid.lower()
+    return txid if txid.startswith("0x") else f"0x{txid}"
+
+
+def _labels(**labels):
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " "))
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            total += count
+            yield bound, total
+
+
+class Instrumentation:
+    def __init__(self):
+        self.latency = {}  # (contract, function, phase) -> Histogram
+        self.gas = {}  # (contract, function) -> [transactions, gas used]
+        self.reverts = {}  # (contract, function, reason) -> count
+        self.rpc = {}  # method -> [requests, seconds]
+        self.events = []
+        self.dropped_events = 0
+        self._pending = {}  # txid -> (contract, function, sent_at)
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._originals = None
+
+    # Hooks
+
+    def install(self):
+        if self._originals is not None:
+            return self
+        self._originals = (_ContractMethod.call, _ContractMethod.transact)
+        call, transact = self._originals
+        instrumentation = self
+
+        def instrumented_call(method, *args, **kwargs):
+            return instrumentation._measure(method, "call", call, args, kwargs)
+
+        def instrumented_transact(method, *args, **kwargs):
+            return instrumentation._measure(
+                method, "transaction", transact, args, kwargs
+            )
+
+        _ContractMethod.call = instrumented_call
+        _ContractMethod.transact = instrumented_transact
+        web3.middleware_onion.inject(self._middleware, name=MIDDLEWARE_NAME, layer=0)
+        return self
+
+    def uninstall(self):
+        if self._originals is None:
+            return
+        _ContractMethod.call, _ContractMethod.transact = self._originals
+        self._originals = None
+        web3.middleware_onion.remove(MIDDLEWARE_NAME)
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def _middleware(self, make_request, w3):
+        def middleware(method, params):
+            start = time.perf_counter()
+            response = make_request(method, params)
+            end = time.perf_counter()
+            with self._lock:
+                counters = self.rpc.setdefault(method, [0, 0.0])
+                counters[0] += 1
+                counters[1] += end - start
+            self._trace(method, "rpc", start, end)
+            result = response.get("result")
+            span = self._span()
+            if span is not None:
+                span["rpc"] += 1
+                if method in SEND_METHODS and result:
+                    span["sent_at"] = end
+                    span["txid"] = _txid(result)
+                    with self._lock:
+                        self._pending[span["txid"]] = (span["name"], end)
+            if method == "eth_getTransactionReceipt" and result:
+                self._confirmed(_txid(params[0]), result, end)
+            return response
+
+        return middleware
+
+    # Spans
+
+    def _span(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def _measure(self, method, kind, original, args, kwargs):
+        contract, _, function = getattr(method, "_name", "").rpartition(".")
+        name = (contract, function or method.abi["name"])
+        span = {"name": name, "rpc": 0, "sent_at": None, "txid": None}
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            result = original(method, *args, **kwargs)
+        except Exception as error:
+            end = time.perf_counter()
+            reason = getattr(error, "revert_msg", None) or type(error).__name__
+            self._count_revert(name, reason)
+            with self._lock:
+                self._pending.pop(span["txid"], None)
+            self._record(kind, start, end, span, {"revert": reason})
+            raise
+        finally:
+            stack.pop()
+        end = time.perf_counter()
+        args = {}
+        if kind == "transaction" and span["txid"] is not None:
+            args["txid"] = span["txid"]
+            if int(result.status) == 0:
+                self._count_revert(name, result.revert_msg)
+        self._record(kind, start, end, span, args)
+        return result
+
+    def _record(self, kind, start, end, span, args):
+        with self._lock:
+            self._observe(span["name"], kind, end - start)
+            if span["sent_at"] is not None:
+                self._observe(span["name"], "submit", span["sent_at"] - start)
+        contract, function = span["name"]
+        args["rpc"] = span["rpc"]
+        self._trace(f"{contract}.{function}", kind, start, end, args)
+
+    def _confirmed(self, txid, receipt, seen_at):
+        # The receipt of a transaction sent from an instrumented method went
+        # through the provider, in whatever thread polled for it.
+        with self._lock:
+            if txid not in self._pending:
+                return
+            name, sent_at = self._pending.pop(txid)
+            self._observe(name, "confirm", seen_at - sent_at)
+            counters = self.gas.setdefault(name, [0, 0])
+            counters[0] += 1
+            counters[1] += _int(receipt["gasUsed"])
+        span = self._span()
+        if _int(receipt["status"]) == 0 and (span is None or span["txid"] != txid):
+            # reverts seen by the sending method are counted with their reason
+            self._count_revert(name, None)
+        contract, function = name
+        args = {"txid": txid, "gas": _int(receipt["gasUsed"])}
+        self._trace(f"{contract}.{function}", "confirm", sent_at, seen_at, args)
+
+    # Counters, _observe is called with the lock held
+
+    def _observe(self, name, phase, seconds):
+        key = name + (phase,)
+        if key not in self.latency:
+            self.latency[key] = Histogram()
+        self.latency[key].observe(seconds)
+
+    def _count_revert(self, name, reason):
+        key = name + (reason or "unknown",)
+        with self._lock:
+            self.reverts[key] = self.reverts.get(key, 0) + 1
+
+    def _trace(self, name, category, start, end, args=None):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append(event)
+            else:
+                self.dropped_events += 1
+
+    # Exports
+
+    def prometheus(self):
+        lines = [
+            "# HELP wsk_contract_seconds Latency of contract calls and transactions.",
+            "# TYPE wsk_contract_seconds histogram",
+        ]
+        with self._lock:
+            for (contract, function, phase), histogram in sorted(self.latency.items()):
+                labels = dict(contract=contract, function=function, phase=phase)
+                for bound, count in histogram.cumulative():
+                    bucket = _labels(**labels, le=bound)
+                    lines.append(f"wsk_contract_seconds_bucket{bucket} {count}")
+                bucket = _labels(**labels, le="+Inf")
+                lines.append(f"wsk_contract_seconds_bucket{bucket} {histogram.count}")
+                lines.append(
+                    f"wsk_contract_seconds_sum{_labels(**labels)} {histogram.sum}"
+                )
+                lines.append(
+                    f"wsk_contract_seconds_count{_labels(**labels)} {histogram.count}"
+                )
+            lines += [
+                "# HELP wsk_contract_gas_used_total Gas used by mined transactions.",
+                "# TYPE wsk_contract_gas_used_total counter",
+            ]
+            for (contract, function), (_, gas) in sorted(self.gas.items()):
+                labels = _labels(contract=contract, function=function)
+                lines.append(f"wsk_contract_gas_used_total{labels} {gas}")
+            lines += [
+                "# HELP wsk_contract_transactions_total Mined transactions.",
+                "# TYPE wsk_contract_transactions_total counter",
+            ]
+            for (contract, function), (count, _) in sorted(self.gas.items()):
+                labels = _labels(contract=contract, function=function)
+                lines.append(f"wsk_contract_transactions_total{labels} {count}")
+            lines += [
+                "# HELP wsk_contract_reverts_total Reverted calls and transactions.",
+                "# TYPE wsk_contract_reverts_total counter",
+            ]
+            for (contract, function, reason), count in sorted(self.reverts.items()):
+                labels = _labels(contract=contract, function=function, reason=reason)
+                lines.append(f"wsk_contract_reverts_total{labels} {count}")
+            lines += [
+                "# HELP wsk_rpc_requests_total RPC requests sent through the provider.",
+                "# TYPE wsk_rpc_requests_total counter",
+            ]
+            for method, (count, _) in sorted(self.rpc.items()):
+                lines.append(f"wsk_rpc_requests_total{_labels(method=method)} {count}")
+            lines += [
+                "# HELP wsk_rpc_seconds_total Time spent in RPC requests.",
+                "# TYPE wsk_rpc_seconds_total counter",
+            ]
+            for method, (_, seconds) in sorted(self.rpc.items()):
+                lines.append(f"wsk_rpc_seconds_total{_labels(method=method)} {seconds}")
+        return "\n".join(lines) + "\n"
+
+    def chrome_trace(self):
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+            dropped = self.dropped_events
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": dropped},
+        }
+
+    def summary(self):
+        # {"Contract.function": {phase: (count, mean seconds)}, gas, reverts}
+        summary = {}
+        with self._lock:
+            for (contract, function, phase), histogram in self.latency.items():
+                entry = summary.setdefault(f"{contract}.{function}", {})
+                entry[phase] = (histogram.count, histogram.sum / histogram.count)
+            for (contract, function), (count, gas) in self.gas.items():
+                entry = summary.setdefault(f"{contract}.{function}", {})
+                entry["gas"] = gas // count if count else 0
+            for (contract, function, _), count in self.reverts.items():
+                entry = summary.setdefault(f"{contract}.{function}", {})
+                entry["reverts"] = entry.get("reverts", 0) + count
+        return summary
+
+    def write(self, prefix=REPORT_PREFIX):
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+        with open(f"{prefix}.prom", "w") as f:
+            f.write(self.prometheus())
+        with open(f"{prefix}.trace.json", "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return f"{prefix}.prom", f"{prefix}.trace.json"
+
+
+_active = None
+
+
+def enable():
+    # The process-wide instrumentation, installed on first use.
+    global _active
+    if _active is None:
+        _active = Instrumentation()
+    return _active.install()
+
+
+def disable():
+    global _active
+    if _active is not None:
+        _active.uninstall()
+    _active = None
+
+
+def print_summary(instrumentation):
+    for name, entry in sorted(instrumentation.summary().items()):
+        phases = ", ".join(
+            f"{phase} {value[0]}x {value[1] * 1000:.1f}ms"
+            for phase, value in entry.items()
+            if isinstance(value, tuple)
+        )
+        extra = f", {entry['gas']} gas" if "gas" in entry else ""
+        extra += f", {entry['reverts']} reverted" if "reverts" in entry else ""
+        print(f"  {name}: {phases}{extra}")
+    requests = sum(count for count, _ in instrumentation.rpc.values())
+    print(f"  {requests} RPC requests")
+
+
+def main(script="deploy", function="main", *args):
+    # Runs scripts/<script>.py:<function> instrumented and writes the reports
+    instrumentation = enable()
+    module = importlib.import_module(f"scripts.{script}")
+    try:
+        getattr(module, function)(*args)
+    finally:
+        disable()
+        paths = instrumentation.write()
+        print(f"Instrumented {script}.{function}:")
+        print_summary(instrumentation)
+        print(f"Reports written to {', '.join(paths)}")
@@ -0,0 +1,145 @@
+import os
+import secrets
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# A small local agent that keeps decrypted keystore accounts in memory for a
+# limited time, so that scripts run one after another only pay for the scrypt
+# decryption once. It listens on a unix socket inside a private directory and
+# only answers clients that know the random key written next to it.
+#
+#   python scripts/key_agent.py 900     # keep unlocked accounts for 15 minutes
+#
+# get_account() in helpful_scripts uses it when it is running and falls back
+# to decrypting the keystore otherwise.
+#
+# Expired keys are dropped by a reaper thread every REAP_INTERVAL, whether or
+# not clients connect. A client has RECV_TIMEOUT to send its request, and a
+# request that is not one of MESSAGES is answered with None.
+
+AGENT_DIR = os.path.join(os.path.expanduser("~"), ".brownie", "wsk-key-agent")
+SOCKET_PATH = os.path.join(AGENT_DIR, "agent.sock")
+AUTHKEY_PATH = os.path.join(AGENT_DIR, "authkey")
+DEFAULT_TTL = 15 * 60
+REAP_INTERVAL = 1
+RECV_TIMEOUT = 5
+# command -> number of fields, the command included
+MESSAGES = {"get": 2, "put": 3, "lock": 1}
+
+
+def _authkey():
+    with open(AUTHKEY_PATH, "rb") as f:
+        return f.read()
+
+
+def _request(*message):
+    if not os.path.exists(SOCKET_PATH):
+        return None
+    try:
+        with Client(SOCKET_PATH, family="AF_UNIX", authkey=_authkey()) as connection:
+            connection.send(message)
+            return connection.recv()
+    except (OSError, EOFError, AuthenticationError):
+        return None
+
+
+def fetch(name):
+    # Returns the private key of an unlocked account, None when the agent is
+    # not running or the account is not (or no longer) unlocked.
+    return _request("get", name)
+
+
+def store(name, private_key):
+    _request("put", name, private_key)
+
+
+def lock():
+    _request("lock")
+
+
+def _valid(message):
+    return (
+        isinstance(message, tuple)
+        and len(message) > 0
+        and isinstance(message[0], str)
+        and MESSAGES.get(message[0]) == len(message)
+        and all(isinstance(field, (str, bytes)) for field in message[1:])
+    )
+
+
+def _reap(keys, lock, stop):
+    while not stop.wait(REAP_INTERVAL):
+        now = time.time()
+        with lock:
+            for name in [name for name, entry in keys.items() if entry[1] <= now]:
+                del keys[name]
+
+
+def _answer(message, keys, lock, ttl):
+    if not _valid(message):
+        return None
+    with lock:
+        if message[0] == "get":
+            entry = keys.get(message[1])
+            return entry[0] if entry and entry[1] > time.time() else None
+        if message[0] == "put":
+            keys[message[1]] = (message[2], time.time() + ttl)
+        else:
+            keys.clear()
+    return True
+
+
+def serve(ttl=DEFAULT_TTL):
+    os.makedirs(AGENT_DIR, mode=0o700, exist_ok=True)
+    os.chmod(AGENT_DIR, 0o700)
+    authkey = secrets.token_bytes(32)
+    with open(
+        os.open(AUTHKEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb"
+    ) as f:
+        f.write(authkey)
+    if os.path.exists(SOCKET_PATH):
+        os.remove(SOCKET_PATH)
+
+    keys = {}
+    lock = threading.Lock()
+    stop = threading.Event()
+    reaper = threading.Thread(target=_reap, args=(keys, lock, stop), daemon=True)
+    reaper.start()
+    print(
+        f"Key agent listening on {SOCKET_PATH}, unlocked accounts expire after {ttl}s"
+    )
+    try:
+        with Listener(SOCKET_PATH, family="AF_UNIX", authkey=authkey) as listener:
+            while True:
+                try:
+                    connection = listener.accept()
+                except Exception:
+                    # a client with the wrong key, keep serving the others
+                    continue
+                with connection:
+                    try:
+                        if not connection.poll(RECV_TIMEOUT):
+                            continue
+                        message = connection.recv()
+                    except Exception:
+                        # gone, or not a message we can unpickle
+                        continue
+                    try:
+                        connection.send(_answer(message, keys, lock, ttl))
+                    except OSError:
+                        continue
+    finally:
+        stop.set()
+        with lock:
+            keys.clear()
+
+
+def main(ttl=DEFAULT_TTL):
+    serve(int(ttl))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
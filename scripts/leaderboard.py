@@ -0,0 +1,480 @@
+import json
+import os
+import pickle
+import random
+import time
+
+import numpy as np
+from brownie import Voting, WSKCore, network, web3
+from scripts.event_indexer import event_topic, scan_logs
+from scripts.fight_engine import fight, load_roster, random_roster
+from scripts.merkle_payouts import apply_transaction, deployer, voting_transactions
+from scripts.stats import summarize
+from scripts.voting_model import NO_CANDIDATE, WEI_PER_UNIT, ZERO_ADDRESS, VotingModel
+
+# Leaderboards kept up to date from the contract activity instead of reading
+# every fighter or candidate back through views.
+#
+#   boards = Leaderboards.load()                 # or Leaderboards()
+#   boards.sync_core(WSKCore[-1])                # Birth / Transfer events
+#   boards.sync_voting(Voting[-1])               # mined Voting transactions
+#   boards.save()
+#   boards["owners"].top(10)                     # [(owner, balance), ...]
+#   boards["victories"].rank(fighter_id)         # 0 for the first, None if absent
+#
+# Boards: "victories" and "win_ratio" (fighters, the ratio counts fighters
+# with at least MIN_FIGHTS fights and breaks ties on victories), "owners"
+# (fighters owned), "votes" and "funds" (Voting candidates, funds in wei).
+# The Voting boards follow the last Voting contract synced, they are cleared
+# when another deployment is synced.
+#
+# Each board is an indexable skip list ordered by score, highest first, and
+# by key on ties, with the width of every link stored next to it. An update
+# is a removal and an insertion, O(log n); rank-of-X and the k-th entry walk
+# down the levels adding widths, O(log n); top-K is that walk plus k steps.
+#
+# Fighters and owners come from the Birth and Transfer events of WSKCore
+# (scripts/event_indexer.py helpers). The fight counters have no event on
+# chain: record_fight applies a result as it is decided and load_fighters
+# seeds them from a FighterStore export (scripts/fighter_store.py). The
+# Voting contract has no events at all, so its mined transactions are
+# replayed through the VotingModel as in scripts/merkle_payouts.py.
+#
+# Everything is pickled to STATE_PATH with the last block read from each
+# contract, only blocks older than CONFIRMATIONS are read, and a restart
+# picks up from the next block. Boards are saved as {key: score} and rebuilt
+# on load. A reorganisation deeper than CONFIRMATIONS needs the state file
+# to be deleted and rebuilt.
+#
+#   brownie run scripts/leaderboard.py main           # sync WSKCore / Voting
+#   brownie run scripts/leaderboard.py main 100000    # benchmark, no chain
+
+STATE_PATH = os.path.join("reports", "leaderboards.pickle")
+REPORT_PATH = os.path.join("reports", "leaderboards.json")
+MAX_LEVEL = 32
+BRANCHING = 4
+MIN_FIGHTS = 10
+CONFIRMATIONS = 2
+BLOCK_CHUNK = 2000
+
+
+class _Node:
+    __slots__ = ("entry", "next", "width")
+
+    def __init__(self, entry, level):
+        self.entry = entry
+        self.next = [None] * level
+        # bottom-level steps to next[i], the end of the list counts as one
+        # past the last entry
+        self.width = [1] * level
+
+
+class SkipList:
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+        self._head = _Node(None, MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node.entry
+            node = node.next[0]
+
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and self._random.random() * BRANCHING < 1:
+            level += 1
+        return level
+
+    def _path(self, entry):
+        # The last node before entry on every level and its position
+        update = [self._head] * self._level
+        steps = [0] * self._level
+        node, position = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].entry < entry:
+                position += node.width[i]
+                node = node.next[i]
+            update[i], steps[i] = node, position
+        return update, steps
+
+    def insert(self, entry):
+        update, steps = self._path(entry)
+        level = self._random_level()
+        for i in range(self._level, level):
+            self._head.next[i] = None
+            self._head.width[i] = self._size + 1
+            update.append(self._head)
+            steps.append(0)
+        self._level = max(self._level, level)
+        node = _Node(entry, level)
+        position = steps[0] + 1
+        for i in range(level):
+            node.next[i] = update[i].next[i]
+            node.width[i] = steps[i] + update[i].width[i] + 1 - position
+            update[i].next[i] = node
+            update[i].width[i] = position - steps[i]
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, entry):
+        update, _ = self._path(entry)
+        node = update[0].next[0]
+        if node is None or node.entry != entry:
+            raise KeyError(entry)
+        for i in range(self._level):
+            if update[i].next[i] is node:
+                update[i].width[i] += node.width[i] - 1
+                update[i].next[i] = node.next[i]
+            else:
+                update[i].width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+
+    def rank(self, entry):
+        # 0-based position of entry, None when it is not in the list
+        update, steps = self._path(entry)
+        node = update[0].next[0]
+        if node is None or node.entry != entry:
+            return None
+        return steps[0]
+
+    def _node_at(self, index):
+        node, position = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and position + node.width[i] <= index + 1:
+                position += node.width[i]
+                node = node.next[i]
+        return node
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return self._node_at(index).entry
+
+    def slice(self, start, count):
+        # Up to count entries from position start
+        if start >= self._size or count <= 0:
+            return []
+        node = self._node_at(start)
+        entries = []
+        while node is not None and len(entries) < count:
+            entries.append(node.entry)
+            node = node.next[0]
+        return entries
+
+
+def _is_address(value):
+    return isinstance(value, str) and value.startswith("0x") and len(value) == 42
+
+
+def _order(score):
+    # Sort key of a score, highest first
+    if isinstance(score, tuple):
+        return tuple(-value for value in score)
+    return -score
+
+
+class Leaderboard:
+    def __init__(self, name, seed=None):
+        self.name = name
+        self._seed = seed
+        self._scores = {}
+        self._entries = SkipList(seed)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, key):
+        return key in self._scores
+
+    def score(self, key):
+        return self._scores.get(key)
+
+    def update(self, key, score):
+        previous = self._scores.get(key)
+        if previous == score:
+            return
+        if previous is not None:
+            self._entries.remove((_order(previous), key))
+        self._entries.insert((_order(score), key))
+        self._scores[key] = score
+
+    def add(self, key, amount):
+        self.update(key, (self._scores.get(key) or 0) + amount)
+
+    def remove(self, key):
+        if key not in self._scores:
+            return False
+        self._entries.remove((_order(self._scores.pop(key)), key))
+        return True
+
+    def rank(self, key):
+        if key not in self._scores:
+            return None
+        return self._entries.rank((_order(self._scores[key]), key))
+
+    def top(self, k=10, start=0):
+        return [(key, self._scores[key]) for _, key in self._entries.slice(start, k)]
+
+    def __getstate__(self):
+        return {"name": self.name, "seed": self._seed, "scores": self._scores}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], state["seed"])
+        for key, score in state["scores"].items():
+            self.update(key, score)
+
+
+class Leaderboards:
+    def __init__(self):
+        self.boards = {
+            name: Leaderboard(name)
+            for name in ("victories", "win_ratio", "owners", "votes", "funds")
+        }
+        self.fights = {}  # fighter -> [victories, defeats]
+        self.checkpoints = {}  # contract address -> last block read
+        self.voting = None  # address of the Voting contract on the boards
+        self.model = None  # its VotingModel
+        self.rejected = 0
+
+    def __getitem__(self, name):
+        return self.boards[name]
+
+    # Fighters
+
+    def on_birth(self, fighter):
+        fighter = int(fighter)
+        if fighter not in self.fights:
+            self.fights[fighter] = [0, 0]
+            self.boards["victories"].update(fighter, 0)
+
+    def on_transfer(self, sender, receiver, fighter):
+        owners = self.boards["owners"]
+        if sender != ZERO_ADDRESS:
+            owners.add(sender, -1)
+            if owners.score(sender) <= 0:
+                owners.remove(sender)
+        if receiver != ZERO_ADDRESS:
+            owners.add(receiver, 1)
+
+    def set_record(self, fighter, victories, defeats):
+        fighter, victories, defeats = int(fighter), int(victories), int(defeats)
+        self.fights[fighter] = [victories, defeats]
+        self.boards["victories"].update(fighter, victories)
+        if victories + defeats >= MIN_FIGHTS:
+            ratio = victories / (victories + defeats)
+            self.boards["win_ratio"].update(fighter, (ratio, victories))
+        else:
+            self.boards["win_ratio"].remove(fighter)
+
+    def record_fight(self, winner, loser):
+        for fighter, won in ((winner, True), (loser, False)):
+            victories, defeats = self.fights.get(int(fighter), (0, 0))
+            self.set_record(fighter, victories + won, defeats + (not won))
+
+    def load_fighters(self, columns, start_id=0):
+        # Seeds the fight counters from roster columns (load_roster), only
+        # the fighters whose counters changed are touched
+        for offset, (victories, defeats) in enumerate(
+            zip(columns["victories"].tolist(), columns["defeats"].tolist())
+        ):
+            fighter = start_id + offset
+            if self.fights.get(fighter, [0, 0]) != [victories, defeats]:
+                self.set_record(fighter, victories, defeats)
+
+    def sync_core(self, core, chunk=BLOCK_CHUNK, confirmations=CONFIRMATIONS):
+        address = str(core.address)
+        events = web3.eth.contract(address=address, abi=core.abi).events
+        topics = {
+            event_topic(core, "Birth"): events.Birth(),
+            event_topic(core, "Transfer"): events.Transfer(),
+        }
+        start = self._start_block(core)
+        head = web3.eth.block_number - confirmations
+        applied = 0
+        for _, end, logs in scan_logs(address, list(topics), start, head, chunk):
+            for log in logs:
+                event = topics[log["topics"][0].hex()].processLog(log)
+                if event.event == "Birth":
+                    self.on_birth(event.args.fighterId)
+                else:
+                    self.on_transfer(
+                        event.args["from"], event.args.to, event.args.tokenId
+                    )
+            self.checkpoints[address] = end
+            applied += len(logs)
+        return applied
+
+    # Voting
+
+    def on_voting_call(self, function, sender, args):
+        # Refreshes the standings of every candidate the call can have changed,
+        # a candidate that delegated leaves the boards
+        model = self.model
+        voter = model.account_id(sender)
+        touched = {voter, model.elected, int(model.voter_to_candidate[voter])}
+        touched.update(model.account_id(arg) for arg in args if _is_address(arg))
+        for candidate in touched - {NO_CANDIDATE}:
+            address = model.address_of(candidate)
+            if not model.is_candidate[candidate]:
+                self.boards["votes"].remove(address)
+                self.boards["funds"].remove(address)
+                continue
+            self.boards["votes"].update(address, int(model.number_of_votes[candidate]))
+            self.boards["funds"].update(
+                address, int(model.fund_amount[candidate]) * WEI_PER_UNIT
+            )
+
+    def follow_voting(self, address):
+        # The votes and funds boards hold the candidates of one Voting
+        # deployment, following another one starts them over from its
+        # deployment
+        if address == self.voting:
+            return
+        for followed in (self.voting, address):
+            self.checkpoints.pop(followed, None)
+        self.voting = address
+        self.model = None
+        for name in ("votes", "funds"):
+            self.boards[name] = Leaderboard(name)
+
+    def sync_voting(self, voting, confirmations=CONFIRMATIONS):
+        address = str(voting.address)
+        self.follow_voting(address)
+        start = self._start_block(voting)
+        head = web3.eth.block_number - confirmations
+        applied = 0
+        if head < start:
+            return applied
+        for tx in voting_transactions(voting, start, head):
+            if tx["to"] is None:
+                self.model = VotingModel(deployer(tx))
+                continue
+            if self.model is None:
+                raise ValueError(f"No deployment of {address} from block {start}")
+            call = apply_transaction(self.model, voting, tx)
+            if call is None:
+                self.rejected += 1
+                continue
+            self.on_voting_call(*call)
+            applied += 1
+        self.checkpoints[address] = head
+        return applied
+
+    def _start_block(self, contract):
+        address = str(contract.address)
+        if address in self.checkpoints:
+            return self.checkpoints[address] + 1
+        return contract.tx.block_number if contract.tx else 0
+
+    # Persistence
+
+    def save(self, path=STATE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def _timings(query, keys):
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        query(key)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, 10**6)
+
+
+def simulate(fighters, fights, owners, batch, rng):
+    # Fights from scripts/fight_engine.py and random transfers applied one by
+    # one, returns (boards, roster, updates)
+    roster = random_roster(fighters, rng)
+    boards = Leaderboards()
+    addresses = [f"0x{i:040x}" for i in range(1, owners + 1)]
+    holders = rng.integers(0, owners, fighters).tolist()
+    for fighter, holder in enumerate(holders):
+        boards.on_birth(fighter)
+        boards.on_transfer(ZERO_ADDRESS, addresses[holder], fighter)
+    updates = 2 * fighters
+    for _ in range(fights // batch):
+        a = rng.integers(0, fighters, batch)
+        b = (a + rng.integers(1, fighters, batch)) % fighters
+        winners = fight(roster, a, b, rng)
+        for winner, x, y in zip(winners.tolist(), a.tolist(), b.tolist()):
+            boards.record_fight(winner, y if winner == x else x)
+        updates += 2 * batch
+    for fighter in rng.integers(0, fighters, batch).tolist():
+        receiver = int(rng.integers(owners))
+        boards.on_transfer(addresses[holders[fighter]], addresses[receiver], fighter)
+        holders[fighter] = receiver
+        updates += 1
+    return boards, roster, updates
+
+
+def benchmark(fighters=100000, fights=200_000, owners=5000, batch=10000, seed=0):
+    # Query latencies in microseconds
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    boards, _, updates = simulate(fighters, fights, owners, batch, rng)
+    elapsed = time.perf_counter() - start
+
+    victories = boards["victories"]
+    sample = rng.integers(0, fighters, 10000).tolist()
+    report = {
+        "fighters": fighters,
+        "fights": fights,
+        "owners": owners,
+        "updates": updates,
+        "updates_per_second": round(updates / elapsed, 1),
+        "rank_us": _timings(victories.rank, sample),
+        "top10_us": _timings(lambda _: victories.top(10), sample),
+        "top100_us": _timings(lambda _: victories.top(100), sample),
+        "win_ratio_rank_us": _timings(boards["win_ratio"].rank, sample),
+    }
+    return report
+
+
+def main(fighters=None):
+    if fighters is not None:
+        report = benchmark(int(fighters))
+        os.makedirs("reports", exist_ok=True)
+        with open(REPORT_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(
+            f"{report['updates']} updates, {report['updates_per_second']} updates/s, "
+            f"rank p50 {report['rank_us']['p50']}us, "
+            f"top 10 p50 {report['top10_us']['p50']}us"
+        )
+        return report
+
+    boards = Leaderboards.load()
+    if len(WSKCore):
+        core = WSKCore[-1]
+        print(f"{boards.sync_core(core)} fighter events applied from {core.address}")
+        if os.path.exists(os.path.join("fighters", "meta.json")):
+            boards.load_fighters(load_roster())
+    if len(Voting):
+        voting = Voting[-1]
+        print(
+            f"{boards.sync_voting(voting)} Voting calls applied from {voting.address}"
+        )
+    boards.save()
+    print(f"Leaderboards of {network.show_active()} saved to {STATE_PATH}")
+    for name, board in boards.boards.items():
+        print(f"{name}: {board.top(5)}")
+    return boards
@@ -0,0 +1,245 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import Voting, accounts
+from scripts.helpful_scripts import get_account
+from scripts.receipt_tracker import ReceiptTracker, shared_tracker
+from scripts.stats import summarize
+from scripts.tx_pipeline import TxPipeline
+from web3 import Web3
+
+# Drives a Voting deployment on a local chain with many accounts at once and
+# reports throughput, submit-to-receipt latency percentiles, revert rates and
+# gas per operation.
+#
+#   brownie run scripts/load_test.py main 2000 10000 "runAsCandidate=1,vote=5,fund=3,claim=0.5"
+#
+# Each simulated user sends its own operations one after the other (submit,
+# wait for the receipt, next) and `concurrency` users run at the same time.
+# Operations are chosen to be valid from the client's point of view, reverts
+# come from the races between users, like they would on a live election.
+# After the voting phase the owner elects a candidate and a share of the
+# eligible funders (the `claim` weight, between 0 and 1) claim their refunds
+# concurrently.
+
+REPORT_PATH = os.path.join("reports", "load_test.json")
+DEFAULT_MIX = {"runAsCandidate": 1, "vote": 5, "fund": 3, "delegate": 0.2, "claim": 1}
+GAS_LIMIT = 500_000
+LATENCY_POLL_INTERVAL = 0.1
+FUNDING_AMOUNT = Web3.toWei("0.01", "ether")
+ACCOUNT_BALANCE = Web3.toWei("0.1", "ether")
+
+
+def parse_mix(mix):
+    if not mix:
+        return dict(DEFAULT_MIX)
+    weights = {name: 0 for name in DEFAULT_MIX}
+    for item in mix.split(","):
+        name, weight = item.split("=")
+        if name not in weights:
+            raise ValueError(f"Unknown operation {name}")
+        weights[name] = float(weight)
+    return weights
+
+
+class Recorder:
+    # Transactions are sent raw with a fixed gas limit, so that reverts are
+    # mined instead of failing estimation, and every receipt is resolved by
+    # one receipt tracker. Latencies are only as precise as its poll interval.
+    def __init__(self, tracker=None):
+        self.samples = []
+        self.tracker = tracker or ReceiptTracker(poll_interval=LATENCY_POLL_INTERVAL)
+        self._lock = threading.Lock()
+
+    def send(self, operation, method, *args, sender, value=0):
+        tx = {
+            "to": method._address,
+            "data": method.encode_input(*args),
+            "value": value,
+            "gas": GAS_LIMIT,
+        }
+        start = time.perf_counter()
+        try:
+            transaction = self.tracker.send(sender, tx).wait()
+            status, gas_used = transaction.status, transaction.gas_used
+        except Exception:
+            status, gas_used = 0, None
+        sample = (operation, time.perf_counter() - start, status, gas_used)
+        with self._lock:
+            self.samples.append(sample)
+        return status == 1
+
+
+class Election:
+    # What the load generator believes the election looks like, used to pick
+    # operations that should succeed.
+    def __init__(self, voting, users, rng):
+        self.voting = voting
+        self.users = users
+        self.rng = rng
+        self.candidates = []
+        self.votes = {}
+        self.funders = set()
+        self._lock = threading.Lock()
+
+    def plan(self, user, weights):
+        with self._lock:
+            names = []
+            if user not in self.candidates:
+                names.append("runAsCandidate")
+            if self.candidates and user not in self.votes:
+                names.append("vote")
+            if user in self.votes:
+                names.append("fund")
+            if user in self.candidates and len(self.candidates) > 1:
+                names.append("delegate")
+            names = [name for name in names if weights[name] > 0]
+            if not names:
+                return None
+            operation = self.rng.choices(names, [weights[name] for name in names])[0]
+            if operation == "runAsCandidate":
+                self.candidates.append(user)
+                return operation, self.voting.runAsCandidate, (f"{user}"[:8],), 0
+            if operation == "vote":
+                candidate = self.rng.choice(self.candidates)
+                self.votes[user] = candidate
+                return operation, self.voting.vote, (candidate,), 0
+            if operation == "fund":
+                self.funders.add(user)
+                return operation, self.voting.fund, (self.votes[user],), FUNDING_AMOUNT
+            delegatee = self.rng.choice([c for c in self.candidates if c != user])
+            self.candidates.remove(user)
+            return operation, self.voting.delegate, (delegatee,), 0
+
+
+def create_users(count):
+    owner = get_account()
+    users = [accounts.add() for _ in range(count)]
+    pipeline = TxPipeline(tracker=shared_tracker())
+    for user in users:
+        pipeline.transfer(owner, user, ACCOUNT_BALANCE)
+    pipeline.run()
+    return users
+
+
+def run_phase(name, jobs, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda job: job(), jobs))
+    elapsed = time.perf_counter() - start
+    print(f"{name} phase: {len(jobs)} users in {elapsed:.2f}s")
+    return elapsed
+
+
+def build_report(recorder, elapsed):
+    report = {"operations": {}, "elapsed": round(elapsed, 3)}
+    by_operation = {}
+    for operation, latency, status, gas_used in recorder.samples:
+        by_operation.setdefault(operation, []).append((latency, status, gas_used))
+    total = 0
+    for operation, samples in by_operation.items():
+        reverts = sum(1 for _, status, _ in samples if status != 1)
+        gas = [gas for _, status, gas in samples if status == 1 and gas]
+        report["operations"][operation] = {
+            "count": len(samples),
+            "reverts": reverts,
+            "revert_rate": round(reverts / len(samples), 4),
+            "tps": round(len(samples) / elapsed, 2),
+            "latency_ms": summarize([latency for latency, _, _ in samples], 1000),
+            "gas": round(sum(gas) / len(gas)) if gas else None,
+        }
+        total += len(samples)
+    report["total"] = total
+    report["tps"] = round(total / elapsed, 2)
+    return report
+
+
+def print_report(report):
+    print(f"\n{report['total']} transactions, {report['tps']} tx/s overall")
+    rpc = report.get("receipt_rpc")
+    if rpc:
+        print(f"Receipts: {rpc['calls']} RPC calls in {rpc['requests']} requests")
+    print(
+        f"{'operation':<28}{'count':>7}{'tps':>9}{'revert%':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'gas':>9}"
+    )
+    for operation, result in report["operations"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{operation:<28}{result['count']:>7}{result['tps']:>9}"
+            f"{result['revert_rate'] * 100:>9.2f}{latency['p50']:>9}"
+            f"{latency['p95']:>9}{latency['p99']:>9}{result['gas'] or '-':>9}"
+        )
+
+
+def main(users=1000, operations=5000, mix=None, concurrency=64, seed=0):
+    users, operations, concurrency = int(users), int(operations), int(concurrency)
+    weights = parse_mix(mix)
+    rng = random.Random(int(seed))
+    owner = get_account()
+
+    print(f"Creating and funding {users} accounts")
+    population = create_users(users)
+    voting = Voting.deploy({"from": owner})
+    transaction = voting.startVotingPeriod(1, {"from": owner})
+    transaction.wait(1)
+
+    election = Election(voting, population, rng)
+    recorder = Recorder()
+    per_user = {user: 0 for user in population}
+    for _ in range(operations):
+        per_user[rng.choice(population)] += 1
+
+    def user_session(user, count):
+        def run():
+            for _ in range(count):
+                planned = election.plan(user, weights)
+                if planned is None:
+                    return
+                operation, method, args, value = planned
+                recorder.send(operation, method, *args, sender=user, value=value)
+
+        return run
+
+    jobs = [user_session(user, count) for user, count in per_user.items() if count]
+    elapsed = run_phase("Voting", jobs, concurrency)
+
+    if election.candidates:
+        recorder.send("electCandidate", voting.electCandidate, sender=owner)
+        elected = voting.electedCandidate()
+        claimers = [
+            user
+            for user in election.funders
+            if election.votes[user] != elected and rng.random() < weights["claim"]
+        ]
+        jobs = [
+            lambda user=user: recorder.send(
+                "voterFundClaim", voting.voterFundClaim, sender=user
+            )
+            for user in claimers
+        ]
+        jobs.append(
+            lambda: recorder.send(
+                "ElectedCandidateFundClaim",
+                voting.ElectedCandidateFundClaim,
+                sender=accounts.at(elected),
+            )
+        )
+        elapsed += run_phase("Claim", jobs, concurrency)
+
+    report = build_report(recorder, elapsed)
+    report["users"] = users
+    report["concurrency"] = concurrency
+    report["mix"] = weights
+    tracker = recorder.tracker
+    report["receipt_rpc"] = {"requests": tracker.requests, "calls": tracker.calls}
+    print_report(report)
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {REPORT_PATH}")
+    return report
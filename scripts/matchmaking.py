@@ -0,0 +1,240 @@
+import json
+import os
+import time
+
+import numpy as np
+from scripts.fight_engine import LEVEL_EXPERIENCE, fight, level_for, random_roster
+from scripts.stats import summarize
+
+# Matchmaking queue for fighters waiting for a fight.
+#
+#   queue = MatchQueue()
+#   queue.insert(fighter_id, level, vector, now)
+#   queue.cancel(fighter_id)
+#   pairs = queue.match_all(now)      # [(fighter, opponent)], longest wait first
+#
+# Queued fighters are indexed by level, one bucket per level holding their
+# ids and stat vectors in NumPy arrays (removal moves the last entry into the
+# freed slot). A fighter is matched with its nearest neighbour on the stat
+# vector among the buckets within its level window, at most `tolerance` away,
+# with LEVEL_PENALTY added per level of difference so that equal levels win
+# ties. The window starts at the fighter's level and `tolerance` and widens
+# by one level and WIDEN_TOLERANCE every `widen_every` seconds of waiting, up
+# to MAX_LEVEL_WINDOW.
+#
+# The stat vector (stat_vectors) is the progress towards the next level and
+# agility, speed and strengh over STAT_SCALE, so every component is about 0..1.
+#
+#   brownie run scripts/matchmaking.py main         # benchmark, no chain needed
+
+STAT_SCALE = 100
+TOLERANCE = 0.15
+WIDEN_TOLERANCE = 0.05
+WIDEN_EVERY = 5.0
+MAX_LEVEL_WINDOW = 10
+LEVEL_PENALTY = 0.1
+REPORT_PATH = os.path.join("reports", "matchmaking.json")
+
+
+def stat_vectors(roster, ids):
+    ids = np.asarray(ids, dtype=np.int64)
+    level = roster["level"][ids].astype(np.float64)
+    floor = LEVEL_EXPERIENCE * level * level
+    ceiling = LEVEL_EXPERIENCE * (level + 1) * (level + 1)
+    progress = (roster["experience"][ids] - floor) / (ceiling - floor)
+    vectors = [np.clip(progress, 0, 1)]
+    for stat in ("agility", "speed", "strengh"):
+        vectors.append(roster[stat][ids] / STAT_SCALE)
+    return np.stack(vectors, axis=1).astype(np.float32)
+
+
+class _Bucket:
+    def __init__(self, dimensions, capacity=16):
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.vectors = np.empty((capacity, dimensions), dtype=np.float32)
+        self.size = 0
+
+    def add(self, fighter, vector):
+        if self.size == len(self.ids):
+            ids = np.empty(2 * self.size, dtype=np.int64)
+            vectors = np.empty((2 * self.size, self.vectors.shape[1]), np.float32)
+            ids[: self.size] = self.ids
+            vectors[: self.size] = self.vectors
+            self.ids, self.vectors = ids, vectors
+        self.ids[self.size] = fighter
+        self.vectors[self.size] = vector
+        self.size += 1
+        return self.size - 1
+
+    def remove(self, slot):
+        # Returns the fighter moved into the freed slot, if any
+        self.size -= 1
+        if slot == self.size:
+            return None
+        self.ids[slot] = self.ids[self.size]
+        self.vectors[slot] = self.vectors[self.size]
+        return int(self.ids[slot])
+
+    def nearest(self, vector, skip=None):
+        # (slot, distance) of the closest vector, skipping one slot
+        if self.size == 0 or (self.size == 1 and skip == 0):
+            return None, np.inf
+        distances = np.linalg.norm(self.vectors[: self.size] - vector, axis=1)
+        if skip is not None:
+            distances[skip] = np.inf
+        slot = int(np.argmin(distances))
+        return slot, float(distances[slot])
+
+
+class MatchQueue:
+    def __init__(self, dimensions=4, tolerance=TOLERANCE, widen_every=WIDEN_EVERY):
+        self.dimensions = dimensions
+        self.tolerance = tolerance
+        self.widen_every = widen_every
+        self.waits = []
+        self._buckets = {}
+        self._where = {}  # fighter -> (level, slot)
+        self._queued_at = {}  # fighter -> time, in queueing order
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, fighter):
+        return fighter in self._where
+
+    def insert(self, fighter, level, vector, now=None):
+        fighter, level = int(fighter), int(level)
+        if fighter in self._where:
+            raise ValueError(f"Fighter {fighter} is already queued")
+        if level not in self._buckets:
+            self._buckets[level] = _Bucket(self.dimensions)
+        slot = self._buckets[level].add(fighter, vector)
+        self._where[fighter] = (level, slot)
+        self._queued_at[fighter] = time.monotonic() if now is None else now
+
+    def cancel(self, fighter):
+        fighter = int(fighter)
+        if fighter not in self._where:
+            return False
+        self._remove(fighter)
+        return True
+
+    def _remove(self, fighter):
+        level, slot = self._where.pop(fighter)
+        del self._queued_at[fighter]
+        moved = self._buckets[level].remove(slot)
+        if moved is not None:
+            self._where[moved] = (level, slot)
+
+    def window(self, waited):
+        # (levels either side, stat tolerance) after waiting `waited` seconds
+        steps = int(max(waited, 0) // self.widen_every)
+        return (
+            min(steps, MAX_LEVEL_WINDOW),
+            self.tolerance + WIDEN_TOLERANCE * steps,
+        )
+
+    def match(self, fighter, now=None):
+        # Matches a queued fighter and removes both from the queue. Returns
+        # the opponent, None when nobody is close enough yet.
+        fighter = int(fighter)
+        now = time.monotonic() if now is None else now
+        level, slot = self._where[fighter]
+        vector = self._buckets[level].vectors[slot].copy()
+        levels, tolerance = self.window(now - self._queued_at[fighter])
+        best, best_score = None, np.inf
+        for other in range(level - levels, level + levels + 1):
+            bucket = self._buckets.get(other)
+            if bucket is None:
+                continue
+            found, distance = bucket.nearest(vector, slot if other == level else None)
+            score = distance + LEVEL_PENALTY * abs(other - level)
+            if distance <= tolerance and score < best_score:
+                best, best_score = int(bucket.ids[found]), score
+        if best is None:
+            return None
+        for matched in (fighter, best):
+            self.waits.append(now - self._queued_at[matched])
+            self._remove(matched)
+        return best
+
+    def match_all(self, now=None):
+        # One matchmaking pass, the fighters that waited longest go first
+        now = time.monotonic() if now is None else now
+        pairs = []
+        for fighter in list(self._queued_at):
+            if fighter in self._where:
+                opponent = self.match(fighter, now)
+                if opponent is not None:
+                    pairs.append((fighter, opponent))
+        return pairs
+
+
+def simulate(
+    fighters=20000,
+    ticks=300,
+    arrivals=400,
+    cancel_rate=0.01,
+    tick_seconds=1.0,
+    seed=0,
+):
+    # Fighters join the queue at random, some give up, matched pairs fight
+    # (scripts/fight_engine.py) and can queue again. Time is simulated, the
+    # operations per second are measured on the wall clock.
+    rng = np.random.default_rng(seed)
+    roster = random_roster(fighters, rng)
+    roster["experience"][:] = rng.integers(0, 10**5, fighters)
+    roster["level"][:] = level_for(roster["experience"])
+    queue = MatchQueue()
+    inserts = cancels = matches = 0
+    elapsed = 0.0
+    for tick in range(ticks):
+        now = tick * tick_seconds
+        joining = rng.choice(fighters, size=arrivals, replace=False)
+        joining = [f for f in joining.tolist() if f not in queue]
+        leaving = rng.choice(fighters, size=int(arrivals * cancel_rate))
+        vectors = stat_vectors(roster, joining)
+        levels = roster["level"][joining]
+
+        start = time.perf_counter()
+        for fighter, level, vector in zip(joining, levels, vectors):
+            queue.insert(fighter, level, vector, now)
+        for fighter in leaving.tolist():
+            cancels += queue.cancel(fighter)
+        pairs = queue.match_all(now)
+        elapsed += time.perf_counter() - start
+
+        inserts += len(joining)
+        matches += len(pairs)
+        if pairs:
+            a, b = zip(*pairs)
+            fight(roster, a, b, rng)
+
+    operations = inserts + cancels + matches
+    report = {
+        "fighters": fighters,
+        "ticks": ticks,
+        "inserts": inserts,
+        "cancels": cancels,
+        "matches": matches,
+        "queued": len(queue),
+        "elapsed": round(elapsed, 3),
+        "operations_per_second": round(operations / elapsed, 1),
+        "matches_per_second": round(matches / elapsed, 1),
+        "wait_seconds": summarize(queue.waits),
+    }
+    return report
+
+
+def main(fighters=20000, ticks=300, arrivals=400):
+    report = simulate(int(fighters), int(ticks), int(arrivals))
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    waits = report["wait_seconds"]
+    print(
+        f"{report['matches']} matches, {report['operations_per_second']} operations/s, "
+        f"{report['matches_per_second']} matches/s"
+    )
+    print(f"Queue wait p50 {waits['p50']}s, p95 {waits['p95']}s, p99 {waits['p99']}s")
+    return report
@@ -0,0 +1,328 @@
+import json
+import os
+import time
+
+import numpy as np
+from brownie import MerklePayout, Voting, web3
+from eth_hash.auto import keccak
+from scripts.helpful_scripts import get_account, rpc_batch
+from scripts.voting_model import (
+    NO_CANDIDATE,
+    WEI_PER_UNIT,
+    Revert,
+    VotingModel,
+    simulate,
+)
+
+# Settles an election with one Merkle root instead of the per-address claims
+# of the Voting contract.
+#
+#   brownie run scripts/merkle_payouts.py main           # Voting[-1], table only
+#   brownie run scripts/merkle_payouts.py deploy         # saved table, on chain
+#   brownie run scripts/merkle_payouts.py main 1000000   # benchmark on the model
+#
+# The Voting contract has no events to read the final state from, so the
+# successful transactions sent to it are fetched in batches of blocks,
+# decoded and replayed through the VotingModel (scripts/voting_model.py).
+# The payout table is then every voter refund (voters who funded a candidate
+# that was not elected and did not claim yet) and the elected candidate's
+# funds.
+#
+# Leaf i is keccak256(abi.encodePacked(uint256 i, address account, uint256
+# amount)) and inner nodes hash their two children in sorted order, as
+# OpenZeppelin's MerkleProof expects. The last node of an odd level is moved
+# up as it is. MerklePayout (contracts/MerklePayout.sol) verifies a claim
+# against the root and marks its index in a bitmap, so a claim costs the same
+# whatever the number of voters, up to the proof length (log2 of the table).
+#
+# The payout must be the only way to claim: it only accepts funds from the
+# Voting contract it replaces, and is only deployed against a Voting that
+# can hand over its balance and close voterFundClaim and
+# ElectedCandidateFundClaim (HANDOVER). Against a Voting that keeps paying
+# per-address claims, deploy_payout refuses to deploy, since every entry
+# could then be paid twice.
+#
+# The Voting contract of this project has no HANDOVER function yet, so the
+# constant-gas claim path cannot be enabled: main() builds and saves the
+# table, and `deploy` is expected to refuse until Voting gains one.
+#
+# Leaves and pairs are laid out with NumPy and only the hashing loops over
+# rows; 10^6 entries build in a few seconds.
+
+REPORT_PATH = os.path.join("reports", "payouts")
+BLOCK_CHUNK = 100
+LEAF_BYTES = 84
+# Voting function that sends its balance to a payout and closes its own claims
+HANDOVER = "handOverClaims"
+
+
+def _checksum(address):
+    return web3.toChecksumAddress(address)
+
+
+def voting_transactions(voting, from_block=None, to_block=None, chunk=BLOCK_CHUNK):
+    # Successful transactions sent to voting, its deployment included, in
+    # the order they were mined
+    address = str(voting.address).lower()
+    if from_block is None:
+        from_block = voting.tx.block_number if voting.tx else 0
+    if to_block is None:
+        to_block = web3.eth.block_number
+    for start in range(from_block, to_block + 1, chunk):
+        numbers = range(start, min(start + chunk, to_block + 1))
+        blocks = rpc_batch([("eth_getBlockByNumber", [hex(n), True]) for n in numbers])
+        sent = [
+            tx
+            for block in blocks
+            for tx in block["transactions"]
+            if (tx["to"] or "").lower() == address or tx["to"] is None
+        ]
+        receipts = rpc_batch(
+            [("eth_getTransactionReceipt", [tx["hash"]]) for tx in sent]
+        )
+        for tx, receipt in zip(sent, receipts):
+            if int(receipt["status"], 16) != 1:
+                continue
+            if tx["to"] is None:
+                if (receipt.get("contractAddress") or "").lower() != address:
+                    continue
+            yield tx
+
+
+def deployer(tx):
+    # The owner of the Voting contract, for its deployment transaction
+    return _checksum(tx["from"]) if tx["to"] is None else None
+
+
+def apply_transaction(model, voting, tx):
+    # Applies a mined call to the model, returns (function, sender, args) or
+    # None when the model rejects it (see compare_with_contract)
+    signature, args = voting.decode_input(tx["input"])
+    function, sender = signature.split("(")[0], _checksum(tx["from"])
+    args = [str(arg) if isinstance(arg, str) else arg for arg in args]
+    try:
+        model.apply(function, sender, *args, value=int(tx["value"], 16))
+    except Revert:
+        return None
+    return function, sender, args
+
+
+def replay(voting, from_block=None, to_block=None, chunk=BLOCK_CHUNK):
+    # The VotingModel state after every successful transaction sent to voting
+    model, calls = None, []
+    for tx in voting_transactions(voting, from_block, to_block, chunk):
+        if tx["to"] is None:
+            model = VotingModel(deployer(tx))
+        else:
+            calls.append(tx)
+    if model is None:
+        raise ValueError(f"No deployment of {voting.address} from block {from_block}")
+
+    mismatches = 0
+    for tx in calls:
+        if apply_transaction(model, voting, tx) is None:
+            mismatches += 1
+    if mismatches:
+        print(f"{mismatches} mined transactions were rejected by the model")
+    return model
+
+
+def payout_table(model):
+    # (account ids, amounts in gwei) of everything still owed after the election
+    if model.elected == NO_CANDIDATE:
+        raise Revert("no candidate has been elected")
+    accounts = np.arange(model.size)
+    refunds = model.voter_to_amount_funded[: model.size].copy()
+    refunds[model.voter_to_candidate[: model.size] == model.elected] = 0
+    refunds[model.elected] += model.fund_amount[model.elected]
+    owed = refunds > 0
+    return accounts[owed], refunds[owed]
+
+
+def account_addresses(model, accounts):
+    # (n, 20) address bytes. Simulated accounts have no address, their id
+    # stands in for it.
+    addresses = np.zeros((len(accounts), 20), dtype=np.uint8)
+    ids = accounts.astype(">u8").view(np.uint8).reshape(-1, 8)
+    addresses[:, 12:] = ids
+    rows = {account: row for row, account in enumerate(accounts.tolist())}
+    for account, address in model.known_addresses().items():
+        if account in rows and address.startswith("0x"):
+            addresses[rows[account]] = np.frombuffer(
+                bytes.fromhex(address[2:]), np.uint8
+            )
+    return addresses
+
+
+def _wei_limbs(amounts):
+    # gwei (int64) to wei as big-endian (high, low) uint64 limbs, exactly
+    amounts = amounts.astype(np.uint64)
+    scale = np.uint64(WEI_PER_UNIT)
+    high = (amounts >> np.uint64(32)) * scale
+    low = (amounts & np.uint64(0xFFFFFFFF)) * scale
+    shifted = (high & np.uint64(0xFFFFFFFF)) << np.uint64(32)
+    total = shifted + low
+    carry = (total < shifted).astype(np.uint64)
+    return (high >> np.uint64(32)) + carry, total
+
+
+def _hash_rows(rows):
+    width = rows.shape[1]
+    data = rows.tobytes()
+    digests = b"".join(
+        keccak(data[start : start + width]) for start in range(0, len(data), width)
+    )
+    return np.frombuffer(digests, dtype=np.uint8).reshape(-1, 32)
+
+
+def _hash_level(level):
+    pairs = len(level) // 2
+    left = np.ascontiguousarray(level[0 : 2 * pairs : 2])
+    right = np.ascontiguousarray(level[1 : 2 * pairs : 2])
+    # sorted pairs, comparing the hashes as four big-endian words
+    left_words = left.view(">u8")
+    right_words = right.view(">u8")
+    swap = np.zeros(pairs, dtype=bool)
+    equal = np.ones(pairs, dtype=bool)
+    for word in range(4):
+        swap |= equal & (left_words[:, word] > right_words[:, word])
+        equal &= left_words[:, word] == right_words[:, word]
+    rows = np.concatenate([left, right], axis=1)
+    rows[swap] = np.concatenate([right[swap], left[swap]], axis=1)
+    parents = _hash_rows(rows)
+    if len(level) % 2:
+        parents = np.concatenate([parents, level[-1:]])
+    return parents
+
+
+class PayoutTree:
+    def __init__(self, addresses, amounts, levels=None):
+        self.addresses = addresses
+        self.amounts = np.asarray(amounts, dtype=np.int64)
+        self.levels = levels or self._build()
+        self._index = None
+
+    def _build(self):
+        count = len(self.amounts)
+        if not count:
+            raise ValueError("Nothing to pay out")
+        leaves = np.zeros((count, LEAF_BYTES), dtype=np.uint8)
+        leaves[:, 24:32] = np.arange(count, dtype=">u8").view(np.uint8).reshape(-1, 8)
+        leaves[:, 32:52] = self.addresses
+        high, low = _wei_limbs(self.amounts)
+        leaves[:, 68:76] = high.astype(">u8").view(np.uint8).reshape(-1, 8)
+        leaves[:, 76:84] = low.astype(">u8").view(np.uint8).reshape(-1, 8)
+        levels = [_hash_rows(leaves)]
+        while len(levels[-1]) > 1:
+            levels.append(_hash_level(levels[-1]))
+        return levels
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @property
+    def root(self):
+        return "0x" + self.levels[-1][0].tobytes().hex()
+
+    @property
+    def total(self):
+        return int(self.amounts.sum()) * WEI_PER_UNIT
+
+    def account(self, index):
+        return _checksum("0x" + self.addresses[index].tobytes().hex())
+
+    def index_of(self, address):
+        if self._index is None:
+            self._index = {
+                row.tobytes(): index for index, row in enumerate(self.addresses)
+            }
+        return self._index[bytes.fromhex(str(address)[2:])]
+
+    def proof(self, index):
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append("0x" + level[sibling].tobytes().hex())
+            index //= 2
+        return proof
+
+    def claim(self, index):
+        # The arguments of MerklePayout.claim for one entry of the table
+        return {
+            "index": index,
+            "account": self.account(index),
+            "amount": int(self.amounts[index]) * WEI_PER_UNIT,
+            "proof": self.proof(index),
+        }
+
+    def save(self, path=REPORT_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            f"{path}.npz", *self.levels, addresses=self.addresses, amounts=self.amounts
+        )
+        with open(f"{path}.json", "w") as f:
+            json.dump(
+                {"root": self.root, "count": len(self), "total": str(self.total)},
+                f,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, path=REPORT_PATH):
+        with np.load(f"{path}.npz") as saved:
+            levels = [saved[f"arr_{i}"] for i in range(len(saved.files) - 2)]
+            return cls(saved["addresses"], saved["amounts"], levels)
+
+
+def build(model):
+    accounts, amounts = payout_table(model)
+    return PayoutTree(account_addresses(model, accounts), amounts)
+
+
+def deploy_payout(tree, voting, account):
+    # A MerklePayout funded by voting, which closes its per-address claims
+    if HANDOVER not in voting.signatures:
+        raise ValueError(
+            f"Voting {voting.address} still pays per-address claims and cannot "
+            f"hand them over ({HANDOVER}), a payout would pay them twice"
+        )
+    payout = MerklePayout.deploy(tree.root, voting.address, {"from": account})
+    transaction = getattr(voting, HANDOVER)(payout.address, {"from": account})
+    transaction.wait(1)
+    if payout.balance() < tree.total:
+        raise ValueError(
+            f"Voting handed over {payout.balance()} wei for a table of {tree.total}"
+        )
+    return payout
+
+
+def benchmark(voters):
+    model = simulate(voters, max(voters // 100, 10), settle=False)
+    start = time.perf_counter()
+    tree = build(model)
+    elapsed = time.perf_counter() - start
+    print(f"Built a tree of {len(tree)} payouts in {elapsed:.2f}s, root {tree.root}")
+    print(f"Proofs are {len(tree.proof(0))} hashes long")
+    return tree
+
+
+def main(voters=None):
+    if voters is not None:
+        return benchmark(int(voters))
+    start = time.perf_counter()
+    model = replay(Voting[-1])
+    tree = build(model)
+    tree.save()
+    elapsed = time.perf_counter() - start
+    print(f"{len(tree)} payouts of {tree.total} wei in {elapsed:.2f}s")
+    print(f"Merkle root {tree.root}, written to {REPORT_PATH}.npz")
+    return tree
+
+
+def deploy(path=REPORT_PATH):
+    # Deploys the table saved by main() for Voting[-1]
+    tree = PayoutTree.load(path)
+    payout = deploy_payout(tree, Voting[-1], get_account())
+    print(f"MerklePayout deployed to {payout.address}")
+    return payout
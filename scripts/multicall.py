@@ -0,0 +1,126 @@
+from brownie import Multicall, Voting, WSKCore, exceptions
+from scripts.helpful_scripts import get_account
+
+# Packs many view calls into a handful of eth_calls through the Multicall
+# contract and decodes the results into columns.
+#
+#   reader = BatchReader()
+#   fighters = reader.read_columns(core.getFighter, [(i,) for i in range(1, 10001)])
+#   fighters["level"][42]
+#
+# Chunks start at `max_calls` calls and are sized down from the average
+# response size seen so far to stay under `max_response_bytes`. A chunk that
+# the node rejects (out of gas, response too large, timeout) is split in two
+# and retried, and later chunks keep the smaller size.
+
+
+def deploy_multicall():
+    account = get_account()
+    multicall = Multicall.deploy({"from": account})
+    print(f"Multicall deployed to {multicall.address}")
+    return multicall
+
+
+def get_multicall():
+    if len(Multicall) == 0:
+        return deploy_multicall()
+    return Multicall[-1]
+
+
+def output_names(method):
+    outputs = method.abi["outputs"]
+    if len(outputs) == 1 and not outputs[0]["name"]:
+        return [method.abi["name"]]
+    return [output["name"] or f"output{i}" for i, output in enumerate(outputs)]
+
+
+class BatchReader:
+    def __init__(self, multicall=None, max_calls=1000, max_response_bytes=2_000_000):
+        self.multicall = multicall or get_multicall()
+        self.max_calls = max_calls
+        self.max_response_bytes = max_response_bytes
+        self.eth_calls = 0
+        self._bytes_per_call = None
+
+    def _chunk_size(self):
+        if not self._bytes_per_call:
+            return self.max_calls
+        fits = int(self.max_response_bytes / self._bytes_per_call)
+        return max(1, min(self.max_calls, fits))
+
+    def _aggregate(self, calls, block_identifier):
+        self.eth_calls += 1
+        block_number, results = self.multicall.tryAggregate(
+            calls, block_identifier=block_identifier
+        )
+        size = sum(len(data) for _, data in results)
+        self._bytes_per_call = max(size / max(len(results), 1), 1)
+        return block_number, results
+
+    def _read_chunk(self, calls, block_identifier):
+        try:
+            return self._aggregate(calls, block_identifier)
+        except (ValueError, exceptions.VirtualMachineError, TimeoutError):
+            if len(calls) == 1:
+                raise
+            self.max_calls = max(1, len(calls) // 2)
+            middle = len(calls) // 2
+            block_number, head = self._read_chunk(calls[:middle], block_identifier)
+            _, tail = self._read_chunk(calls[middle:], block_number)
+            return block_number, head + tail
+
+    def read(self, requests, block_identifier=None):
+        # requests is a list of (method, args) pairs, e.g. (voting.voterToCandidate,
+        # (voter,)). Returns the decoded values in the same order, None for calls
+        # that reverted. Every chunk is read at the same block.
+        calls = [
+            (method._address, method.encode_input(*args)) for method, args in requests
+        ]
+        results = []
+        position = 0
+        while position < len(calls):
+            chunk = calls[position : position + self._chunk_size()]
+            block_identifier, raw = self._read_chunk(chunk, block_identifier)
+            results.extend(raw)
+            position += len(chunk)
+        decoded = []
+        for (method, _), (success, data) in zip(requests, results):
+            decoded.append(method.decode_output(data) if success else None)
+        return decoded
+
+    def read_columns(self, method, args_list, block_identifier=None):
+        # Reads one view for many argument tuples and returns a dict with one
+        # list per output, plus "success" for the calls that did not revert.
+        values = self.read([(method, args) for args in args_list], block_identifier)
+        names = output_names(method)
+        columns = {name: [] for name in names}
+        columns["success"] = []
+        for value in values:
+            columns["success"].append(value is not None)
+            if len(names) == 1:
+                value = (value,)
+            for name, field in zip(names, value or (None,) * len(names)):
+                columns[name].append(field)
+        return columns
+
+
+def read_fighters(fighter_ids, core=None, reader=None):
+    core = core or WSKCore[-1]
+    reader = reader or BatchReader()
+    return reader.read_columns(core.getFighter, [(i,) for i in fighter_ids])
+
+
+def read_election(addresses, voting=None, reader=None):
+    voting = voting or Voting[-1]
+    reader = reader or BatchReader()
+    args = [(address,) for address in addresses]
+    columns = reader.read_columns(voting.candidateToProfile, args)
+    columns.update(reader.read_columns(voting.voterToCandidate, args))
+    columns.update(reader.read_columns(voting.voterToAmountFunded, args))
+    columns.pop("success")
+    columns["address"] = list(addresses)
+    return columns
+
+
+def main():
+    deploy_multicall()
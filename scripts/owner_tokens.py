@@ -0,0 +1,64 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import WSKCore, web3
+from scripts.helpful_scripts import get_account
+
+# Lists the fighters of owners with the paginated tokensOfOwner(owner, offset,
+# limit) of WSKOwnership. The balance is read first, then every page is
+# fetched concurrently, all pinned to the same block so that transfers landing
+# in between do not shift the pages.
+#
+#   brownie run scripts/owner_tokens.py main 0xOwner 500
+
+PAGE_SIZE = 500
+WORKERS = 8
+
+
+def page_method(core):
+    return core.tokensOfOwner["address,uint256,uint256"]
+
+
+def tokens_of_owners(core, owners, page_size=PAGE_SIZE, workers=WORKERS):
+    # Pages of all the owners are requested at once from one pool.
+    block = web3.eth.block_number
+    method = page_method(core)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        balances = dict(
+            zip(
+                owners,
+                executor.map(
+                    lambda owner: core.balanceOf(owner, block_identifier=block), owners
+                ),
+            )
+        )
+        pages = {
+            owner: [
+                executor.submit(
+                    method, owner, offset, page_size, block_identifier=block
+                )
+                for offset in range(0, balances[owner], page_size)
+            ]
+            for owner in owners
+        }
+        return {
+            owner: [int(token) for page in futures for token in page.result()]
+            for owner, futures in pages.items()
+        }
+
+
+def tokens_of_owner(core, owner, page_size=PAGE_SIZE, workers=WORKERS):
+    return tokens_of_owners(core, [owner], page_size, workers)[owner]
+
+
+def main(owner=None, page_size=PAGE_SIZE):
+    core = WSKCore[-1]
+    owner = owner or get_account()
+    page_size = int(page_size)
+    start = time.time()
+    tokens = tokens_of_owner(core, owner, page_size)
+    elapsed = time.time() - start
+    pages = math.ceil(len(tokens) / page_size)
+    print(f"{owner} owns {len(tokens)} fighters, {pages} pages in {elapsed:.2f}s")
+    return tokens
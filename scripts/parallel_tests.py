@@ -0,0 +1,266 @@
+import argparse
+import glob
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+
+# Runs the brownie test suite sharded over a pool of local development chains,
+# one chain and one `brownie test` process per worker.
+#
+#   python scripts/parallel_tests.py -n 4
+#
+# The contracts are compiled once before the workers start, so that they all
+# find build/ up to date instead of compiling into it at the same time. Each
+# worker gets its own ganache instance on its own port, registered with
+# brownie as the development network `wsk-worker-<n>` for the run so that the
+# worker attaches to it (an entry left by an interrupted run is updated to
+# the current port and command), and removed from brownie's network config
+# afterwards. Tests are balanced across workers from the durations of the
+# previous run (longest first onto the least loaded worker), and the JUnit
+# results and gas profiles of every worker are merged into
+# reports/parallel_tests.json. Nothing leaves the machine.
+
+REPORTS = "reports"
+DURATIONS_PATH = os.path.join(REPORTS, "test_durations.json")
+REPORT_PATH = os.path.join(REPORTS, "parallel_tests.json")
+
+BASE_PORT = 8600
+CHAIN_CMD = "ganache-cli"
+CHAIN_ARGS = "--accounts 10 --hardfork istanbul --gasLimit 12000000 --mnemonic brownie"
+TEST_PATTERN = re.compile(r"^def (test\w*)\(", re.MULTILINE)
+
+
+def collect(paths, by_test):
+    # Test ids are read from the sources so that collection does not need a
+    # chain. Module level fixtures are rebuilt on every worker running a test
+    # of that module.
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                glob.glob(os.path.join(path, "**", "test_*.py"), recursive=True)
+            )
+        else:
+            files.append(path)
+    if not by_test:
+        return files
+    ids = []
+    for file in files:
+        with open(file) as f:
+            ids += [f"{file}::{name}" for name in TEST_PATTERN.findall(f.read())]
+    return ids
+
+
+def shard(ids, workers, durations):
+    # Longest processing time first: good balance without knowing the future.
+    default = sum(durations.values()) / len(durations) if durations else 1.0
+
+    def weight(test_id):
+        if test_id in durations:
+            return durations[test_id]
+        # a whole file is worth all of its known tests
+        known = [d for name, d in durations.items() if name.startswith(f"{test_id}::")]
+        return sum(known) if known else default
+
+    shards = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    for test_id in sorted(ids, key=weight, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(test_id)
+        loads[i] += weight(test_id)
+    return [s for s in shards if s]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise TimeoutError(f"Local chain on port {port} did not start")
+
+
+def compile_contracts():
+    subprocess.run(["brownie", "compile"], check=True, capture_output=True)
+
+
+def register_network(worker, port, chain_cmd=CHAIN_CMD):
+    network_id = f"wsk-worker-{worker}"
+    known = subprocess.run(
+        ["brownie", "networks", "list"], capture_output=True, text=True
+    ).stdout
+    # "modify" for an entry left behind, whatever port and command it has
+    action = (
+        ["modify", network_id]
+        if network_id in known
+        else ["add", "Development", network_id]
+    )
+    subprocess.run(
+        [
+            "brownie",
+            "networks",
+            *action,
+            "host=http://127.0.0.1",
+            f"cmd={chain_cmd}",
+            f"port={port}",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return network_id
+
+
+def remove_network(network_id):
+    subprocess.run(["brownie", "networks", "delete", network_id], capture_output=True)
+
+
+def start_chains(workers, chain_cmd, chain_args):
+    chains = []
+    for worker in range(workers):
+        port = BASE_PORT + worker
+        command = [chain_cmd, *chain_args.split(), "--port", str(port)]
+        chains.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+    for worker in range(workers):
+        wait_for_port(BASE_PORT + worker)
+    return chains
+
+
+def run_workers(shards, network_ids, extra_args):
+    workers = []
+    for worker, (test_ids, network_id) in enumerate(zip(shards, network_ids)):
+        junit = os.path.join(REPORTS, f"worker-{worker}.xml")
+        gas = os.path.join(REPORTS, f"worker-{worker}-gas.json")
+        command = [
+            "brownie",
+            "test",
+            *test_ids,
+            "--network",
+            network_id,
+            "--gas",
+            f"--junitxml={junit}",
+            *extra_args,
+        ]
+        env = dict(os.environ, WSK_GAS_REPORT=gas)
+        log = open(os.path.join(REPORTS, f"worker-{worker}.log"), "w")
+        process = subprocess.Popen(
+            command, stdout=log, stderr=subprocess.STDOUT, env=env
+        )
+        workers.append((process, log, junit, gas))
+    for process, log, _, _ in workers:
+        process.wait()
+        log.close()
+    return workers
+
+
+def merge_results(workers):
+    tests = {}
+    gas = {}
+    for _, _, junit, gas_path in workers:
+        if os.path.exists(junit):
+            for case in ElementTree.parse(junit).getroot().iter("testcase"):
+                # classname is the dotted module path, e.g. tests.test_unit_voting
+                module = case.get("classname").replace(".", "/")
+                test_id = f"{module}.py::{case.get('name')}"
+                outcome = "passed"
+                for child in case:
+                    if child.tag in ("failure", "error"):
+                        outcome = "failed"
+                    elif child.tag == "skipped":
+                        outcome = "skipped"
+                tests[test_id] = {
+                    "outcome": outcome,
+                    "time": float(case.get("time", 0)),
+                }
+        if os.path.exists(gas_path):
+            with open(gas_path) as f:
+                for function, profile in json.load(f).items():
+                    merged = gas.setdefault(
+                        function, {"count": 0, "avg": 0, "high": 0, "low": None}
+                    )
+                    total = (
+                        merged["avg"] * merged["count"]
+                        + profile["avg"] * profile["count"]
+                    )
+                    merged["count"] += profile["count"]
+                    merged["avg"] = total // max(merged["count"], 1)
+                    merged["high"] = max(merged["high"], profile["high"])
+                    low = profile["low"]
+                    merged["low"] = (
+                        low if merged["low"] is None else min(merged["low"], low)
+                    )
+    return tests, gas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", default=["tests"])
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--by-file", action="store_true", help="shard whole test files")
+    parser.add_argument("--chain-cmd", default=CHAIN_CMD)
+    parser.add_argument("--chain-args", default=CHAIN_ARGS)
+    args, extra_args = parser.parse_known_args(argv)
+
+    os.makedirs(REPORTS, exist_ok=True)
+    durations = {}
+    if os.path.exists(DURATIONS_PATH):
+        with open(DURATIONS_PATH) as f:
+            durations = json.load(f)
+    shards = shard(collect(args.paths, not args.by_file), args.workers, durations)
+
+    start = time.time()
+    compile_contracts()
+    network_ids = []
+    chains = []
+    try:
+        for worker in range(len(shards)):
+            network_ids.append(
+                register_network(worker, BASE_PORT + worker, args.chain_cmd)
+            )
+        chains = start_chains(len(shards), args.chain_cmd, args.chain_args)
+        workers = run_workers(shards, network_ids, extra_args)
+    finally:
+        for chain in chains:
+            chain.terminate()
+        for network_id in network_ids:
+            remove_network(network_id)
+    elapsed = time.time() - start
+
+    tests, gas = merge_results(workers)
+    outcomes = [test["outcome"] for test in tests.values()]
+    report = {
+        "workers": len(shards),
+        "wall_time": round(elapsed, 2),
+        "test_time": round(sum(test["time"] for test in tests.values()), 2),
+        "passed": outcomes.count("passed"),
+        "failed": outcomes.count("failed"),
+        "skipped": outcomes.count("skipped"),
+        "tests": tests,
+        "gas": gas,
+    }
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    durations.update({test_id: test["time"] for test_id, test in tests.items()})
+    with open(DURATIONS_PATH, "w") as f:
+        json.dump(durations, f, indent=2)
+
+    print(
+        f"{report['passed']} passed, {report['failed']} failed, {report['skipped']} skipped"
+        f" on {len(shards)} chains in {elapsed:.1f}s ({report['test_time']:.1f}s of tests)"
+    )
+    for function, profile in sorted(gas.items()):
+        print(f"  {function:<40} avg {profile['avg']:>8}  high {profile['high']:>8}")
+    print(f"Report written to {REPORT_PATH}")
+    failed = report["failed"] or any(
+        process.returncode not in (0, 5) for process, *_ in workers
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from brownie import Voting, web3
+from eth_account import Account
+from scripts.helpful_scripts import get_account, rpc_batch
+from scripts.load_test import FUNDING_AMOUNT, GAS_LIMIT, create_users
+from scripts.receipt_tracker import shared_tracker
+
+# Signs transactions for many local accounts in a process pool and streams
+# the raw transactions to the node, so that ECDSA signing and RLP encoding do
+# not run one transaction at a time in the sending process.
+#
+#   with Presigner() as presigner:
+#       for voter, candidate in votes:
+#           presigner.call(voting.vote, candidate, sender=voter)
+#       report = presigner.run()        # sign, send, wait for the receipts
+#
+# run() assigns every nonce ahead of time, the first one per sender from the
+# node's pending count (one batched eth_getTransactionCount), the next ones
+# locally in the order the calls were added. Transactions get a fixed gas
+# limit and the current gas price, no estimate is made per transaction.
+# Chunks of SIGN_CHUNK transactions are signed by the pool workers while
+# SENDERS threads push the chunks already signed, one batched
+# eth_sendRawTransaction request per chunk. Transactions the node refuses
+# because its pool is full are retried after RETRY_DELAY, "already known"
+# counts as sent. Any other refusal leaves a gap in the nonces of its
+# sender: the later transactions of that sender can never be mined, they are
+# reported as failed along with it instead of being waited for. Receipts are
+# waited for at most WAIT_TIMEOUT seconds. The signing time includes waiting
+# for the senders when the node is the slower side.
+#
+# Calls are only ordered per sender: a call that depends on another sender's
+# call (a vote for a candidate that registers in the same run) belongs to a
+# later run(). Only accounts with a private key (accounts.add, keystores)
+# can be presigned, the node's unlocked accounts sign on the node.
+#
+#   brownie run scripts/presign.py main 200        # Voting election, 200 users
+#   brownie run scripts/presign.py benchmark 20000 # signing only, no chain
+
+REPORT_PATH = os.path.join("reports", "presign.json")
+# Transactions per pool task, each signed chunk is sent as one batch
+SIGN_CHUNK = 256
+SENDERS = 4
+RETRY_DELAY = 0.2
+MAX_RETRIES = 50
+WAIT_TIMEOUT = 300
+KNOWN_ERRORS = ("already known", "known transaction")
+RETRY_ERRORS = ("pool is full", "txpool is full", "too many")
+
+
+def _hex(value):
+    value = value.hex()
+    return value if value.startswith("0x") else f"0x{value}"
+
+
+def _sign_chunk(chunk):
+    # Runs in the pool workers: [(private key, tx)] -> [(txid, raw)]
+    signed = []
+    for private_key, tx in chunk:
+        transaction = Account.sign_transaction(tx, private_key)
+        # renamed raw_transaction in eth-account 0.13
+        raw = (
+            getattr(transaction, "raw_transaction", None) or transaction.rawTransaction
+        )
+        signed.append((_hex(transaction.hash), _hex(raw)))
+    return signed
+
+
+def _error_message(error):
+    message = error.args[0] if error.args else error
+    if isinstance(message, dict):
+        message = message.get("message", "")
+    return str(message).lower()
+
+
+class Presigner:
+    def __init__(self, workers=None, gas_limit=GAS_LIMIT, senders=SENDERS):
+        self.workers = workers or os.cpu_count()
+        self.gas_limit = gas_limit
+        self.senders = senders
+        self.tracker = shared_tracker()
+        self._pool = ProcessPoolExecutor(self.workers)
+        self._nonces = {}
+        self._calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def call(self, method, *args, sender, value=0):
+        private_key = getattr(sender, "private_key", None)
+        if private_key is None:
+            raise ValueError(f"{sender} has no private key to presign with")
+        tx = {
+            "to": method._address,
+            "data": method.encode_input(*args),
+            "value": value,
+            "gas": self.gas_limit,
+        }
+        self._calls.append((str(sender), private_key, tx))
+
+    def _assign_nonces(self, calls):
+        # Nonces of every sender new to this presigner in one batch
+        fresh = list(dict.fromkeys(sender for sender, _, _ in calls))
+        fresh = [sender for sender in fresh if sender not in self._nonces]
+        counts = fresh and rpc_batch(
+            [("eth_getTransactionCount", [sender, "pending"]) for sender in fresh]
+        )
+        for sender, count in zip(fresh, counts):
+            self._nonces[sender] = int(count, 16)
+        shared = {"gasPrice": web3.eth.gas_price, "chainId": web3.eth.chain_id}
+        prepared = []
+        for sender, private_key, tx in calls:
+            tx = dict(tx, nonce=self._nonces[sender], **shared)
+            self._nonces[sender] += 1
+            prepared.append((private_key, tx))
+        return prepared
+
+    def sign(self, calls, origins=None):
+        # Yields chunks of (txid, raw) as the pool signs them, in call order,
+        # and fills origins with {txid: (sender, nonce)}
+        prepared = self._assign_nonces(calls)
+        nonces = [
+            (sender, tx["nonce"]) for (sender, _, _), (_, tx) in zip(calls, prepared)
+        ]
+        starts = range(0, len(prepared), SIGN_CHUNK)
+        chunks = [prepared[start : start + SIGN_CHUNK] for start in starts]
+        for start, signed in zip(starts, self._pool.map(_sign_chunk, chunks)):
+            if origins is not None:
+                for (txid, _), origin in zip(signed, nonces[start:]):
+                    origins[txid] = origin
+            yield signed
+
+    def _push(self, signed):
+        # Returns (txids accepted, [(txid, error)])
+        pending, accepted, failed = list(signed), [], []
+        for _ in range(MAX_RETRIES):
+            results = rpc_batch(
+                [("eth_sendRawTransaction", [raw]) for _, raw in pending], errors=True
+            )
+            retry = []
+            for (txid, raw), result in zip(pending, results):
+                if not isinstance(result, ValueError):
+                    accepted.append(txid)
+                    continue
+                message = _error_message(result)
+                if any(known in message for known in KNOWN_ERRORS):
+                    accepted.append(txid)
+                elif any(full in message for full in RETRY_ERRORS):
+                    retry.append((txid, raw))
+                else:
+                    failed.append((txid, message))
+            if not retry:
+                return accepted, failed
+            pending = retry
+            time.sleep(RETRY_DELAY)
+        failed.extend(
+            (txid, "node kept refusing the transaction") for txid, _ in pending
+        )
+        return accepted, failed
+
+    def run(self, confirmations=1, wait=True, timeout=WAIT_TIMEOUT):
+        calls, self._calls = self._calls, []
+        stream = queue.Queue(maxsize=4 * self.senders)
+        accepted, failed, origins = [], [], {}
+        lock = threading.Lock()
+
+        def send():
+            while True:
+                signed = stream.get()
+                if signed is None:
+                    return
+                sent, errors = self._push(signed)
+                with lock:
+                    accepted.extend(sent)
+                    failed.extend(errors)
+
+        threads = [threading.Thread(target=send) for _ in range(self.senders)]
+        for thread in threads:
+            thread.start()
+        start = signed_at = time.perf_counter()
+        try:
+            for signed in self.sign(calls, origins):
+                stream.put(signed)
+            signed_at = time.perf_counter()
+        finally:
+            for _ in threads:
+                stream.put(None)
+            for thread in threads:
+                thread.join()
+        sent_at = time.perf_counter()
+        if failed:
+            # The first refused nonce of a sender is a gap, the transactions
+            # of that sender after it stay queued in the node for good
+            gaps = {}
+            for txid, _ in failed:
+                sender, nonce = origins[txid]
+                gaps[sender] = min(nonce, gaps.get(sender, nonce))
+            stuck = set()
+            for txid in accepted:
+                sender, nonce = origins[txid]
+                if nonce > gaps.get(sender, nonce):
+                    stuck.add(txid)
+            accepted = [txid for txid in accepted if txid not in stuck]
+            failed.extend((txid, "queued behind a refused nonce") for txid in stuck)
+            # the nonces after a failed transaction are not usable any more
+            self._nonces.clear()
+        receipts = []
+        if wait:
+            receipts = self.tracker.wait_all(accepted, confirmations, timeout)
+        done = time.perf_counter()
+
+        signing = signed_at - start
+        return {
+            "transactions": len(calls),
+            "workers": self.workers,
+            "accepted": len(accepted),
+            "failed": len(failed),
+            "errors": sorted({message for _, message in failed}),
+            "reverted": sum(
+                1 for receipt in receipts if int(receipt["status"], 16) != 1
+            ),
+            "signing_seconds": round(signing, 3),
+            "signed_per_second": round(len(calls) / signing, 1) if signing else None,
+            "sending_seconds": round(sent_at - start, 3),
+            "sent_per_second": round(len(accepted) / (sent_at - start), 1),
+            "confirmed_seconds": round(done - start, 3) if wait else None,
+        }
+
+
+def sign_benchmark(count=20000, workers=None):
+    # Signing throughput for 1, 2, 4... workers up to the number of cores,
+    # on vote-shaped transactions from 100 throwaway keys
+    keys = [f"0x{i:064x}" for i in range(1, 101)]
+    data = "0x" + "00" * 36
+    transactions = [
+        (
+            keys[i % len(keys)],
+            {
+                "to": "0x" + "11" * 20,
+                "data": data,
+                "value": 0,
+                "gas": GAS_LIMIT,
+                "gasPrice": 10**9,
+                "nonce": i // len(keys),
+                "chainId": 1337,
+            },
+        )
+        for i in range(count)
+    ]
+    chunks = [
+        transactions[start : start + SIGN_CHUNK]
+        for start in range(0, count, SIGN_CHUNK)
+    ]
+    results = {}
+    limit = int(workers or os.cpu_count())
+    pool_sizes = sorted({1 << i for i in range(limit.bit_length())} | {limit})
+    for size in pool_sizes:
+        with ProcessPoolExecutor(size) as pool:
+            # the first map starts the workers, only the second one is timed
+            list(pool.map(_sign_chunk, chunks[:size]))
+            start = time.perf_counter()
+            signed = sum(len(chunk) for chunk in pool.map(_sign_chunk, chunks))
+            elapsed = time.perf_counter() - start
+        results[size] = round(signed / elapsed, 1)
+        print(f"{size} workers: {results[size]} signatures/s")
+    return results
+
+
+def benchmark(count=20000, workers=None):
+    results = sign_benchmark(int(count), workers)
+    report = {"transactions": int(count), "signatures_per_second": results}
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main(users=200, workers=None):
+    # Half of the users run as candidates, the other half vote for one and
+    # fund it, each phase presigned and streamed at once
+    owner = get_account()
+    print(f"Creating and funding {int(users)} accounts")
+    population = create_users(int(users))
+    half = len(population) // 2
+    candidates, voters = population[:half], population[half:]
+    voting = Voting.deploy({"from": owner})
+    transaction = voting.startVotingPeriod(1, {"from": owner})
+    transaction.wait(1)
+
+    reports = {}
+    with Presigner(int(workers) if workers else None) as presigner:
+        for candidate in candidates:
+            presigner.call(voting.runAsCandidate, f"{candidate}"[:8], sender=candidate)
+        reports["runAsCandidate"] = presigner.run()
+        for i, voter in enumerate(voters):
+            candidate = candidates[i % len(candidates)]
+            presigner.call(voting.vote, candidate, sender=voter)
+            presigner.call(voting.fund, candidate, sender=voter, value=FUNDING_AMOUNT)
+        reports["vote+fund"] = presigner.run()
+
+    for phase, report in reports.items():
+        print(
+            f"{phase}: {report['transactions']} transactions, "
+            f"{report['signed_per_second']} signed/s with {report['workers']} workers, "
+            f"{report['sent_per_second']} sent/s, {report['failed']} refused, "
+            f"{report['reverted']} reverted, confirmed in {report['confirmed_seconds']}s"
+        )
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(reports, f, indent=2)
+    return reports
@@ -0,0 +1,329 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from brownie import Contract, accounts, network, web3
+from scripts.event_indexer import event_topic, scan_logs
+
+# Read service for the front end: indexes the Transfer events of the
+# Transactions contract (front_end/src/utils/Transactions.json) into SQLite
+# and serves them over HTTP, so that a page load reads one page instead of
+# getAllTransactions() through the wallet provider.
+#
+#   brownie run scripts/read_api.py main              # address from constants.js
+#   brownie run scripts/read_api.py main 0xAddress 8000
+#
+#   GET /transactions?limit=20&before=<id>&sender=&receiver=&keyword=
+#       newest first, `next` is the `before` of the following page
+#   GET /transactions/count
+#   GET /events          server-sent events, one `transaction` per new entry,
+#                        resumes after Last-Event-ID (or ?after=<id>)
+#
+# Entries are numbered in chain order, like the array of the contract. Pages
+# use the ids as keyset cursors and carry a weak ETag made of the query and
+# the last indexed id, so an unchanged page is answered 304 without a body.
+# On the development network with no address given, a Transactions contract
+# is deployed and seeded so the service can be tried end to end.
+
+ARTIFACT = os.path.join("front_end", "src", "utils", "Transactions.json")
+CONSTANTS = os.path.join("front_end", "src", "utils", "constants.js")
+MAX_LIMIT = 100
+DEFAULT_LIMIT = 20
+KEEPALIVE = 15
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    block_number INTEGER,
+    log_index INTEGER,
+    transaction_hash TEXT,
+    sender TEXT,
+    receiver TEXT,
+    amount TEXT,
+    message TEXT,
+    keyword TEXT,
+    timestamp INTEGER,
+    UNIQUE (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS transactions_by_sender ON transactions (sender, id);
+CREATE INDEX IF NOT EXISTS transactions_by_receiver ON transactions (receiver, id);
+CREATE INDEX IF NOT EXISTS transactions_by_keyword ON transactions (keyword, id);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    address TEXT PRIMARY KEY,
+    block_number INTEGER
+);
+"""
+COLUMNS = [
+    "id",
+    "blockNumber",
+    "transactionHash",
+    "addressFrom",
+    "addressTo",
+    "amount",
+    "message",
+    "keyword",
+    "timestamp",
+]
+FILTERS = {"sender": "sender", "receiver": "receiver", "keyword": "keyword"}
+
+
+def load_artifact():
+    with open(ARTIFACT) as f:
+        return json.load(f)
+
+
+def front_end_address():
+    with open(CONSTANTS) as f:
+        match = re.search(r'contractAddress\s*=\s*"(0x[0-9a-fA-F]{40})"', f.read())
+    return match.group(1) if match else None
+
+
+def deploy_transactions(account):
+    artifact = load_artifact()
+    factory = web3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    tx_hash = factory.constructor().transact({"from": str(account)})
+    address = web3.eth.wait_for_transaction_receipt(tx_hash)["contractAddress"]
+    return Contract.from_abi("Transactions", address, artifact["abi"])
+
+
+class TransactionIndexer:
+    def __init__(
+        self, contract, path="transactions.db", start_block=0, confirmations=0
+    ):
+        self.contract = contract
+        self.address = str(contract.address)
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self._event = web3.eth.contract(address=self.address, abi=contract.abi).events
+        self._topic = event_topic(contract, "Transfer")
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        # notified every time new entries are indexed
+        self.updated = threading.Condition()
+
+    @property
+    def checkpoint(self):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT block_number FROM checkpoint WHERE address = ?", (self.address,)
+            ).fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def last_id(self):
+        with self.lock:
+            (last,) = self.db.execute("SELECT MAX(id) FROM transactions").fetchone()
+        return last or 0
+
+    def sync(self):
+        head = web3.eth.block_number - self.confirmations
+        indexed = 0
+        for _, end, logs in scan_logs(
+            self.address, [self._topic], self.checkpoint + 1, head
+        ):
+            rows = []
+            for log in logs:
+                args = self._event.Transfer().processLog(log).args
+                rows.append(
+                    (
+                        log["blockNumber"],
+                        log["logIndex"],
+                        web3.toHex(log["transactionHash"]),
+                        args["from"],
+                        args.receiver,
+                        str(args.amount),
+                        args.message,
+                        args.keyword,
+                        args.timestamp,
+                    )
+                )
+            with self.lock, self.db:
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO transactions (block_number, log_index,"
+                    " transaction_hash, sender, receiver, amount, message, keyword,"
+                    " timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO checkpoint VALUES (?, ?)",
+                    (self.address, end),
+                )
+            indexed += len(rows)
+        if indexed:
+            with self.updated:
+                self.updated.notify_all()
+        return indexed
+
+    def follow(self, poll_interval=2):
+        while True:
+            try:
+                self.sync()
+            except Exception as error:
+                print(f"Indexing failed, retrying: {error}")
+            time.sleep(poll_interval)
+
+    # Queries
+
+    def page(self, limit=DEFAULT_LIMIT, before=None, after=None, **filters):
+        # Newest first, or oldest first from `after` (used by the event stream).
+        clauses, params = [], []
+        for name, value in filters.items():
+            if value:
+                clauses.append(f"{FILTERS[name]} = ?")
+                params.append(value)
+        if before is not None:
+            clauses.append("id < ?")
+            params.append(before)
+        if after is not None:
+            clauses.append("id > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "ASC" if after is not None else "DESC"
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, block_number, transaction_hash, sender, receiver, amount,"
+                f" message, keyword, timestamp FROM transactions {where}"
+                f" ORDER BY id {order} LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        items = [dict(zip(COLUMNS, row)) for row in rows]
+        has_more = len(items) == limit and order == "DESC"
+        return {"items": items, "next": items[-1]["id"] if has_more else None}
+
+
+def _int(query, name):
+    values = query.get(name)
+    return int(values[0]) if values else None
+
+
+def make_handler(indexer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _headers(self, status, content_type, extra=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Expose-Headers", "ETag")
+            for name, value in extra:
+                self.send_header(name, value)
+
+        def _json(self, body, query_key):
+            etag = 'W/"{}-{}"'.format(
+                indexer.last_id(), hashlib.sha1(query_key.encode()).hexdigest()[:12]
+            )
+            if self.headers.get("If-None-Match") == etag:
+                self._headers(304, "application/json", [("ETag", etag)])
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            payload = json.dumps(body()).encode()
+            self._headers(
+                200,
+                "application/json",
+                [("ETag", etag), ("Cache-Control", "no-cache")],
+            )
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _error(self, status, message):
+            payload = json.dumps({"error": message}).encode()
+            self._headers(status, "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            try:
+                if url.path == "/transactions":
+                    limit = min(_int(query, "limit") or DEFAULT_LIMIT, MAX_LIMIT)
+                    filters = {name: query.get(name, [None])[0] for name in FILTERS}
+                    before = _int(query, "before")
+                    self._json(
+                        lambda: indexer.page(limit, before=before, **filters),
+                        url.query,
+                    )
+                elif url.path == "/transactions/count":
+                    self._json(lambda: {"count": indexer.last_id()}, "count")
+                elif url.path == "/events":
+                    after = self.headers.get("Last-Event-ID") or query.get("after")
+                    after = int(after[0] if isinstance(after, list) else after or 0)
+                    self._stream(after)
+                else:
+                    self._error(404, "not found")
+            except ValueError as error:
+                self._error(400, str(error))
+
+        def _stream(self, after):
+            self._headers(200, "text/event-stream", [("Cache-Control", "no-cache")])
+            self.end_headers()
+            try:
+                while True:
+                    items = indexer.page(MAX_LIMIT, after=after)["items"]
+                    for item in items:
+                        self.wfile.write(
+                            f"id: {item['id']}\nevent: transaction\n"
+                            f"data: {json.dumps(item)}\n\n".encode()
+                        )
+                        after = item["id"]
+                    if not items:
+                        with indexer.updated:
+                            if indexer.last_id() > after:
+                                continue
+                            if not indexer.updated.wait(KEEPALIVE):
+                                self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+def serve(indexer, port=8000, poll_interval=2):
+    # Starts indexing and serving in background threads, returns the server.
+    indexer.sync()
+    threading.Thread(target=indexer.follow, args=(poll_interval,), daemon=True).start()
+    server = ThreadingHTTPServer(("127.0.0.1", int(port)), make_handler(indexer))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(address=None, port=8000, path="transactions.db"):
+    abi = load_artifact()["abi"]
+    if address is None and network.show_active() == "development":
+        contract = deploy_transactions(accounts[0])
+        for i, receiver in enumerate(accounts[1:6]):
+            contract.addToBlockchain(
+                receiver,
+                10**15 * (i + 1),
+                f"Payment {i}",
+                "seed",
+                {"from": accounts[0]},
+            )
+        path = ":memory:"
+    else:
+        contract = Contract.from_abi(
+            "Transactions", address or front_end_address(), abi
+        )
+    indexer = TransactionIndexer(contract, path)
+    server = serve(indexer, port)
+    print(f"Indexed {indexer.last_id()} transactions of {contract.address}")
+    print(f"Serving on http://127.0.0.1:{server.server_port}, Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
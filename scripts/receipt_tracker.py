@@ -0,0 +1,261 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from brownie import web3
+from scripts.helpful_scripts import rpc_batch
+
+# Waits for many transactions with one polling loop instead of one loop per
+# transaction. A background thread follows the chain head (eth_blockNumber),
+# fetches every new block with its transaction hashes in one batch, matches
+# them against all the pending transactions and fetches the receipts of the
+# confirmed ones in one more batch. A transaction tracked after it was mined
+# is found with a batched receipt lookup on the next poll.
+#
+#   tracker = shared_tracker()
+#   receipts = [tracker.send(sender, {"to": to, "value": 1}) for sender in senders]
+#   for receipt in receipts:
+#       receipt.wait()
+#
+# Brownie polls on its own for each transaction sent through a contract
+# method, so the tracker only saves requests for transactions it sent itself
+# (send) or that were broadcast raw.
+
+POLL_INTERVAL = 0.5
+# Consecutive failed polls after which every pending transaction fails
+MAX_POLL_ERRORS = 20
+
+
+def _txid(txid):
+    txid = txid.hex() if isinstance(txid, bytes) else str(txid)
+    txid = txid.lower()
+    return txid if txid.startswith("0x") else f"0x{txid}"
+
+
+_chain = {}
+
+
+def _chain_id():
+    if "id" not in _chain:
+        _chain["id"] = web3.eth.chain_id
+    return _chain["id"]
+
+
+def send_raw(sender, tx):
+    # Broadcasts without brownie's TransactionReceipt (and its polling
+    # thread). Unlocked node accounts are sent as is, local accounts are
+    # signed here. Only the fields missing from tx are asked from the node:
+    # with a fixed gas there is no estimate, so a reverting call is mined.
+    tx = dict(tx, **{"from": str(sender)})
+    private_key = getattr(sender, "private_key", None)
+    if private_key is None:
+        return _txid(web3.eth.send_transaction(tx))
+    if "nonce" not in tx:
+        tx["nonce"] = web3.eth.get_transaction_count(str(sender), "pending")
+    if "gas" not in tx:
+        tx["gas"] = web3.eth.estimate_gas(tx)
+    if "gasPrice" not in tx:
+        tx["gasPrice"] = web3.eth.gas_price
+    if "chainId" not in tx:
+        tx["chainId"] = _chain_id()
+    signed = web3.eth.account.sign_transaction(tx, private_key)
+    return _txid(web3.eth.send_raw_transaction(signed.rawTransaction))
+
+
+class Receipt:
+    # The fields of brownie's TransactionReceipt that the scripts use, filled
+    # in from the tracker once the transaction is confirmed.
+    def __init__(self, txid, future, tracker, confirmations):
+        self.txid = txid
+        self.status = -1
+        self.gas_used = None
+        self.block_number = None
+        self.contract_address = None
+        self.revert_msg = None
+        self._future = future
+        self._tracker = tracker
+        self._confirmations = confirmations
+
+    @property
+    def confirmed(self):
+        return self._future.done()
+
+    def wait(self, required_confs=None, timeout=None):
+        # Waits for the confirmations given to the tracker, then for
+        # required_confs when more are asked for here.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        receipt = self._future.result(timeout)
+        if required_confs is not None and required_confs > self._confirmations:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            receipt = self._tracker.wait(self.txid, required_confs, remaining)
+        self.status = int(receipt["status"], 16)
+        self.gas_used = int(receipt["gasUsed"], 16)
+        self.block_number = int(receipt["blockNumber"], 16)
+        self.contract_address = receipt.get("contractAddress")
+        return self
+
+
+class ReceiptTracker:
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        # RPC requests sent (a batch counts once) and calls made
+        self.requests = 0
+        self.calls = 0
+        self._pending = {}  # txid -> (future, confirmations)
+        self._unchecked = set()
+        self._mined = {}  # txid -> block number
+        self._head = None
+        self._errors = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def track(self, txid, confirmations=1):
+        txid = _txid(txid)
+        with self._lock:
+            if txid in self._pending:
+                return self._pending[txid][0]
+            future = Future()
+            self._pending[txid] = (future, max(int(confirmations), 1))
+            self._unchecked.add(txid)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return future
+
+    def send(self, sender, tx, confirmations=1):
+        txid = send_raw(sender, tx)
+        future = self.track(txid, confirmations)
+        return Receipt(txid, future, self, max(int(confirmations), 1))
+
+    # Blocking API
+
+    def wait(self, txid, confirmations=1, timeout=None):
+        return self.track(txid, confirmations).result(timeout)
+
+    def wait_all(self, txids, confirmations=1, timeout=None):
+        futures = [self.track(txid, confirmations) for txid in txids]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return [
+            future.result(None if deadline is None else deadline - time.monotonic())
+            for future in futures
+        ]
+
+    # Async API
+
+    async def wait_async(self, txid, confirmations=1):
+        return await asyncio.wrap_future(self.track(txid, confirmations))
+
+    async def gather_async(self, txids, confirmations=1):
+        return await asyncio.gather(
+            *(self.wait_async(txid, confirmations) for txid in txids)
+        )
+
+    # Polling
+
+    def _batch(self, calls):
+        if not calls:
+            return []
+        self.requests += 1
+        self.calls += len(calls)
+        return rpc_batch(calls)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    # The head is read again when tracking starts over
+                    self._thread = None
+                    self._head = None
+                    return
+            try:
+                self._poll()
+                self._errors = 0
+            except Exception as error:
+                self._errors += 1
+                if self._errors >= MAX_POLL_ERRORS:
+                    self._fail_all(error)
+            time.sleep(self.poll_interval)
+
+    def _poll(self):
+        (head,) = self._batch([("eth_blockNumber", [])])
+        head = int(head, 16)
+        with self._lock:
+            unchecked, self._unchecked = self._unchecked, set()
+            pending = set(self._pending)
+        receipts = {}
+
+        # Transactions that may have been mined before they were tracked
+        lookups = sorted(unchecked)
+        results = self._batch([("eth_getTransactionReceipt", [t]) for t in lookups])
+        for txid, receipt in zip(lookups, results):
+            if receipt is not None:
+                receipts[txid] = receipt
+                self._mined[txid] = int(receipt["blockNumber"], 16)
+
+        # New blocks since the last poll
+        first = head + 1 if self._head is None else self._head + 1
+        waiting = pending - set(self._mined)
+        if waiting and first <= head:
+            numbers = range(first, head + 1)
+            blocks = self._batch(
+                [("eth_getBlockByNumber", [hex(n), False]) for n in numbers]
+            )
+            for block in blocks:
+                if block is None:
+                    continue
+                for txid in block["transactions"]:
+                    if txid.lower() in waiting:
+                        self._mined[txid.lower()] = int(block["number"], 16)
+        self._head = head
+
+        with self._lock:
+            ready = [
+                txid
+                for txid, number in self._mined.items()
+                if head - number + 1 >= self._pending[txid][1]
+            ]
+        # Receipts are fetched (again, when confirmations were needed) when a
+        # transaction is confirmed, so that a reorged one is not resolved.
+        refetch = [txid for txid in ready if self._pending[txid][1] > 1]
+        refetch += [txid for txid in ready if txid not in receipts]
+        refetch = sorted(set(refetch))
+        results = self._batch([("eth_getTransactionReceipt", [t]) for t in refetch])
+        receipts.update(zip(refetch, results))
+
+        resolved = []
+        for txid in ready:
+            if receipts.get(txid) is None:
+                # dropped from the chain, look for it again
+                del self._mined[txid]
+                with self._lock:
+                    self._unchecked.add(txid)
+                continue
+            del self._mined[txid]
+            resolved.append(txid)
+        with self._lock:
+            futures = [self._pending.pop(txid)[0] for txid in resolved]
+        for txid, future in zip(resolved, futures):
+            future.set_result(receipts[txid])
+
+    def _fail_all(self, error):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._unchecked = set()
+        self._mined = {}
+        for future, _ in pending.values():
+            future.set_exception(error)
+
+
+_shared = None
+
+
+def shared_tracker():
+    # One tracker per process, for the scripts that wait on many transactions.
+    global _shared
+    if _shared is None:
+        _shared = ReceiptTracker()
+    return _shared
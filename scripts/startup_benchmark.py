@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Measures how long a script takes to get to a usable project, plain brownie
+# `project.load` against scripts/compile_cache.py, on a copy of the project so
+# that the build folder and compile cache of the working tree are left alone.
+#
+#   python scripts/startup_benchmark.py -n 5 --contract WSKCore
+#
+#   import   - importing brownie alone
+#   cold     - empty build folder: brownie compiles everything, the cache
+#              restores every artifact it compiled before
+#   warm     - up to date artifacts: brownie checks every source against its
+#              artifact, the cache compares hashes and loads with compile=False
+#   edit     - the source of --contract changes before every run: both
+#              recompile it and its dependents only
+#   revert   - the source goes back and forth between two versions: brownie
+#              recompiles every time, the cache restores the stored version
+#   lazy     - importing a container from scripts/compile_cache.py, and its
+#              first use, which is when the project is loaded
+#
+# Every measure runs in a fresh interpreter and the medians are written to
+# reports/startup_benchmark.json, with the saving of the cache per scenario.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_PATH = os.path.join(ROOT, "reports", "startup_benchmark.json")
+COPIED = ["contracts", "interfaces", "scripts", "brownie-config.yaml"]
+CONTRACT_PATTERN = r"^(?:abstract\s+)?(?:contract|library)\s+{contract}\b"
+
+TIMED = """
+import time
+start = time.perf_counter()
+{body}
+print(time.perf_counter() - start)
+"""
+BROWNIE = "from brownie import project\nproject.load('.')"
+CACHED = "from scripts.compile_cache import load_project\nload_project('.')"
+SCENARIOS = {
+    "import": "import brownie",
+    "lazy import": "from scripts.compile_cache import {contract}",
+    "lazy use": "from scripts.compile_cache import {contract}\n{contract}.signatures",
+}
+
+
+def copy_project(destination):
+    for name in COPIED:
+        source = os.path.join(ROOT, name)
+        if os.path.isdir(source):
+            shutil.copytree(
+                source,
+                os.path.join(destination, name),
+                ignore=shutil.ignore_patterns("__pycache__"),
+            )
+        elif os.path.exists(source):
+            shutil.copy(source, destination)
+
+
+def source_of(contract, workdir):
+    pattern = re.compile(CONTRACT_PATTERN.format(contract=contract), re.M)
+    for root, _, names in os.walk(os.path.join(workdir, "contracts")):
+        for name in sorted(names):
+            with open(os.path.join(root, name)) as f:
+                if pattern.search(f.read()):
+                    return os.path.join(root, name)
+    raise ValueError(f"No contract named {contract} in contracts/")
+
+
+def timed(body, cwd, store):
+    result = subprocess.run(
+        [sys.executable, "-c", TIMED.format(body=body)],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONPATH=cwd, WSK_COMPILE_CACHE=store),
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure(name, body, cwd, store, runs, before=None):
+    samples = []
+    for _ in range(runs):
+        if before:
+            before()
+        samples.append(timed(body, cwd, store))
+    median = statistics.median(samples)
+    print(f"{name:<16} median {median:.3f}s over {runs} runs")
+    return {"median": round(median, 4), "samples": [round(s, 4) for s in samples]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--contract", default="WSKCore")
+    args = parser.parse_args(argv)
+
+    report = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        copy_project(workdir)
+        build = os.path.join(workdir, "build")
+        store = os.path.join(workdir, "compile_cache")
+        source = source_of(args.contract, workdir)
+        with open(source) as f:
+            original = f.read()
+        edits = iter(range(10**6))
+        versions = [original, original + "\n// benchmark revert\n"]
+
+        def clean():
+            shutil.rmtree(build, ignore_errors=True)
+
+        def write(content):
+            with open(source, "w") as f:
+                f.write(content)
+
+        def edit():
+            write(original + f"\n// benchmark edit {next(edits)}\n")
+
+        def toggle():
+            versions.reverse()
+            write(versions[0])
+
+        def run(name, body, before=None):
+            report[name] = measure(name, body, workdir, store, args.runs, before)
+
+        run("import", SCENARIOS["import"])
+        run("brownie cold", BROWNIE, clean)
+        run("brownie warm", BROWNIE)
+        # the first cached load stores the artifacts, the measured ones use them
+        timed(CACHED, workdir, store)
+        run("cached cold", CACHED, clean)
+        run("cached warm", CACHED)
+        run("brownie edit", BROWNIE, edit)
+        run("cached edit", CACHED, edit)
+        # both versions compiled once, into the store
+        for _ in versions:
+            toggle()
+            timed(CACHED, workdir, store)
+        run("brownie revert", BROWNIE, toggle)
+        run("cached revert", CACHED, toggle)
+        write(original)
+        timed(CACHED, workdir, store)
+        run("lazy import", SCENARIOS["lazy import"].format(contract=args.contract))
+        run("lazy use", SCENARIOS["lazy use"].format(contract=args.contract))
+
+    report["saved"] = {
+        scenario: round(
+            report[f"brownie {scenario}"]["median"]
+            - report[f"cached {scenario}"]["median"],
+            4,
+        )
+        for scenario in ("cold", "warm", "edit", "revert")
+    }
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    for scenario, saved in report["saved"].items():
+        print(f"The cache saves {saved:.3f}s over a {scenario} brownie load")
+    print(f"Report written to {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import math
+
+# Small helpers shared by the benchmark and load scripts.
+
+
+def percentile(sorted_values, q):
+    # Linear interpolation between closest ranks, q in [0, 100].
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(samples, scale=1.0, digits=3):
+    # count/mean/p50/p95/p99/max of the samples, multiplied by scale (e.g.
+    # 1000 to report seconds as milliseconds).
+    values = sorted(samples)
+    if not values:
+        return {"count": 0}
+    summary = {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+    }
+    return {
+        key: value if key == "count" else round(value * scale, digits)
+        for key, value in summary.items()
+    }
@@ -0,0 +1,392 @@
+import hashlib
+import importlib
+import json
+import os
+import time
+
+from brownie import Wei, accounts, network, project, web3
+from brownie.network.contract import ContractConstructor, _ContractMethod
+from scripts.receipt_tracker import shared_tracker
+from scripts.tx_pipeline import PipelineError, TxPipeline
+
+# Records the transactions of a script or test run as a portable trace and
+# replays it on a fresh local chain as fast as the node takes it, optionally
+# with every actor duplicated, to compare chain backends and contract
+# revisions on the same workload.
+#
+#   brownie run scripts/trace.py record deploy main reports/deploy.trace.json
+#   WSK_TRACE=reports/traces brownie test tests/test_integration_voting.py
+#   brownie run scripts/trace.py replay reports/traces/test_integration.trace.json 20
+#
+# Recording wraps ContractConstructor (Container.deploy) and
+# _ContractMethod.transact the way scripts/instrumentation.py wraps the
+# contract methods, so only transactions sent through brownie objects are seen
+# (not the raw ones of the ReceiptTracker). Each deployment or call is stored
+# with its contract name, function, arguments, sender, value, phase and
+# outcome (status, revert message, gas used). Accounts become actor numbers
+# and deployed contracts deployment numbers, in the order they first appear,
+# so that a trace does not depend on the chain it was recorded on. A phase is
+# the name given with Recorder.start_phase, or the function name for a run of
+# calls to the same function.
+#
+# The replayer gives every copy of the scenario (`scale` copies) its own
+# actors and its own deployments. Copy 0 uses the node's accounts while there
+# are enough of them, other actors are new local accounts funded by the node
+# accounts with what they send plus GAS_ALLOWANCE (bigger scales need a
+# bigger default_balance for the development network). Phases run one after
+# the other; inside a phase the calls of all copies are broadcast at once
+# through the TxPipeline with a fixed gas limit, so they are only ordered per
+# sender. Every phase reports its time, transactions per second, gas, the
+# calls that never got a receipt (unsent) and, among the others, the calls
+# whose status differs from the recording.
+
+GAS_LIMIT = 1_000_000
+GAS_ALLOWANCE = Wei("0.1 ether")
+TRACE_VERSION = 1
+REPORT_PATH = os.path.join("reports", "trace_replay.json")
+
+
+def _is_address(value):
+    return isinstance(value, str) and value.startswith("0x") and len(value) == 42
+
+
+def _container(name):
+    return getattr(project.get_loaded_projects()[0], name)
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self.actors = {}  # address -> actor number
+        self.contracts = {}  # address -> deployment number
+        self.names = []  # contract name of every deployment
+        self._phase = None
+        self._originals = None
+
+    # Hooks
+
+    def install(self):
+        if self._originals is not None:
+            return self
+        self._originals = (ContractConstructor.__call__, _ContractMethod.transact)
+        deploy, transact = self._originals
+        recorder = self
+
+        def recorded_deploy(constructor, *args, **kwargs):
+            return recorder._record(constructor, "constructor", deploy, args, kwargs)
+
+        def recorded_transact(method, *args, **kwargs):
+            return recorder._record(method, method.abi["name"], transact, args, kwargs)
+
+        ContractConstructor.__call__ = recorded_deploy
+        _ContractMethod.transact = recorded_transact
+        return self
+
+    def uninstall(self):
+        if self._originals is None:
+            return
+        ContractConstructor.__call__, _ContractMethod.transact = self._originals
+        self._originals = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def start_phase(self, name):
+        # Calls from now on belong to the phase `name`, None goes back to
+        # one phase per function
+        self._phase = name
+
+    # Encoding
+
+    def _actor(self, address):
+        address = str(address)
+        if address not in self.actors:
+            self.actors[address] = len(self.actors)
+        return self.actors[address]
+
+    def _encode(self, value):
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        if isinstance(value, bytes):
+            return {"hex": value.hex()}
+        if isinstance(value, int):
+            return value
+        value = str(value)
+        if _is_address(value):
+            if value in self.contracts:
+                return {"contract": self.contracts[value]}
+            return {"actor": self._actor(value)}
+        return value
+
+    def _record(self, target, function, original, args, kwargs):
+        args = list(args)
+        tx = args.pop() if args and isinstance(args[-1], dict) else {}
+        entry = {
+            "phase": self._phase,
+            "function": function,
+            "sender": self._actor(tx["from"]),
+            "args": self._encode(args),
+            "value": int(Wei(tx.get("value", tx.get("amount", 0)))),
+        }
+        if function == "constructor":
+            entry["contract"] = target._name
+        else:
+            # a contract deployed before the recording started cannot be
+            # replayed, see Replay
+            entry["contract"] = target._name.split(".")[0]
+            entry["target"] = self.contracts.get(str(target._address))
+        try:
+            result = original(target, *args, tx, **kwargs)
+        except Exception as error:
+            # reverted, or refused before it was sent; either way the replay,
+            # which sends with a fixed gas limit, should see it revert
+            entry.update(status=0, revert=getattr(error, "revert_msg", None), gas=None)
+            self.calls.append(entry)
+            raise
+        receipt = result.tx if function == "constructor" else result
+        status = int(receipt.status)
+        entry.update(
+            status=status if status >= 0 else None,
+            revert=receipt.revert_msg if status == 0 else None,
+            gas=receipt.gas_used,
+        )
+        if function == "constructor":
+            self.contracts[str(result.address)] = len(self.names)
+            self.names.append(target._name)
+        self.calls.append(entry)
+        return result
+
+    # Trace
+
+    def trace(self):
+        return {
+            "version": TRACE_VERSION,
+            "network": network.show_active(),
+            "actors": len(self.actors),
+            "contracts": list(self.names),
+            "calls": list(self.calls),
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.trace(), f, indent=1)
+        return path
+
+
+def load_trace(path):
+    with open(path) as f:
+        trace = json.load(f)
+    if trace.get("version") != TRACE_VERSION:
+        raise ValueError(f"{path} is not a version {TRACE_VERSION} trace")
+    return trace
+
+
+def phases(calls):
+    # [(phase name, calls)], consecutive calls of the same phase together and
+    # deployments apart from calls
+    grouped, previous = [], None
+    for call in calls:
+        key = (call["phase"] or call["function"], call["function"] == "constructor")
+        if key == previous:
+            grouped[-1][1].append(call)
+        else:
+            grouped.append((key[0], [call]))
+        previous = key
+    return grouped
+
+
+def provision(trace, scale):
+    # actors[copy][actor] -> account, funded for what the actor sends
+    needed = [GAS_ALLOWANCE] * trace["actors"]
+    for call in trace["calls"]:
+        needed[call["sender"]] += call["value"]
+    # accounts added by earlier scripts or tests come after the node's
+    node_accounts = list(accounts)[: len(web3.eth.accounts)]
+    actors, funding = [], []
+    for copy in range(scale):
+        actors.append([])
+        for actor in range(trace["actors"]):
+            if copy == 0 and actor < len(node_accounts):
+                actors[copy].append(node_accounts[actor])
+                continue
+            account = accounts.add()
+            actors[copy].append(account)
+            funding.append((account, needed[actor]))
+    if funding:
+        pipeline = TxPipeline(tracker=shared_tracker())
+        for i, (account, amount) in enumerate(funding):
+            pipeline.transfer(node_accounts[i % len(node_accounts)], account, amount)
+        pipeline.run()
+    return actors
+
+
+class Replay:
+    def __init__(self, trace, scale=1, gas_limit=GAS_LIMIT):
+        missing = {
+            call["contract"] for call in trace["calls"] if call.get("target", 0) is None
+        }
+        if missing:
+            names = ", ".join(sorted(missing))
+            raise ValueError(f"The trace calls {names} deployed before it started")
+        self.trace = trace
+        self.scale = scale
+        self.gas_limit = gas_limit
+        self.actors = None
+        self.deployments = [[] for _ in range(scale)]
+
+    def _decode(self, value, copy):
+        if isinstance(value, list):
+            return [self._decode(item, copy) for item in value]
+        if isinstance(value, dict):
+            if "actor" in value:
+                return self.actors[copy][value["actor"]]
+            if "contract" in value:
+                return self.deployments[copy][value["contract"]]
+            return bytes.fromhex(value["hex"])
+        return value
+
+    def _deploy(self, calls):
+        # Deployments go one by one, later calls need their addresses
+        outcomes = []
+        for copy in range(self.scale):
+            for call in calls:
+                sender = self.actors[copy][call["sender"]]
+                contract = _container(call["contract"]).deploy(
+                    *self._decode(call["args"], copy),
+                    {"from": sender, "value": call["value"]},
+                )
+                self.deployments[copy].append(contract)
+                outcomes.append((call, contract.tx.status, contract.tx.gas_used))
+        return outcomes
+
+    def _send(self, calls):
+        pipeline = TxPipeline(gas_limit=self.gas_limit, tracker=shared_tracker())
+        steps = []
+        for copy in range(self.scale):
+            for call in calls:
+                contract = self.deployments[copy][call["target"]]
+                name = pipeline.call(
+                    getattr(contract, call["function"]),
+                    *self._decode(call["args"], copy),
+                    sender=self.actors[copy][call["sender"]],
+                    value=call["value"],
+                )
+                steps.append((call, name))
+        try:
+            pipeline.run()
+        except PipelineError:
+            # expected reverts are compared below with the rest
+            pass
+        outcomes = []
+        for call, name in steps:
+            receipt = pipeline.receipt(name)
+            if receipt is None or receipt.status < 0:
+                outcomes.append((call, None, None))
+            else:
+                outcomes.append((call, receipt.status, receipt.gas_used))
+        return outcomes
+
+    def run(self):
+        start = time.perf_counter()
+        self.actors = provision(self.trace, self.scale)
+        report = {
+            "network": network.show_active(),
+            "client": web3.clientVersion,
+            "scale": self.scale,
+            "actors": self.trace["actors"] * self.scale,
+            "provisioning_seconds": round(time.perf_counter() - start, 3),
+            "phases": [],
+        }
+        replay_start = time.perf_counter()
+        for name, calls in phases(self.trace["calls"]):
+            phase_start = time.perf_counter()
+            if calls[0]["function"] == "constructor":
+                outcomes = self._deploy(calls)
+            else:
+                outcomes = self._send(calls)
+            elapsed = time.perf_counter() - phase_start
+            gas = [gas for _, _, gas in outcomes if gas is not None]
+            report["phases"].append(
+                {
+                    "phase": name,
+                    "transactions": len(outcomes),
+                    "seconds": round(elapsed, 3),
+                    "tps": round(len(outcomes) / elapsed, 1),
+                    "gas": sum(gas),
+                    "gas_per_transaction": sum(gas) // len(gas) if gas else None,
+                    "reverted": sum(1 for _, status, _ in outcomes if status == 0),
+                    # failed before a receipt, e.g. refused by the node
+                    "unsent": sum(1 for _, status, _ in outcomes if status is None),
+                    "mismatches": sum(
+                        1
+                        for call, status, _ in outcomes
+                        if call["status"] is not None
+                        and status is not None
+                        and status != call["status"]
+                    ),
+                }
+            )
+        elapsed = time.perf_counter() - replay_start
+        transactions = sum(phase["transactions"] for phase in report["phases"])
+        report["transactions"] = transactions
+        report["seconds"] = round(elapsed, 3)
+        report["tps"] = round(transactions / elapsed, 1)
+        report["gas"] = sum(phase["gas"] for phase in report["phases"])
+        report["unsent"] = sum(phase["unsent"] for phase in report["phases"])
+        report["bytecode"] = {
+            name: hashlib.sha256(_container(name).bytecode.encode()).hexdigest()[:16]
+            for name in set(self.trace["contracts"])
+        }
+        return report
+
+
+def print_report(report):
+    print(
+        f"{report['transactions']} transactions on {report['network']} "
+        f"({report['client']}), {report['actors']} actors, scale {report['scale']}"
+    )
+    print(
+        f"{'phase':<28}{'txs':>7}{'seconds':>9}{'tps':>9}{'gas/tx':>10}"
+        f"{'unsent':>8}{'diff':>6}"
+    )
+    for phase in report["phases"]:
+        print(
+            f"{phase['phase']:<28}{phase['transactions']:>7}{phase['seconds']:>9}"
+            f"{phase['tps']:>9}{phase['gas_per_transaction'] or '-':>10}"
+            f"{phase['unsent']:>8}{phase['mismatches']:>6}"
+        )
+    print(
+        f"{report['tps']} tx/s overall, {report['gas']} gas, "
+        f"{report['unsent']} transactions not sent"
+    )
+
+
+def record(script="deploy", function="main", path=None, *args):
+    # Runs scripts/<script>.py:<function> and saves its trace
+    path = path or os.path.join("reports", f"{script}.{function}.trace.json")
+    module = importlib.import_module(f"scripts.{script}")
+    with Recorder() as recorder:
+        getattr(module, function)(*args)
+    recorder.save(path)
+    print(f"{len(recorder.calls)} transactions of {recorder.trace()['actors']} actors")
+    print(f"Trace written to {path}")
+    return recorder.trace()
+
+
+def replay(path, scale=1, gas_limit=GAS_LIMIT):
+    report = Replay(load_trace(path), int(scale), int(gas_limit)).run()
+    report["trace"] = path
+    print_report(report)
+    os.makedirs("reports", exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {REPORT_PATH}")
+    return report
+
+
+def main(path, scale=1):
+    return replay(path, scale)
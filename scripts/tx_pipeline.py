@@ -0,0 +1,200 @@
+import time
+
+from brownie import web3
+
+# Sends transactions back-to-back instead of waiting for each receipt before
+# sending the next one. Nonces are tracked locally per sender so that calls
+# from the same account can be broadcast without waiting, and ordering is only
+# enforced where a step declares explicit dependencies with `after`.
+#
+#   pipeline = TxPipeline()
+#   start = pipeline.call(voting.startVotingPeriod, 1, sender=owner)
+#   for candidate in candidates:
+#       pipeline.call(voting.runAsCandidate, "Michel", sender=candidate, after=[start])
+#   receipts = pipeline.run()
+#
+# With a ReceiptTracker (scripts/receipt_tracker.py), contract calls and
+# transfers are broadcast raw and all the receipts of a wave are resolved by
+# the tracker's single polling loop instead of one brownie loop per
+# transaction.
+
+
+class PipelineError(Exception):
+    def __init__(self, failures):
+        self.failures = failures
+        names = ", ".join(failures)
+        super().__init__(f"{len(failures)} pipeline step(s) failed: {names}")
+
+
+class _Step:
+    def __init__(self, name, sender, send, after):
+        self.name = name
+        self.sender = sender
+        self.send = send
+        self.after = list(after)
+        self.receipt = None
+        self.error = None
+        # perf_counter() when the step was broadcast and when its receipt came back
+        self.sent_at = None
+        self.confirmed_at = None
+
+
+class TxPipeline:
+    def __init__(self, required_confs=1, gas_limit=None, tracker=None):
+        self.required_confs = required_confs
+        self.gas_limit = gas_limit
+        self.tracker = tracker
+        self._nonces = {}
+        self._steps = {}
+        self._gas_price = None
+
+    def next_nonce(self, sender):
+        # The first nonce comes from the node (including pending transactions),
+        # every following one is handed out locally.
+        address = str(sender)
+        if address not in self._nonces:
+            self._nonces[address] = web3.eth.get_transaction_count(address, "pending")
+        nonce = self._nonces[address]
+        self._nonces[address] += 1
+        return nonce
+
+    def resync_nonce(self, sender):
+        self._nonces.pop(str(sender), None)
+
+    def add(self, sender, send, after=(), name=None):
+        # `send` receives the transaction parameters (sender, nonce, ...) and
+        # must broadcast the transaction and return its receipt.
+        if name is None:
+            name = f"step-{len(self._steps)}"
+        if name in self._steps:
+            raise ValueError(f"Duplicate pipeline step {name}")
+        for dependency in after:
+            if dependency not in self._steps:
+                raise ValueError(f"Unknown dependency {dependency} for step {name}")
+        self._steps[name] = _Step(name, sender, send, after)
+        return name
+
+    def _send_tracked(self, tx, fields):
+        # The gas price is read once per run() for every raw transaction
+        if self._gas_price is None:
+            self._gas_price = web3.eth.gas_price
+        fields = dict(fields, nonce=tx["nonce"], gasPrice=self._gas_price)
+        if "gas_limit" in tx:
+            fields["gas"] = tx["gas_limit"]
+        return self.tracker.send(tx["from"], fields, self.required_confs)
+
+    def call(self, method, *args, sender, value=0, after=(), name=None):
+        def send(tx):
+            if self.tracker is not None:
+                fields = {"to": method._address, "data": method.encode_input(*args)}
+                return self._send_tracked(tx, dict(fields, value=value))
+            if value:
+                tx["amount"] = value
+            return method(*args, tx)
+
+        if name is None:
+            name = f"{method._name}-{len(self._steps)}"
+        return self.add(sender, send, after=after, name=name)
+
+    def transfer(self, sender, to, amount, after=(), name=None):
+        def send(tx):
+            if self.tracker is not None:
+                return self._send_tracked(tx, {"to": str(to), "value": amount})
+            return sender.transfer(
+                to,
+                amount,
+                gas_limit=tx.get("gas_limit"),
+                nonce=tx["nonce"],
+                required_confs=0,
+                silent=True,
+            )
+
+        if name is None:
+            name = f"transfer-{len(self._steps)}"
+        return self.add(sender, send, after=after, name=name)
+
+    def receipt(self, name):
+        return self._steps[name].receipt
+
+    def step(self, name):
+        return self._steps[name]
+
+    def _send(self, step):
+        tx = {
+            "from": step.sender,
+            "nonce": self.next_nonce(step.sender),
+            "required_confs": 0,
+        }
+        if self.gas_limit is not None:
+            tx["gas_limit"] = self.gas_limit
+        step.sent_at = time.perf_counter()
+        try:
+            step.receipt = step.send(tx)
+        except Exception as error:
+            # Nothing was broadcast, so the nonce we handed out is still free.
+            step.error = error
+            self.resync_nonce(step.sender)
+
+    def _wait(self, step):
+        try:
+            step.receipt.wait(self.required_confs)
+            step.confirmed_at = time.perf_counter()
+            if step.receipt.status == 0:
+                step.error = step.receipt.revert_msg or "reverted"
+        except Exception as error:
+            step.error = error
+
+    def wait_all(self, steps):
+        # Receipts are collected together once everything has been broadcast.
+        for step in steps:
+            if step.receipt is not None and step.error is None:
+                self._wait(step)
+
+    def run(self):
+        self._gas_price = None
+        steps = list(self._steps.values())
+        done = {
+            step.name
+            for step in steps
+            if step.receipt is not None and step.error is None
+        }
+        failed = {step.name for step in steps if step.error is not None}
+        pending = [
+            step for step in steps if step.receipt is None and step.error is None
+        ]
+        while pending:
+            ready = []
+            blocked = []
+            for step in pending:
+                if any(dependency in failed for dependency in step.after):
+                    step.error = "dependency failed"
+                    failed.add(step.name)
+                elif all(dependency in done for dependency in step.after):
+                    ready.append(step)
+                else:
+                    blocked.append(step)
+            if not ready:
+                # Dependencies always point to earlier steps, so nothing can
+                # be left blocked once no step is ready.
+                break
+
+            for step in ready:
+                self._send(step)
+            self.wait_all(ready)
+
+            for step in ready:
+                if step.error is None:
+                    done.add(step.name)
+                else:
+                    failed.add(step.name)
+            pending = [step for step in blocked if step.name not in failed]
+
+        if failed:
+            raise PipelineError(
+                {
+                    name: self._steps[name].error
+                    for name in self._steps
+                    if name in failed
+                }
+            )
+        return {name: step.receipt for name, step in self._steps.items()}
@@ -0,0 +1,221 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from brownie import Voting, accounts, web3
+from scripts.multicall import BatchReader
+
+# Caching proxy around a brownie contract for scripts and monitoring loops
+# that read the same views over and over.
+#
+#   voting = ViewCache(Voting[-1])
+#   voting.candidateToProfile(address)   # eth_call pinned to the head block
+#   voting.candidateToProfile(address)   # cached until a new block arrives
+#   voting.stats()
+#
+# Results are memoized per (block, function, args) and every call is pinned to
+# the block the cache is on, so the values read between two blocks are
+# consistent with each other. The head is read at most every `head_interval`
+# seconds and the entries of older blocks are dropped when it moves. Entries
+# are evicted least recently used first once their estimated size goes over
+# `max_bytes`. With a BatchReader, prefetch() reads every missing view of a
+# polling round in one multicall per block; it only takes the views of the ABI.
+#
+# Everything that is not a view (transactions, events, attributes) goes
+# straight to the contract. balance() is cached like a view.
+
+MAX_BYTES = 32 * 2**20
+HEAD_INTERVAL = 1.0
+
+
+def _is_view(method):
+    methods = getattr(method, "methods", None)
+    if methods is not None:
+        return all(_is_view(m) for m in methods.values())
+    abi = getattr(method, "abi", None)
+    return abi is not None and abi.get("stateMutability") in ("view", "pure")
+
+
+def _freeze(value):
+    # Hashable form of the arguments, accounts and contracts by address
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if hasattr(value, "address"):
+        return str(value.address)
+    return value
+
+
+def _size(value):
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _CachedView:
+    def __init__(self, cache, name, method):
+        self._cache = cache
+        self._name = name
+        self._method = method
+
+    def __call__(self, *args):
+        return self._cache._get(
+            self._name,
+            args,
+            lambda block: self._method(*args, block_identifier=block),
+        )
+
+    def __getitem__(self, key):
+        # one signature of an overloaded view, e.g. tokensOfOwner["address"]
+        return _CachedView(self._cache, f"{self._name}[{key}]", self._method[key])
+
+    def __getattr__(self, name):
+        return getattr(self._method, name)
+
+
+class ViewCache:
+    def __init__(
+        self, contract, max_bytes=MAX_BYTES, head_interval=HEAD_INTERVAL, reader=None
+    ):
+        self.contract = contract
+        self.max_bytes = max_bytes
+        self.head_interval = head_interval
+        self.reader = reader
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.rpc_calls = 0
+        self._entries = OrderedDict()  # (block, name, args) -> (value, size)
+        self._bytes = 0
+        self._block = None
+        self._head_read_at = None
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        if name == "balance":
+            return lambda: self._get(
+                "balance", (), lambda block: web3.eth.get_balance(self.address, block)
+            )
+        attribute = getattr(self.contract, name)
+        if _is_view(attribute):
+            return _CachedView(self, name, attribute)
+        return attribute
+
+    def block(self):
+        # The block the cache is on, the head read at most every head_interval
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._head_read_at is None
+                or now - self._head_read_at >= self.head_interval
+            ):
+                self._head_read_at = now
+                self.rpc_calls += 1
+                head = web3.eth.block_number
+                if head != self._block:
+                    self._advance(head)
+            return self._block
+
+    def _advance(self, head):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._bytes = 0
+        self._block = head
+
+    def _get(self, name, args, fetch):
+        block = self.block()
+        key = (block, name, _freeze(args))
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self.misses += 1
+        self.rpc_calls += 1
+        value = fetch(block)
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        size = _size(value)
+        with self._lock:
+            if key[0] != self._block or key in self._entries:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def prefetch(self, calls):
+        # calls is a list of (function name, args). The ones not cached for
+        # the current block are read in one multicall batch (needs a reader).
+        # Only the views of the ABI can be batched, anything else (balance, a
+        # transaction, an overloaded name, a typo) is refused before any call.
+        functions = [i for i in self.contract.abi if i["type"] == "function"]
+        names = [i["name"] for i in functions]
+        views = {
+            i["name"]
+            for i in functions
+            if i.get("stateMutability") in ("view", "pure")
+            and names.count(i["name"]) == 1
+        }
+        for name, _ in calls:
+            if name not in views:
+                raise ValueError(f"{name} is not a view of {self.contract._name}")
+        block = self.block()
+        with self._lock:
+            keys = dict.fromkeys((block, name, _freeze(args)) for name, args in calls)
+            missing = [key for key in keys if key not in self._entries]
+        if not missing:
+            return 0
+        reader = self.reader or BatchReader()
+        self.reader = reader
+        requests = [(getattr(self.contract, name), args) for _, name, args in missing]
+        before = reader.eth_calls
+        values = reader.read(requests, block_identifier=block)
+        self.rpc_calls += reader.eth_calls - before
+        for key, value in zip(missing, values):
+            if value is not None:
+                self._store(key, value)
+        return len(missing)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "block": self._block,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "rpc_calls": self.rpc_calls,
+        }
+
+
+def main(rounds=20, interval=0.5, batched=True):
+    # A polling dashboard over the latest Voting deployment
+    voting = ViewCache(Voting[-1])
+    watched = list(accounts)
+    rounds, interval = int(rounds), float(interval)
+    batched = batched in (True, "true", "batched")
+    for _ in range(rounds):
+        if batched:
+            voting.prefetch(
+                [("candidateToProfile", (a,)) for a in watched]
+                + [("voterToCandidate", (a,)) for a in watched]
+                + [("electedCandidate", ())]
+            )
+        for address in watched:
+            voting.candidateToProfile(address)
+            voting.voterToCandidate(address)
+        voting.electedCandidate()
+        voting.balance()
+        time.sleep(interval)
+    print(voting.stats())
+    return voting.stats()
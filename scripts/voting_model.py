@@ -0,0 +1,411 @@
+import time
+
+import numpy as np
+
+# In-memory reference model of the Voting contract state machine. Accounts are
+# numbered densely so that every per-address mapping of the contract
+# (candidateToProfile, voterToCandidate, voterToAmountFunded) becomes a NumPy
+# column, and bulk operations apply thousands of calls in one vectorized pass
+# with the same outcome as sending them one by one.
+#
+# Amounts are kept in gwei so that balances fit in int64 columns. The scalar
+# API mirrors the contract and takes wei, the bulk API takes gwei arrays.
+
+OPEN = 0
+CLOSED = 1
+
+WEI_PER_UNIT = 10**9
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+NO_CANDIDATE = -1
+
+
+class Revert(Exception):
+    pass
+
+
+def to_units(amount):
+    amount = int(amount)
+    if amount % WEI_PER_UNIT:
+        raise ValueError(f"{amount} wei is not a whole number of gwei")
+    return amount // WEI_PER_UNIT
+
+
+class VotingModel:
+    def __init__(self, owner, minimum_funding=10**16, capacity=1024):
+        self.voting_state = CLOSED
+        self.minimum_number_of_votes = 0
+        self.minimum_funding = to_units(minimum_funding)
+        self.elected = NO_CANDIDATE
+        self.balance = 0
+
+        self._ids = {}
+        self._addresses = {}
+        self._size = 0
+        self.names = {}
+        self.candidates = []
+
+        self.is_candidate = np.zeros(capacity, dtype=bool)
+        self.fund_amount = np.zeros(capacity, dtype=np.int64)
+        self.number_of_votes = np.zeros(capacity, dtype=np.int64)
+        self.voter_to_candidate = np.full(capacity, NO_CANDIDATE, dtype=np.int64)
+        self.voter_to_amount_funded = np.zeros(capacity, dtype=np.int64)
+
+        self.owner = self.account_id(owner)
+
+    # Accounts
+
+    @property
+    def size(self):
+        return self._size
+
+    def _reserve(self, size):
+        capacity = len(self.is_candidate)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for column, fill in (
+            ("is_candidate", False),
+            ("fund_amount", 0),
+            ("number_of_votes", 0),
+            ("voter_to_candidate", NO_CANDIDATE),
+            ("voter_to_amount_funded", 0),
+        ):
+            old = getattr(self, column)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, column, new)
+
+    def account_id(self, address):
+        address = str(address)
+        if address not in self._ids:
+            self._reserve(self._size + 1)
+            self._ids[address] = self._size
+            self._addresses[self._size] = address
+            self._size += 1
+        return self._ids[address]
+
+    def add_accounts(self, count):
+        # Anonymous accounts for bulk simulations, returned as an id range.
+        # They have no address until one is asked for.
+        start = self._size
+        self._reserve(start + count)
+        self._size += count
+        return np.arange(start, start + count)
+
+    def known_addresses(self):
+        # {account id: address} of every account that has an address
+        return dict(self._addresses)
+
+    def address_of(self, account):
+        if account == NO_CANDIDATE:
+            return ZERO_ADDRESS
+        account = int(account)
+        if account not in self._addresses:
+            address = f"account-{account}"
+            self._addresses[account] = address
+            self._ids[address] = account
+        return self._addresses[account]
+
+    # Scalar API, one call per contract transaction
+
+    def start_voting_period(self, sender, minimum_number_of_votes):
+        if self.account_id(sender) != self.owner:
+            raise Revert("only the owner can start the voting period")
+        if self.voting_state == OPEN:
+            raise Revert("voting period already open")
+        self.voting_state = OPEN
+        self.minimum_number_of_votes = int(minimum_number_of_votes)
+
+    def run_as_candidate(self, sender, name):
+        candidate = self.account_id(sender)
+        self._require_open()
+        if self.is_candidate[candidate]:
+            raise Revert("already running as a candidate")
+        self.is_candidate[candidate] = True
+        self.names[candidate] = name
+        self.candidates.append(candidate)
+
+    def vote(self, sender, candidate):
+        voter = self.account_id(sender)
+        candidate = self.account_id(candidate)
+        self._require_open()
+        self._require_candidate(candidate)
+        if self.voter_to_candidate[voter] != NO_CANDIDATE:
+            raise Revert("already voted")
+        self.voter_to_candidate[voter] = candidate
+        self.number_of_votes[candidate] += 1
+
+    def fund(self, sender, candidate, amount):
+        voter = self.account_id(sender)
+        candidate = self.account_id(candidate)
+        amount = to_units(amount)
+        self._require_open()
+        self._require_candidate(candidate)
+        if amount < self.minimum_funding:
+            raise Revert("funding below the minimum amount")
+        if self.number_of_votes[candidate] < self.minimum_number_of_votes:
+            raise Revert("candidate does not have enough votes")
+        if self.voter_to_candidate[voter] != candidate:
+            raise Revert("can only fund the candidate you voted for")
+        self.fund_amount[candidate] += amount
+        self.voter_to_amount_funded[voter] += amount
+        self.balance += amount
+
+    def delegate(self, sender, delegatee):
+        self._delegate(self.account_id(sender), self.account_id(delegatee))
+
+    def _delegate(self, delegater, delegatee):
+        self._require_open()
+        if not self.is_candidate[delegater]:
+            raise Revert("only candidates can delegate")
+        self._require_candidate(delegatee)
+        if self.number_of_votes[delegatee] < self.minimum_number_of_votes:
+            raise Revert("delegatee does not have enough votes")
+        # Votes move to the delegatee, funds stay with the delegater's profile.
+        self.number_of_votes[delegatee] += self.number_of_votes[delegater]
+        self.number_of_votes[delegater] = 0
+        self.is_candidate[delegater] = False
+
+    def elect_candidate(self, sender):
+        self._require_open()
+        if self.account_id(sender) != self.owner:
+            raise Revert("only the owner can elect a candidate")
+        order = np.asarray(self.candidates, dtype=np.int64)
+        order = order[self.is_candidate[order]]
+        if not len(order):
+            raise Revert("no candidate is running")
+        # Most votes wins, funding breaks ties, then registration order.
+        votes = self.number_of_votes[order]
+        funds = self.fund_amount[order]
+        best = votes == votes.max()
+        best &= funds == funds[best].max()
+        self.elected = int(order[np.argmax(best)])
+        self.voting_state = CLOSED
+        return self.elected
+
+    def voter_fund_claim(self, sender):
+        voter = self.account_id(sender)
+        self._require_elected()
+        if self.voter_to_candidate[voter] == self.elected:
+            raise Revert("voters of the elected candidate cannot claim")
+        amount = int(self.voter_to_amount_funded[voter])
+        self.voter_to_amount_funded[voter] = 0
+        self.balance -= amount
+        return amount * WEI_PER_UNIT
+
+    def elected_candidate_fund_claim(self, sender):
+        self._require_elected()
+        if self.account_id(sender) != self.elected:
+            raise Revert("only the elected candidate can claim")
+        amount = int(self.fund_amount[self.elected])
+        self.fund_amount[self.elected] = 0
+        self.balance -= amount
+        return amount * WEI_PER_UNIT
+
+    def candidate_to_profile(self, candidate):
+        candidate = self.account_id(candidate)
+        return (
+            bool(self.is_candidate[candidate]),
+            int(self.fund_amount[candidate]) * WEI_PER_UNIT,
+            int(self.number_of_votes[candidate]),
+            self.names.get(candidate, ""),
+        )
+
+    def voter_to_candidate_address(self, voter):
+        return self.address_of(int(self.voter_to_candidate[self.account_id(voter)]))
+
+    def apply(self, function, sender, *args, value=0):
+        # Applies a call using the contract function name, as recorded from
+        # transactions or traces.
+        if function == "startVotingPeriod":
+            return self.start_voting_period(sender, *args)
+        if function == "runAsCandidate":
+            return self.run_as_candidate(sender, *args)
+        if function == "vote":
+            return self.vote(sender, *args)
+        if function == "fund":
+            return self.fund(sender, *args, value)
+        if function == "delegate":
+            return self.delegate(sender, *args)
+        if function == "electCandidate":
+            return self.elect_candidate(sender)
+        if function == "voterFundClaim":
+            return self.voter_fund_claim(sender)
+        if function == "ElectedCandidateFundClaim":
+            return self.elected_candidate_fund_claim(sender)
+        raise ValueError(f"Unknown Voting function {function}")
+
+    def _require_open(self):
+        if self.voting_state != OPEN:
+            raise Revert("voting period is not open")
+
+    def _require_candidate(self, candidate):
+        if not self.is_candidate[candidate]:
+            raise Revert("not running as a candidate")
+
+    def _require_elected(self):
+        if self.elected == NO_CANDIDATE:
+            raise Revert("no candidate has been elected")
+
+    # Bulk API, account ids and gwei amounts. Each returns the mask of calls
+    # that would have succeeded when sent in the given order.
+
+    def run_as_candidates(self, candidates, names=None):
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if self.voting_state != OPEN:
+            return np.zeros(len(candidates), dtype=bool)
+        accepted = ~self.is_candidate[candidates] & _first_occurrence(candidates)
+        accepted_ids = candidates[accepted]
+        self.is_candidate[accepted_ids] = True
+        self.candidates.extend(accepted_ids.tolist())
+        for i in np.flatnonzero(accepted):
+            candidate = int(candidates[i])
+            self.names[candidate] = names[i] if names is not None else f"{candidate}"
+        return accepted
+
+    def vote_many(self, voters, candidates):
+        voters = np.asarray(voters, dtype=np.int64)
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if self.voting_state != OPEN:
+            return np.zeros(len(voters), dtype=bool)
+        valid = self.is_candidate[candidates]
+        valid &= self.voter_to_candidate[voters] == NO_CANDIDATE
+        # A voter's later calls in the batch revert once the first valid one
+        # went through.
+        accepted = np.zeros(len(voters), dtype=bool)
+        accepted[np.flatnonzero(valid)[_first_occurrence(voters[valid])]] = True
+        self.voter_to_candidate[voters[accepted]] = candidates[accepted]
+        self.number_of_votes += np.bincount(
+            candidates[accepted], minlength=len(self.number_of_votes)
+        )
+        return accepted
+
+    def fund_many(self, voters, candidates, amounts):
+        voters = np.asarray(voters, dtype=np.int64)
+        candidates = np.asarray(candidates, dtype=np.int64)
+        amounts = np.asarray(amounts, dtype=np.int64)
+        if self.voting_state != OPEN:
+            return np.zeros(len(voters), dtype=bool)
+        # Funding never changes the vote counts or who voted for whom, so
+        # every call in the batch is checked against the same state.
+        accepted = self.is_candidate[candidates]
+        accepted &= amounts >= self.minimum_funding
+        accepted &= self.number_of_votes[candidates] >= self.minimum_number_of_votes
+        accepted &= self.voter_to_candidate[voters] == candidates
+        np.add.at(self.fund_amount, candidates[accepted], amounts[accepted])
+        np.add.at(self.voter_to_amount_funded, voters[accepted], amounts[accepted])
+        self.balance += int(amounts[accepted].sum())
+        return accepted
+
+    def delegate_many(self, delegaters, delegatees):
+        # Delegations can chain, so they are applied in order. There are at
+        # most as many as there are candidates.
+        accepted = np.zeros(len(delegaters), dtype=bool)
+        for i, (delegater, delegatee) in enumerate(zip(delegaters, delegatees)):
+            try:
+                self._delegate(int(delegater), int(delegatee))
+            except Revert:
+                continue
+            accepted[i] = True
+        return accepted
+
+    def voter_fund_claim_all(self, voters=None):
+        # Every voter who did not back the elected candidate gets a refund.
+        self._require_elected()
+        if voters is None:
+            voters = np.arange(self.size)
+        voters = np.asarray(voters, dtype=np.int64)
+        claimable = self.voter_to_candidate[voters] != self.elected
+        refunds = np.where(claimable, self.voter_to_amount_funded[voters], 0)
+        self.voter_to_amount_funded[voters[claimable]] = 0
+        self.balance -= int(refunds.sum())
+        return refunds
+
+
+def _first_occurrence(values):
+    if not len(values) or np.bincount(values).max() == 1:
+        return np.ones(len(values), dtype=bool)
+    mask = np.zeros(len(values), dtype=bool)
+    mask[np.unique(values, return_index=True)[1]] = True
+    return mask
+
+
+def compare_with_contract(model, voting, addresses):
+    # Returns the differences between the model and a deployed Voting contract
+    # for the given addresses, an empty list when they agree.
+    mismatches = []
+    for address in addresses:
+        expected = model.candidate_to_profile(address)
+        actual = tuple(voting.candidateToProfile(address))
+        if expected != actual:
+            mismatches.append(f"candidateToProfile({address}): {actual} != {expected}")
+        expected = model.voter_to_candidate_address(address)
+        actual = voting.voterToCandidate(address)
+        if expected != actual:
+            mismatches.append(f"voterToCandidate({address}): {actual} != {expected}")
+        expected = int(model.voter_to_amount_funded[model.account_id(address)])
+        actual = voting.voterToAmountFunded(address)
+        if expected * WEI_PER_UNIT != actual:
+            mismatches.append(f"voterToAmountFunded({address}): {actual} != {expected}")
+    if model.voting_state != voting.voting_state():
+        mismatches.append(
+            f"voting_state: {voting.voting_state()} != {model.voting_state}"
+        )
+    if model.balance * WEI_PER_UNIT != voting.balance():
+        mismatches.append(f"balance: {voting.balance()} != {model.balance}")
+    if model.elected != NO_CANDIDATE:
+        expected = model.address_of(model.elected)
+        if voting.electedCandidate() != expected:
+            mismatches.append(
+                f"electedCandidate: {voting.electedCandidate()} != {expected}"
+            )
+    return mismatches
+
+
+def simulate(number_of_voters=10**6, number_of_candidates=10**4, seed=0, settle=True):
+    rng = np.random.default_rng(seed)
+    model = VotingModel("owner", capacity=number_of_voters + number_of_candidates + 1)
+    start = time.perf_counter()
+
+    model.start_voting_period("owner", 5)
+    candidates = model.add_accounts(number_of_candidates)
+    model.run_as_candidates(candidates)
+
+    # Popularity follows a power law so a handful of candidates lead.
+    voters = model.add_accounts(number_of_voters)
+    popularity = 1 / np.arange(1, number_of_candidates + 1)
+    choices = rng.choice(
+        candidates, size=number_of_voters, p=popularity / popularity.sum()
+    )
+    model.vote_many(voters, choices)
+
+    funders = rng.random(number_of_voters) < 0.3
+    amounts = rng.integers(1, 100, size=int(funders.sum())) * model.minimum_funding
+    model.fund_many(voters[funders], choices[funders], amounts)
+
+    delegaters = rng.choice(candidates, size=number_of_candidates // 10, replace=False)
+    model.delegate_many(delegaters, rng.choice(candidates, size=len(delegaters)))
+
+    elected = model.elect_candidate("owner")
+    if not settle:
+        # claims left to the caller, e.g. scripts/merkle_payouts.py
+        return model
+    refunds = model.voter_fund_claim_all(voters)
+    payout = model.elected_candidate_fund_claim(model.address_of(elected))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Simulated {number_of_voters} voters and {number_of_candidates} candidates in {elapsed:.2f}s"
+    )
+    print(
+        f"Elected {model.address_of(elected)} with {model.number_of_votes[elected]} votes"
+    )
+    print(
+        f"Refunded {int(refunds.sum()) * WEI_PER_UNIT} wei, elected candidate claimed {payout} wei"
+    )
+    return model
+
+
+def main():
+    simulate()
@@ -0,0 +1,161 @@
+from brownie import Voting, accounts, chain, history
+from scripts.instrumentation import REPORT_PREFIX, disable, enable
+from scripts.trace import Recorder
+from scripts.tx_pipeline import TxPipeline
+import json
+import os
+import pytest
+
+# Every named election state below is built on top of its parent, and the
+# chain is kept as a brownie snapshot (chain.snapshot / chain.revert) of the
+# last state a test asked for. A test asking for that state again, or for one
+# of its descendants, gets the chain reverted to the snapshot, plus the
+# missing setup transactions, instead of replaying the whole setup.
+#
+# Brownie keeps a single snapshot, so asking for a state that is not built on
+# the snapshotted one resets the chain and rebuilds it from the deployment.
+
+FUNDING_AMOUNT = 10**17
+
+
+def _deploy(voting):
+    return Voting.deploy({"from": accounts[0]})
+
+
+def _open(voting):
+    transaction = voting.startVotingPeriod(1, {"from": accounts[0]})
+    transaction.wait(1)
+
+
+def _register_candidates(voting):
+    pipeline = TxPipeline()
+    for candidate, name in zip(accounts[1:4], ["Michel", "Robert", "Dave"]):
+        pipeline.call(voting.runAsCandidate, name, sender=candidate)
+    pipeline.run()
+
+
+def _cast_votes(voting):
+    # accounts[4:10] vote two by two for the three candidates
+    pipeline = TxPipeline()
+    for i, voter in enumerate(accounts[4:10]):
+        pipeline.call(voting.vote, accounts[1 + i // 2], sender=voter)
+    pipeline.run()
+
+
+def _fund(voting):
+    pipeline = TxPipeline()
+    for i, voter in enumerate(accounts[4:10]):
+        pipeline.call(
+            voting.fund, accounts[1 + i // 2], sender=voter, value=FUNDING_AMOUNT
+        )
+    pipeline.run()
+
+
+ELECTION_STATES = {
+    "deployed": (None, _deploy),
+    "open": ("deployed", _open),
+    "candidates": ("open", _register_candidates),
+    "votes": ("candidates", _cast_votes),
+    "funded": ("votes", _fund),
+}
+
+
+class ChainStates:
+    def __init__(self, recipes):
+        self.contract = None
+        self._recipes = recipes
+        self._current = None
+
+    def _lineage(self, name):
+        names = []
+        while name is not None:
+            names.append(name)
+            name = self._recipes[name][0]
+        return names[::-1]
+
+    def restore(self, name):
+        lineage = self._lineage(name)
+        if self._current in lineage:
+            chain.revert()
+            missing = lineage[lineage.index(self._current) + 1 :]
+        else:
+            chain.reset()
+            missing = lineage
+        for state in missing:
+            contract = self._recipes[state][1](self.contract)
+            if contract is not None:
+                self.contract = contract
+        if missing:
+            chain.snapshot()
+            self._current = name
+        return self.contract
+
+
+@pytest.fixture(scope="module")
+def election_states():
+    yield ChainStates(ELECTION_STATES)
+    chain.reset()
+
+
+@pytest.fixture
+def deployed_voting(election_states):
+    return election_states.restore("deployed")
+
+
+@pytest.fixture
+def open_voting(election_states):
+    return election_states.restore("open")
+
+
+@pytest.fixture
+def candidates_voting(election_states):
+    # accounts[1:4] run as Michel, Robert and Dave
+    return election_states.restore("candidates")
+
+
+@pytest.fixture
+def voted_voting(election_states):
+    # accounts[4:10] voted two by two for accounts[1], accounts[2], accounts[3]
+    return election_states.restore("votes")
+
+
+@pytest.fixture
+def funded_voting(election_states):
+    # every voter funded its candidate with FUNDING_AMOUNT
+    return election_states.restore("funded")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def instrumentation():
+    # WSK_INSTRUMENT=1 (or a report prefix) instruments every contract call of
+    # the run, see scripts/instrumentation.py
+    setting = os.environ.get("WSK_INSTRUMENT")
+    if not setting:
+        yield None
+        return
+    instrumentation = enable()
+    yield instrumentation
+    disable()
+    instrumentation.write(REPORT_PREFIX if setting == "1" else setting)
+
+
+@pytest.fixture(autouse=True)
+def trace(request):
+    # WSK_TRACE=<directory> saves the transactions of every test as a trace
+    # to replay with scripts/trace.py
+    directory = os.environ.get("WSK_TRACE")
+    if not directory:
+        yield None
+        return
+    with Recorder() as recorder:
+        yield recorder
+    if recorder.calls:
+        recorder.save(os.path.join(directory, f"{request.node.name}.trace.json"))
+
+
+def pytest_sessionfinish(session):
+    # scripts/parallel_tests.py merges the gas profile of every worker
+    path = os.environ.get("WSK_GAS_REPORT")
+    if path:
+        with open(path, "w") as f:
+            json.dump(history.gas_profile, f, indent=2)
@@ -0,0 +1,81 @@
+from brownie import WSKCore, accounts
+from scripts import bulk_mint
+from scripts.bulk_mint import load_state, read_records, state_key, write_records
+from scripts.tx_pipeline import PipelineError, TxPipeline
+import pytest
+
+
+def deploy_records(tmp_path, monkeypatch, count):
+    monkeypatch.chdir(tmp_path)
+    core = WSKCore.deploy({"from": accounts[0]})
+    path = str(tmp_path / "fighters.csv")
+    write_records(path, count, accounts[1:3])
+    # two fighters per batch whatever their gas
+    monkeypatch.setattr(bulk_mint, "batch_size", lambda *args: 2)
+    return core, path, list(read_records(path))
+
+
+def test_bulk_mint_resumes_after_a_window_that_never_came_back(tmp_path, monkeypatch):
+
+    # Arrange
+    core, path, records = deploy_records(tmp_path, monkeypatch, 6)
+    run = TxPipeline.run
+
+    def killed(pipeline):
+        # The first window is mined, the run dies before it is checkpointed
+        run(pipeline)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(TxPipeline, "run", killed)
+    # Test that the first run, without a state file, is interrupted
+    with pytest.raises(KeyboardInterrupt):
+        bulk_mint.main(path, window=1)
+    monkeypatch.setattr(TxPipeline, "run", run)
+    interrupted = load_state()[state_key(core, path)]
+
+    # Act
+    report = bulk_mint.main(path, window=1)
+
+    # Assert
+    assert interrupted["minted"] == []
+    assert interrupted["sent"] == [[0, 1]]
+    assert core.totalSupply() == 6
+    assert report["fighters"] == 4
+    for fighter_id, (genes, fighter_owner) in enumerate(records, start=1):
+        assert core.getFighter(fighter_id)[0] == genes
+        assert core.ownerOf(fighter_id) == fighter_owner
+    assert load_state()[state_key(core, path)]["minted"] == [[0, 6]]
+
+
+def test_bulk_mint_resends_only_the_batch_that_reverted(tmp_path, monkeypatch):
+
+    # Arrange
+    core, path, records = deploy_records(tmp_path, monkeypatch, 6)
+    call = TxPipeline.call
+
+    def second_batch_reverts(pipeline, method, genes, owners, **kwargs):
+        if len(pipeline._steps) == 1:
+            # one owner short, createGen0Fighters reverts
+            owners = owners[:-1]
+        return call(pipeline, method, genes, owners, **kwargs)
+
+    monkeypatch.setattr(TxPipeline, "call", second_batch_reverts)
+    # Test that the run stops on the reverted batch, the others are mined
+    with pytest.raises(PipelineError):
+        bulk_mint.main(path, window=3)
+    monkeypatch.setattr(TxPipeline, "call", call)
+    stopped = load_state()[state_key(core, path)]
+
+    # Act
+    report = bulk_mint.main(path, window=3)
+
+    # Assert
+    assert stopped["minted"] == [[0, 2], [4, 6]]
+    assert stopped["sent"] == []
+    assert report["fighters"] == 2
+    assert core.totalSupply() == 6
+    # the resent batch got the last two fighter IDs
+    minted = [records[0], records[1], records[4], records[5], records[2], records[3]]
+    for fighter_id, (genes, fighter_owner) in enumerate(minted, start=1):
+        assert core.getFighter(fighter_id)[0] == genes
+        assert core.ownerOf(fighter_id) == fighter_owner
@@ -0,0 +1,66 @@
+from brownie import WSKCore
+from scripts import compile_cache
+from scripts.compile_cache import LazyContainer, content_hashes, stale_contracts
+import json
+import os
+import shutil
+
+
+def test_keys_follow_the_import_graph(tmp_path):
+
+    # Arrange
+    shutil.copytree("contracts", tmp_path / "contracts")
+    shutil.copy("brownie-config.yaml", tmp_path)
+    before = content_hashes(str(tmp_path))
+
+    # Act
+    with open(tmp_path / "contracts" / "ERC721Metadata.sol", "a") as f:
+        f.write("\n// edited\n")
+    after = content_hashes(str(tmp_path))
+
+    # Assert
+    changed = {source for source in before if before[source] != after[source]}
+    # the edited source and the contracts importing it, nothing else
+    assert "contracts/ERC721Metadata.sol" in changed
+    assert "contracts/WSKCore.sol" in changed
+    assert "contracts/Multicall.sol" not in changed
+    assert "contracts/MerklePayout.sol" not in changed
+
+
+def test_stale_sources_are_restored_from_the_store(tmp_path, monkeypatch):
+
+    # Arrange
+    shutil.copytree("contracts", tmp_path / "contracts")
+    shutil.copy("brownie-config.yaml", tmp_path)
+    monkeypatch.setattr(compile_cache, "STORE", str(tmp_path / "store"))
+    path = str(tmp_path)
+    hashes = content_hashes(path)
+    os.makedirs(tmp_path / "build" / "contracts")
+    artifact = {"sourcePath": "contracts/Multicall.sol", "dependencies": []}
+    with open(tmp_path / "build" / "contracts" / "Multicall.json", "w") as f:
+        json.dump(artifact, f)
+    compile_cache._store(
+        path, hashes["contracts/Multicall.sol"], ["contracts/Multicall.json"]
+    )
+    shutil.rmtree(tmp_path / "build")
+
+    # Act
+    files = compile_cache._restore(path, hashes["contracts/Multicall.sol"])
+
+    # Assert
+    assert files == ["contracts/Multicall.json"]
+    with open(tmp_path / "build" / "contracts" / "Multicall.json") as f:
+        assert json.load(f) == artifact
+    # nothing is listed in the manifest yet, every source is still stale
+    assert len(stale_contracts(path, hashes)) == len(hashes)
+
+
+def test_containers_are_loaded_on_first_use():
+
+    # Act
+    from scripts.compile_cache import WSKCore as lazy
+
+    # Assert
+    assert isinstance(lazy, LazyContainer)
+    # inside brownie test the project is loaded, first use returns its container
+    assert lazy.signatures == WSKCore.signatures
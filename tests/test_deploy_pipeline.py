@@ -0,0 +1,69 @@
+from brownie import WSKCore, accounts
+from scripts import deploy_pipeline
+from scripts.deploy_pipeline import STATE_PATH, load_state
+from scripts.tx_pipeline import TxPipeline
+from types import SimpleNamespace
+import pytest
+
+# The development network is never resumed, the test runs under another name
+NETWORK = "resume-test"
+
+
+def test_interrupted_deployment_resumes_without_resending(tmp_path, monkeypatch):
+
+    # Arrange
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        deploy_pipeline, "network", SimpleNamespace(show_active=lambda: NETWORK)
+    )
+    roles = {
+        "deployer": accounts[0],
+        "cfo": accounts[1],
+        "coo": accounts[2],
+        "ceo": accounts[0],
+    }
+    wait_all = TxPipeline.wait_all
+    send = TxPipeline._send
+    sent = []
+
+    def interrupted(pipeline, steps):
+        # The configure wave is mined, the run dies before unpause is sent
+        wait_all(pipeline, steps)
+        if any(step.name == "setCFO" for step in steps):
+            raise KeyboardInterrupt
+
+    def recorded(pipeline, step):
+        sent.append(step.name)
+        send(pipeline, step)
+
+    monkeypatch.setattr(TxPipeline, "wait_all", interrupted)
+    # Test that the first run is interrupted after the configure wave
+    with pytest.raises(KeyboardInterrupt):
+        deploy_pipeline.run(roles)
+    monkeypatch.setattr(TxPipeline, "wait_all", wait_all)
+    confirmed = load_state()[NETWORK]["steps"]
+    monkeypatch.setattr(TxPipeline, "_send", recorded)
+
+    # Act
+    report, error = deploy_pipeline.run(roles)
+
+    # Assert
+    assert tmp_path.joinpath(STATE_PATH).exists()
+    assert set(confirmed) == {
+        "WSKCore",
+        "ERC721Metadata",
+        "setCFO",
+        "setCOO",
+        "setMetadataAddress",
+        "setSecondsPerBlock",
+    }
+    assert error is None
+    # only the step that was never mined is sent again
+    assert sent == ["unpause"]
+    assert set(report["resumed"]) == set(confirmed)
+    assert load_state()[NETWORK]["steps"]["WSKCore"] == confirmed["WSKCore"]
+    core = WSKCore.at(confirmed["WSKCore"]["address"])
+    assert not core.paused()
+    assert core.cfoAddress() == accounts[1]
+    assert core.cooAddress() == accounts[2]
+    assert core.erc721Metadata() == confirmed["ERC721Metadata"]["address"]
@@ -0,0 +1,125 @@
+from brownie import WSKCore, accounts, chain, web3
+from scripts.event_indexer import FighterIndexer
+from scripts.voting_model import ZERO_ADDRESS
+import pytest
+
+
+def deploy_fighters(owner, batches):
+    core = WSKCore.deploy({"from": owner})
+    start_block = web3.eth.block_number
+    for genes in batches:
+        transaction = core.createGen0Fighters(
+            genes, [ZERO_ADDRESS] * len(genes), {"from": owner}
+        )
+        transaction.wait(1)
+    return core, start_block
+
+
+def test_indexer_halves_failing_ranges_and_resumes_from_its_checkpoint(
+    tmp_path, monkeypatch
+):
+
+    # Arrange
+    owner = accounts[0]
+    core, start_block = deploy_fighters(owner, [[1, 2], [3], [4, 5, 6], [7]])
+    path = str(tmp_path / "fighters.db")
+    get_logs = web3.eth.get_logs
+    queries = []
+    refused = []
+
+    def one_block_at_a_time(params):
+        # Test that a node refusing any multi-block range still gets indexed
+        if params["toBlock"] > params["fromBlock"]:
+            refused.append((params["fromBlock"], params["toBlock"]))
+            raise ValueError("query returned more than 10000 results")
+        queries.append(params["fromBlock"])
+        return get_logs(params)
+
+    monkeypatch.setattr(web3.eth, "get_logs", one_block_at_a_time)
+    indexer = FighterIndexer(
+        core, path, start_block=start_block, chunk_size=8, confirmations=0
+    )
+
+    # Act
+    indexer.sync()
+    checkpoint = indexer.checkpoint
+    transaction = core.unpause({"from": owner})
+    transaction.wait(1)
+    transaction = core.transfer(accounts[1], 3, {"from": owner})
+    transaction.wait(1)
+    queries.clear()
+    resumed = FighterIndexer(
+        core, path, start_block=start_block, chunk_size=8, confirmations=0
+    )
+    resumed.sync()
+
+    # Assert
+    assert refused
+    assert checkpoint == transaction.block_number - 2
+    assert queries[0] == checkpoint + 1
+    assert resumed.checkpoint == web3.eth.block_number
+    assert resumed.tokens_of_owner(owner) == sorted(
+        core.tokensOfOwner["address"](owner)
+    )
+    assert resumed.tokens_of_owner(accounts[1]) == [3]
+    assert resumed.fighter(7)["genes"] == 7
+
+
+def test_indexer_rolls_back_a_reorganised_transfer(tmp_path, monkeypatch):
+
+    # Arrange
+    owner = accounts[0]
+    core, start_block = deploy_fighters(owner, [[1, 2, 3]])
+    minted = web3.eth.block_number
+    transaction = core.unpause({"from": owner})
+    transaction.wait(1)
+    indexer = FighterIndexer(
+        core, str(tmp_path / "fighters.db"), start_block=start_block, confirmations=0
+    )
+    transaction = core.transfer(accounts[1], 1, {"from": owner})
+    transaction.wait(1)
+    indexer.sync()
+    rollbacks = []
+    rollback = indexer._rollback
+
+    def record_rollback(block_number):
+        rollbacks.append(block_number)
+        rollback(block_number)
+
+    monkeypatch.setattr(indexer, "_rollback", record_rollback)
+    # The block holding the transfer is replaced by one sending the fighter
+    # elsewhere
+    chain.undo()
+    transaction = core.transfer(accounts[2], 1, {"from": owner})
+    transaction.wait(1)
+
+    # Act
+    indexer.sync()
+
+    # Assert
+    # the mint is the last indexed block still on the chain
+    assert rollbacks == [minted]
+    assert indexer.owner_of(1) == accounts[2]
+    assert indexer.tokens_of_owner(accounts[1]) == []
+    assert indexer.tokens_of_owner(owner) == [2, 3]
+    assert indexer.checkpoint == web3.eth.block_number
+
+
+def test_indexer_refuses_a_database_of_another_contract(tmp_path):
+
+    # Arrange
+    owner = accounts[0]
+    core, start_block = deploy_fighters(owner, [[1, 2]])
+    other, _ = deploy_fighters(owner, [[3]])
+    path = str(tmp_path / "fighters.db")
+    indexer = FighterIndexer(core, path, start_block=start_block, confirmations=0)
+    indexer.sync()
+
+    # Act
+    reopened = FighterIndexer(core, path, start_block=start_block, confirmations=0)
+
+    # Assert
+    assert reopened.tokens_of_owner(owner) == [1, 2]
+    # Test that the fighters of another deployment are not mixed in
+    with pytest.raises(ValueError):
+        FighterIndexer(other, path, start_block=start_block, confirmations=0)
@@ -0,0 +1,62 @@
+from scripts.fight_engine import (
+    LOSS_EXPERIENCE,
+    WIN_EXPERIENCE,
+    bracket,
+    fight,
+    level_for,
+    random_roster,
+    round_robin,
+)
+import numpy as np
+
+
+def test_fight_updates_records():
+
+    # Arrange
+    roster = random_roster(2, np.random.default_rng(0))
+    roster["strengh"][:] = [100, 0]
+
+    # Act
+    winners = fight(roster, [0, 0, 0], [1, 1, 1], np.random.default_rng(1))
+
+    # Assert
+    assert winners.tolist() == [0, 0, 0]
+    assert roster["victories"].tolist() == [3, 0]
+    assert roster["defeats"].tolist() == [0, 3]
+    assert roster["experience"].tolist() == [3 * WIN_EXPERIENCE, 3 * LOSS_EXPERIENCE]
+    assert roster["level"].tolist() == level_for(roster["experience"]).tolist()
+
+
+def test_fights_are_reproducible():
+
+    # Arrange
+    first = random_roster(1000, np.random.default_rng(7))
+    second = random_roster(1000, np.random.default_rng(7))
+    a = np.arange(0, 1000, 2)
+    b = np.arange(1, 1000, 2)
+
+    # Act
+    winners = fight(first, a, b, np.random.default_rng(3))
+
+    # Assert
+    assert (fight(second, a, b, np.random.default_rng(3)) == winners).all()
+    assert (first["victories"] == second["victories"]).all()
+
+
+def test_bracket_and_round_robin():
+
+    # Arrange
+    rng = np.random.default_rng(5)
+    roster = random_roster(12, rng)
+
+    # Act
+    champion, rounds = bracket(roster, np.arange(12), rng)
+    wins = round_robin(roster, np.arange(11), rng, legs=2)
+
+    # Assert
+    assert [len(winners) for winners in rounds] == [4, 4, 2, 1]
+    assert rounds[-1][0] == champion
+    # every pair met twice, once per leg
+    assert wins.sum() == 11 * 10
+    # 11 fights in the bracket and 110 in the league, two fighters each
+    assert (roster["victories"] + roster["defeats"]).sum() == 2 * (11 + 110)
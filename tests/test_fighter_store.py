@@ -0,0 +1,100 @@
+from brownie import WSKCore, accounts, chain
+from scripts.fighter_store import (
+    COLUMNS,
+    FIGHTERS_SLOT,
+    FighterStore,
+    element_slot,
+    export,
+)
+from scripts.helpful_scripts import rpc_batch
+from scripts.voting_model import ZERO_ADDRESS
+import pytest
+
+# Genes over every limb, and counters and stats with a different value in
+# every field, the top bits included
+GENES = [2**256 - 2, 7 << 192 | 5 << 128 | 3 << 64 | 1, 0x1234]
+COUNTERS = [(1, 2, 3, 4), (2**64 - 1, 0, 2**63, 9), (0, 0, 0, 0)]
+STATS = [(10, 20, 30), (2**32 - 1, 1, 2**31), (0, 0, 5)]
+
+
+def set_stats(core, fighter_id, counters, stats):
+    # Nothing changes the stats of a fighter on chain yet, they are written
+    # to its storage words directly
+    level, experience, victories, defeats = counters
+    agility, speed, strengh = stats
+    words = {
+        1: level | experience << 64 | victories << 128 | defeats << 192,
+        2: agility | speed << 32 | strengh << 64,
+    }
+    slot = element_slot(FIGHTERS_SLOT, fighter_id)
+    rpc_batch(
+        [
+            (
+                "evm_setAccountStorageAt",
+                [str(core.address), f"0x{slot + offset:064x}", f"0x{word:064x}"],
+            )
+            for offset, word in words.items()
+        ]
+    )
+
+
+def mint(core, genes):
+    transaction = core.createGen0Fighters(
+        genes, [ZERO_ADDRESS] * len(genes), {"from": accounts[0]}
+    )
+    transaction.wait(1)
+    first = core.totalSupply() - len(genes) + 1
+    return range(first, first + len(genes))
+
+
+def stored_fighter(columns, fighter_id):
+    genes = sum(
+        int(limb) << (64 * i) for i, limb in enumerate(columns["genes"][fighter_id])
+    )
+    return (genes, *(int(columns[name][fighter_id]) for name in list(COLUMNS)[1:]))
+
+
+def test_export_matches_get_fighter_and_resumes(tmp_path):
+
+    # Arrange
+    core = WSKCore.deploy({"from": accounts[0]})
+    for fighter_id, counters, stats in zip(mint(core, GENES), COUNTERS, STATS):
+        set_stats(core, fighter_id, counters, stats)
+    chain.mine()
+    store = FighterStore(str(tmp_path / "fighters"))
+
+    # Act
+    exported = export(core, store)
+    first_block = store.meta["block"]
+    added = mint(core, [11, 12])
+    exported_again = export(core, FighterStore(str(tmp_path / "fighters")))
+    store = FighterStore(str(tmp_path / "fighters"))
+    columns = store.load()
+
+    # Assert
+    # the unKitty and the three fighters, then only the two new ones
+    assert exported == 4
+    assert exported_again == 2
+    assert store.count == 6
+    assert store.meta["block"] > first_block
+    assert list(added) == [4, 5]
+    for fighter_id in range(store.count):
+        assert stored_fighter(columns, fighter_id) == core.getFighter(fighter_id)
+    assert stored_fighter(columns, 2)[1:] == COUNTERS[1] + STATS[1]
+
+
+def test_export_refuses_another_deployment(tmp_path):
+
+    # Arrange
+    core = WSKCore.deploy({"from": accounts[0]})
+    mint(core, [1, 2])
+    other = WSKCore.deploy({"from": accounts[0]})
+    mint(other, [3])
+    store = FighterStore(str(tmp_path / "fighters"))
+    export(core, store)
+
+    # Test that the fighters of another WSKCore are not written over ours
+    with pytest.raises(ValueError):
+        export(other, store)
+    assert store.count == 3
+    assert stored_fighter(store.load(), 2)[0] == 2
@@ -0,0 +1,66 @@
+from scripts.genes import (
+    GENES_PER_TRAIT,
+    TRAITS,
+    decode,
+    encode,
+    encode_one,
+    from_limbs,
+    gene_offset,
+    histograms,
+    rarity,
+    to_limbs,
+)
+import numpy as np
+import pytest
+
+
+def test_genes_round_trip():
+
+    # Arrange
+    rng = np.random.default_rng(11)
+    traits = {
+        trait: rng.integers(0, 32, size=(500, GENES_PER_TRAIT)) for trait in TRAITS
+    }
+
+    # Act
+    decoded = decode(encode(traits))
+
+    # Assert
+    for trait in TRAITS:
+        assert (decoded[trait] == traits[trait]).all()
+    # the gene crossing the first limb boundary
+    assert gene_offset("hair_color", 0) < 64 < gene_offset("hair_color", 0) + 5
+
+
+def test_genes_match_python_ints():
+
+    # Arrange
+    genes = encode_one(body=3, hair_color=[[31, 1, 2, 3]], special=17)
+    expected = 3 | (31 << gene_offset("hair_color")) | (17 << gene_offset("special"))
+    expected |= (1 << gene_offset("hair_color", 1)) | (
+        2 << gene_offset("hair_color", 2)
+    )
+    expected |= 3 << gene_offset("hair_color", 3)
+
+    # Assert
+    assert genes == expected
+    assert from_limbs(to_limbs([genes])) == [genes]
+    assert decode(to_limbs([genes]))["hair_color"].tolist() == [[31, 1, 2, 3]]
+    with pytest.raises(ValueError):
+        encode_one(body=32)
+
+
+def test_trait_statistics():
+
+    # Arrange
+    decoded = decode(encode({"body": [1, 1, 1, 2]}))
+
+    # Act
+    counts = histograms(decoded)
+    scores = rarity(decoded, counts)
+
+    # Assert
+    assert counts["body"][:3].tolist() == [0, 3, 1]
+    assert counts["eyes"][0] == 4
+    assert scores.argmax() == 3
+    assert scores[3] == pytest.approx(2.0)
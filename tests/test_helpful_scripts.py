@@ -0,0 +1,31 @@
+from brownie import accounts
+from scripts import helpful_scripts, key_agent
+from scripts.helpful_scripts import get_accounts, load_account
+
+
+def test_load_account_decrypts_a_keystore_once(monkeypatch):
+
+    # Arrange
+    account = accounts.add()
+    decrypted = []
+    stored = {}
+
+    def load(name):
+        decrypted.append(name)
+        return account
+
+    monkeypatch.setattr(helpful_scripts, "_loaded_accounts", {})
+    monkeypatch.setattr(accounts, "load", load)
+    monkeypatch.setattr(key_agent, "fetch", lambda name: None)
+    monkeypatch.setattr(key_agent, "store", stored.__setitem__)
+
+    # Act
+    first = load_account("deployer")
+    again = load_account("deployer")
+    named = get_accounts(["deployer"])
+
+    # Assert
+    assert decrypted == ["deployer"]
+    assert first is again is named["deployer"]
+    # handed to the key agent once, for the next processes
+    assert stored == {"deployer": account.private_key}
@@ -0,0 +1,39 @@
+from brownie import accounts, exceptions
+from scripts.instrumentation import Instrumentation
+from scripts.tx_pipeline import TxPipeline
+import pytest
+
+
+def test_instrumentation_records_calls_transactions_and_reverts(open_voting):
+
+    # Arrange
+    voting = open_voting
+
+    # Act
+    with Instrumentation() as instrumentation:
+        transaction = voting.runAsCandidate("Michel", {"from": accounts[1]})
+        transaction.wait(1)
+        voting.candidateToProfile(accounts[1])
+        with pytest.raises(exceptions.VirtualMachineError):
+            transaction = voting.runAsCandidate("Michel", {"from": accounts[1]})
+            transaction.wait(1)
+        pipeline = TxPipeline()
+        pipeline.call(voting.runAsCandidate, "Robert", sender=accounts[2])
+        pipeline.run()
+
+    # Assert
+    summary = instrumentation.summary()
+    candidate = summary["Voting.runAsCandidate"]
+    assert candidate["transaction"][0] == 3
+    assert candidate["confirm"][0] >= 2
+    assert candidate["gas"] > 0
+    assert candidate["reverts"] == 1
+    assert summary["Voting.candidateToProfile"]["call"][0] == 1
+    metrics = instrumentation.prometheus()
+    assert (
+        'wsk_contract_seconds_count{contract="Voting",function="runAsCandidate",phase="transaction"} 3'
+        in metrics
+    )
+    assert 'wsk_rpc_requests_total{method="eth_call"}' in metrics
+    names = {event["name"] for event in instrumentation.chrome_trace()["traceEvents"]}
+    assert {"Voting.runAsCandidate", "Voting.candidateToProfile", "eth_call"} <= names
@@ -0,0 +1,35 @@
+from scripts import key_agent
+from types import SimpleNamespace
+import threading
+
+
+class Reaps:
+    # Stands for the stop event of the reaper: lets it run once, then stops it
+    def __init__(self):
+        self.rounds = 0
+
+    def wait(self, timeout):
+        self.rounds += 1
+        return self.rounds > 1
+
+
+def test_agent_key_expires_after_its_ttl(monkeypatch):
+
+    # Arrange
+    now = [1000.0]
+    monkeypatch.setattr(key_agent, "time", SimpleNamespace(time=lambda: now[0]))
+    keys, lock = {}, threading.Lock()
+    key_agent._answer(("put", "deployer", "0xkey"), keys, lock, 60)
+
+    # Act
+    now[0] = 1059.0
+    before = key_agent._answer(("get", "deployer"), keys, lock, 60)
+    now[0] = 1060.0
+    after = key_agent._answer(("get", "deployer"), keys, lock, 60)
+    key_agent._reap(keys, lock, Reaps())
+
+    # Assert
+    assert before == "0xkey"
+    assert after is None
+    # the reaper drops it from memory as well
+    assert keys == {}
@@ -0,0 +1,144 @@
+from brownie import Voting, accounts
+from scripts.leaderboard import (
+    MIN_FIGHTS,
+    Leaderboard,
+    Leaderboards,
+    SkipList,
+    simulate,
+)
+from scripts.voting_model import ZERO_ADDRESS
+import numpy as np
+
+FUNDING_AMOUNT = 10**17
+
+
+def test_skip_list_ranks_like_a_sorted_list():
+
+    # Arrange
+    rng = np.random.default_rng(0)
+    entries = SkipList(seed=0)
+    expected = []
+
+    # Act
+    for value in rng.integers(0, 10**6, 2000).tolist():
+        if value in expected:
+            continue
+        entries.insert(value)
+        expected.append(value)
+    for value in expected[::3]:
+        entries.remove(value)
+    expected = sorted(set(expected) - set(expected[::3]))
+
+    # Assert
+    assert list(entries) == expected
+    assert len(entries) == len(expected)
+    for index in rng.integers(0, len(expected), 200).tolist():
+        assert entries[index] == expected[index]
+        assert entries.rank(expected[index]) == index
+    assert entries.slice(10, 5) == expected[10:15]
+    assert entries.rank(-1) is None
+
+
+def test_leaderboards_follow_fights_and_transfers(tmp_path):
+
+    # Arrange
+    boards = Leaderboards()
+    owner_a, owner_b = f"0x{1:040x}", f"0x{2:040x}"
+    for fighter in range(3):
+        boards.on_birth(fighter)
+        boards.on_transfer(ZERO_ADDRESS, owner_a, fighter)
+
+    # Act
+    boards.on_transfer(owner_a, owner_b, 2)
+    for _ in range(MIN_FIGHTS):
+        boards.record_fight(1, 0)
+    boards.record_fight(2, 1)
+    path = str(tmp_path / "leaderboards.pickle")
+    boards.save(path)
+    restored = Leaderboards.load(path)
+
+    # Assert
+    for board in (boards, restored):
+        assert board["owners"].top(2) == [(owner_a, 2), (owner_b, 1)]
+        assert board["victories"].top(3) == [(1, MIN_FIGHTS), (2, 1), (0, 0)]
+        # fighter 2 had a single fight, below MIN_FIGHTS
+        assert board["win_ratio"].top(5) == [
+            (1, (MIN_FIGHTS / (MIN_FIGHTS + 1), MIN_FIGHTS)),
+            (0, (0.0, 0)),
+        ]
+        assert board["victories"].rank(0) == 2
+
+
+def test_victories_board_agrees_with_a_full_sort():
+
+    # Arrange
+    fighters = 2000
+
+    # Act
+    boards, roster, _ = simulate(fighters, 20000, 100, 1000, np.random.default_rng(0))
+
+    # Assert
+    best = np.lexsort((np.arange(fighters), -roster["victories"].astype(np.int64)))
+    assert [key for key, _ in boards["victories"].top(10)] == best[:10].tolist()
+
+
+def test_leaderboard_update_moves_an_entry():
+
+    # Arrange
+    board = Leaderboard("test", seed=0)
+    for key, score in (("a", 3), ("b", 2), ("c", 1)):
+        board.update(key, score)
+
+    # Act
+    board.update("c", 5)
+    board.remove("a")
+
+    # Assert
+    assert board.top(3) == [("c", 5), ("b", 2)]
+    assert board.rank("b") == 1
+    assert board.rank("a") is None
+
+
+def test_leaderboards_replay_the_election_incrementally(funded_voting, tmp_path):
+
+    # Arrange
+    voting = funded_voting
+    path = str(tmp_path / "leaderboards.pickle")
+    boards = Leaderboards()
+    boards.sync_voting(voting, confirmations=0)
+    boards.save(path)
+    transaction = voting.electCandidate({"from": accounts[0]})
+    transaction.wait(1)
+    transaction = voting.ElectedCandidateFundClaim({"from": accounts[1]})
+    transaction.wait(1)
+
+    # Act
+    restored = Leaderboards.load(path)
+    applied = restored.sync_voting(voting, confirmations=0)
+
+    # Assert
+    assert sorted(score for _, score in boards["votes"].top(3)) == [2, 2, 2]
+    assert boards["funds"].score(str(accounts[1])) == 2 * FUNDING_AMOUNT
+    # only the two new transactions are replayed after the restart
+    assert applied == 2
+    assert restored["funds"].score(str(accounts[1])) == 0
+    assert restored["funds"].rank(str(accounts[1])) == 2
+
+
+def test_voting_boards_follow_a_new_deployment(funded_voting):
+
+    # Arrange
+    boards = Leaderboards()
+    boards.sync_voting(funded_voting, confirmations=0)
+    voting = Voting.deploy({"from": accounts[0]})
+    transaction = voting.startVotingPeriod(1, {"from": accounts[0]})
+    transaction.wait(1)
+    transaction = voting.runAsCandidate("Michel", {"from": accounts[5]})
+    transaction.wait(1)
+
+    # Act
+    boards.sync_voting(voting, confirmations=0)
+
+    # Assert
+    assert boards["votes"].top(5) == [(str(accounts[5]), 0)]
+    assert boards["funds"].top(5) == [(str(accounts[5]), 0)]
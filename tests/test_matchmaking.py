@@ -0,0 +1,72 @@
+from scripts.fight_engine import random_roster
+from scripts.matchmaking import MatchQueue, simulate, stat_vectors
+import numpy as np
+
+
+def test_match_picks_the_nearest_fighter_of_the_level():
+
+    # Arrange
+    queue = MatchQueue()
+    vectors = np.array(
+        [[0.5, 0.5, 0.5, 0.5], [0.9, 0.9, 0.9, 0.9], [0.55, 0.5, 0.5, 0.5]]
+    )
+    for fighter, vector in enumerate(vectors):
+        queue.insert(fighter, 3, vector, now=0)
+    queue.insert(3, 4, vectors[0], now=0)
+
+    # Act
+    opponent = queue.match(0, now=0)
+
+    # Assert
+    assert opponent == 2
+    assert len(queue) == 2
+    # nobody else is close enough on a first look
+    assert queue.match_all(now=0) == []
+
+
+def test_window_widens_with_the_wait():
+
+    # Arrange
+    queue = MatchQueue(widen_every=5)
+    vector = np.full(4, 0.5)
+    queue.insert(1, 10, vector, now=0)
+    queue.insert(2, 12, vector, now=0)
+    queue.insert(3, 30, vector, now=0)
+
+    # Act
+    early = queue.match_all(now=5)
+    late = queue.match_all(now=10)
+
+    # Assert
+    assert early == []
+    assert late == [(1, 2)]
+    assert queue.waits == [10, 10]
+    assert queue.cancel(3)
+    assert not queue.cancel(3)
+    assert len(queue) == 0
+
+
+def test_stat_vectors_have_one_row_per_fighter():
+
+    # Arrange
+    roster = random_roster(4, np.random.default_rng(0))
+
+    # Act
+    vectors = stat_vectors(roster, [0, 1])
+
+    # Assert
+    assert vectors.shape == (2, 4)
+
+
+def test_simulation_matches_most_fighters():
+
+    # Act
+    report = simulate(fighters=2000, ticks=30, arrivals=100)
+
+    # Assert
+    match_rate = report["matches"] * 2 / report["inserts"]
+    assert match_rate > 0.7
+    assert report["matches"] * 2 + report["queued"] + report["cancels"] == (
+        report["inserts"]
+    )
+    assert report["wait_seconds"]["count"] == report["matches"] * 2
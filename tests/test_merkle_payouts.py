@@ -0,0 +1,71 @@
+from brownie import MerklePayout, accounts, exceptions
+from scripts.merkle_payouts import build, deploy_payout, replay
+from scripts.voting_model import compare_with_contract
+import pytest
+
+FUNDING_AMOUNT = 10**17
+
+
+def test_merkle_payouts_pay_the_election(funded_voting):
+
+    # Arrange
+    voting = funded_voting
+    transaction = voting.electCandidate({"from": accounts[0]})
+    transaction.wait(1)
+
+    # Act
+    model = replay(voting)
+    tree = build(model)
+    # accounts[0] stands in for a Voting contract that hands over its balance
+    payout = MerklePayout.deploy(tree.root, accounts[0], {"from": accounts[0]})
+    transaction = accounts[0].transfer(payout, tree.total)
+    transaction.wait(1)
+    claim = tree.claim(tree.index_of(accounts[6]))
+    balance_before = accounts[6].balance()
+    transaction = payout.claim(
+        claim["index"],
+        claim["account"],
+        claim["amount"],
+        claim["proof"],
+        {"from": accounts[0]},
+    )
+    transaction.wait(1)
+
+    # Assert
+    assert compare_with_contract(model, voting, accounts) == []
+    # accounts[1] is elected, the voters of accounts[2] and accounts[3] get refunds
+    assert len(tree) == 5
+    assert tree.claim(tree.index_of(accounts[1]))["amount"] == 2 * FUNDING_AMOUNT
+    assert payout.balance() == 5 * FUNDING_AMOUNT
+    assert accounts[6].balance() == balance_before + FUNDING_AMOUNT
+    assert payout.isClaimed(claim["index"])
+
+    # Test that an entry is only paid once
+    with pytest.raises(exceptions.VirtualMachineError):
+        transaction = payout.claim(
+            claim["index"],
+            claim["account"],
+            claim["amount"],
+            claim["proof"],
+            {"from": accounts[0]},
+        )
+        transaction.wait(1)
+
+
+def test_merkle_payout_is_the_only_claim_path(funded_voting):
+
+    # Arrange
+    voting = funded_voting
+    transaction = voting.electCandidate({"from": accounts[0]})
+    transaction.wait(1)
+    tree = build(replay(voting))
+    payout = MerklePayout.deploy(tree.root, voting, {"from": accounts[0]})
+
+    # Test that the payout is only funded by the Voting contract it replaces
+    with pytest.raises(exceptions.VirtualMachineError):
+        transaction = accounts[0].transfer(payout, tree.total)
+        transaction.wait(1)
+
+    # Test that no payout is deployed while Voting still pays per-address claims
+    with pytest.raises(ValueError):
+        deploy_payout(tree, voting, accounts[0])
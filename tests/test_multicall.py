@@ -0,0 +1,32 @@
+from brownie import Multicall, Voting, accounts
+from scripts.multicall import BatchReader, read_election
+
+
+def test_read_election():
+
+    # Arrange
+    owner = accounts[0]
+    voting = Voting.deploy({"from": owner})
+    reader = BatchReader(Multicall.deploy({"from": owner}), max_calls=3)
+    transaction = voting.startVotingPeriod(1, {"from": owner})
+    transaction.wait(1)
+    transaction = voting.runAsCandidate("Michel", {"from": accounts[1]})
+    transaction.wait(1)
+    for voter in accounts[2:6]:
+        transaction = voting.vote(accounts[1], {"from": voter})
+        transaction.wait(1)
+
+    # Act
+    columns = read_election(accounts[:6], voting=voting, reader=reader)
+
+    # Assert
+    for i, address in enumerate(accounts[:6]):
+        isCandidate, fundAmount, numberOfVotes, name = voting.candidateToProfile(
+            address
+        )
+        assert columns["isCandidate"][i] == isCandidate
+        assert columns["numberOfVotes"][i] == numberOfVotes
+        assert columns["name"][i] == name
+        assert columns["voterToCandidate"][i] == voting.voterToCandidate(address)
+    # 18 reads in chunks of at most 3 calls
+    assert reader.eth_calls == 6
@@ -0,0 +1,67 @@
+from brownie import accounts
+from scripts.presign import Presigner
+import pytest
+
+ACCOUNT_BALANCE = 10**17
+
+
+def test_presigned_calls_are_mined_in_nonce_order(candidates_voting):
+
+    # Arrange
+    voting = candidates_voting
+    voters = [accounts.add() for _ in range(4)]
+    for voter in voters:
+        transaction = accounts[0].transfer(voter, ACCOUNT_BALANCE)
+        transaction.wait(1)
+
+    # Act
+    with Presigner(workers=2) as presigner:
+        for i, voter in enumerate(voters):
+            presigner.call(voting.vote, accounts[1 + i % 3], sender=voter)
+            presigner.call(voting.fund, accounts[1 + i % 3], sender=voter, value=10**16)
+        report = presigner.run()
+
+    # Assert
+    assert report["accepted"] == 8
+    assert report["failed"] == 0
+    assert report["reverted"] == 0
+    assert voting.voterToCandidate(voters[3]) == accounts[1]
+    assert voting.voterToAmountFunded(voters[3]) == 10**16
+
+
+def test_presign_needs_a_private_key(candidates_voting):
+
+    # Arrange
+    voting = candidates_voting
+
+    # Test that the node's unlocked accounts cannot be presigned
+    with Presigner(workers=1) as presigner:
+        with pytest.raises(ValueError):
+            presigner.call(voting.vote, accounts[1], sender=accounts[4])
+
+
+def test_calls_after_a_refused_nonce_are_reported_failed(candidates_voting):
+
+    # Arrange
+    voting = candidates_voting
+    voter, other = accounts.add(), accounts.add()
+    for account in (voter, other):
+        transaction = accounts[0].transfer(account, ACCOUNT_BALANCE)
+        transaction.wait(1)
+
+    # Act
+    with Presigner(workers=1) as presigner:
+        # more than the balance, the node refuses the first nonce of voter
+        presigner.call(
+            voting.fund, accounts[1], sender=voter, value=2 * ACCOUNT_BALANCE
+        )
+        presigner.call(voting.vote, accounts[1], sender=voter)
+        presigner.call(voting.vote, accounts[2], sender=other)
+        report = presigner.run(timeout=60)
+
+    # Assert
+    assert report["accepted"] == 1
+    assert report["failed"] == 2
+    assert "queued behind a refused nonce" in report["errors"]
+    assert voting.voterToCandidate(other) == accounts[2]
+    assert voter.nonce == 0
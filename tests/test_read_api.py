@@ -0,0 +1,45 @@
+from brownie import accounts
+from scripts.read_api import TransactionIndexer, deploy_transactions, serve
+import json
+import urllib.error
+import urllib.request
+
+
+def test_read_api_pages_and_etag():
+
+    # Arrange
+    contract = deploy_transactions(accounts[0])
+    for i, receiver in enumerate(accounts[1:6]):
+        transaction = contract.addToBlockchain(
+            receiver,
+            10**15,
+            f"Payment {i}",
+            "odd" if i % 2 else "even",
+            {"from": accounts[0]},
+        )
+        transaction.wait(1)
+    indexer = TransactionIndexer(contract, ":memory:")
+
+    # Act
+    server = serve(indexer, port=0, poll_interval=60)
+    url = f"http://127.0.0.1:{server.server_port}/transactions?limit=2"
+    with urllib.request.urlopen(url) as response:
+        etag = response.headers["ETag"]
+        first = json.load(response)
+    with urllib.request.urlopen(f"{url}&before={first['next']}") as response:
+        second = json.load(response)
+    request = urllib.request.Request(url, headers={"If-None-Match": etag})
+    try:
+        urllib.request.urlopen(request)
+        status = 200
+    except urllib.error.HTTPError as error:
+        status = error.code
+    server.shutdown()
+
+    # Assert
+    assert [item["id"] for item in first["items"]] == [5, 4]
+    assert [item["id"] for item in second["items"]] == [3, 2]
+    assert first["items"][0]["addressTo"] == accounts[5]
+    assert first["items"][0]["amount"] == str(10**15)
+    assert status == 304
+    assert indexer.page(keyword="odd")["items"][0]["message"] == "Payment 3"
@@ -0,0 +1,62 @@
+from brownie import accounts, chain, web3
+from scripts.receipt_tracker import ReceiptTracker
+import asyncio
+
+
+def test_tracker_resolves_receipts_in_bulk():
+
+    # Arrange
+    tracker = ReceiptTracker(poll_interval=0.1)
+    balance = accounts[1].balance()
+
+    # Act
+    receipts = [
+        tracker.send(accounts[0], {"to": str(accounts[1]), "value": 1})
+        for _ in range(50)
+    ]
+
+    # Assert
+    assert all(receipt.wait(timeout=30).status == 1 for receipt in receipts)
+    assert accounts[1].balance() == balance + 50
+    # one shared loop, not one per transaction
+    assert tracker.requests < 50
+
+
+def test_tracker_async_and_already_mined():
+
+    # Arrange
+    transaction = accounts[0].transfer(accounts[1], 1)
+    txid = web3.eth.send_transaction(
+        {"from": str(accounts[0]), "to": str(accounts[1]), "value": 1}
+    )
+    tracker = ReceiptTracker(poll_interval=0.1)
+
+    # Act
+    mined = tracker.wait(transaction.txid, timeout=30)
+    (receipt,) = asyncio.run(tracker.gather_async([txid]))
+
+    # Assert
+    assert int(mined["blockNumber"], 16) == transaction.block_number
+    assert int(receipt["status"], 16) == 1
+
+
+def test_tracker_mines_reverting_local_sends_with_a_fixed_gas(deployed_voting):
+
+    # Arrange
+    voting = deployed_voting
+    sender = accounts.add()
+    transaction = accounts[0].transfer(sender, 10**17)
+    transaction.wait(1)
+    tracker = ReceiptTracker(poll_interval=0.1)
+    # Test that voting before the voting period reverts on chain, not in an
+    # estimate
+    tx = {"to": voting.address, "data": voting.vote.encode_input(accounts[1])}
+
+    # Act
+    receipt = tracker.send(sender, dict(tx, gas=200000)).wait(timeout=30)
+    chain.mine(2)
+    receipt.wait(required_confs=3, timeout=30)
+
+    # Assert
+    assert receipt.status == 0
+    assert web3.eth.block_number - receipt.block_number + 1 >= 3
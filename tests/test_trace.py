@@ -0,0 +1,70 @@
+from brownie import Voting, accounts, exceptions
+from scripts.trace import Recorder, Replay, phases
+import pytest
+
+FUNDING_AMOUNT = 10**17
+
+
+def test_phases_group_consecutive_calls():
+
+    # Arrange
+    calls = [
+        {"phase": None, "function": "constructor"},
+        {"phase": None, "function": "vote"},
+        {"phase": None, "function": "vote"},
+        {"phase": "claims", "function": "voterFundClaim"},
+        {"phase": "claims", "function": "ElectedCandidateFundClaim"},
+        {"phase": None, "function": "vote"},
+    ]
+
+    # Act
+    grouped = phases(calls)
+
+    # Assert
+    assert [(name, len(group)) for name, group in grouped] == [
+        ("constructor", 1),
+        ("vote", 2),
+        ("claims", 2),
+        ("vote", 1),
+    ]
+
+
+def test_recorded_election_replays_scaled_up():
+
+    # Arrange
+    owner, candidate, voter = accounts[0], accounts[1], accounts[2]
+    with Recorder() as recorder:
+        voting = Voting.deploy({"from": owner})
+        transaction = voting.startVotingPeriod(1, {"from": owner})
+        transaction.wait(1)
+        transaction = voting.runAsCandidate("Michel", {"from": candidate})
+        transaction.wait(1)
+        transaction = voting.vote(candidate, {"from": voter})
+        transaction.wait(1)
+        transaction = voting.fund(candidate, {"from": voter, "value": FUNDING_AMOUNT})
+        transaction.wait(1)
+        # Test that a revert is recorded as the expected outcome
+        with pytest.raises(exceptions.VirtualMachineError):
+            voting.vote(candidate, {"from": voter})
+    trace = recorder.trace()
+
+    # Act
+    report = Replay(trace, scale=2).run()
+
+    # Assert
+    assert trace["actors"] == 3
+    assert trace["calls"][3]["args"] == [{"actor": 1}]
+    assert trace["calls"][4]["value"] == FUNDING_AMOUNT
+    assert trace["calls"][-1]["status"] == 0
+    assert [phase["phase"] for phase in report["phases"]] == [
+        "constructor",
+        "startVotingPeriod",
+        "runAsCandidate",
+        "vote",
+        "fund",
+        "vote",
+    ]
+    assert report["transactions"] == 12
+    assert report["unsent"] == 0
+    assert sum(phase["mismatches"] for phase in report["phases"]) == 0
+    assert report["phases"][-1]["reverted"] == 2
@@ -0,0 +1,58 @@
+from brownie import accounts
+from scripts.tx_pipeline import PipelineError, TxPipeline
+import pytest
+
+
+def refused(tx):
+    # a send that fails before anything is broadcast
+    raise ValueError("refused by the node")
+
+
+def test_failed_step_blocks_its_dependents_only():
+
+    # Arrange
+    recipient = accounts[5]
+    balance = recipient.balance()
+    pipeline = TxPipeline()
+    first = pipeline.transfer(accounts[0], recipient, 1)
+    broken = pipeline.add(accounts[1], refused, name="broken")
+    dependent = pipeline.transfer(accounts[1], recipient, 1, after=[broken])
+    independent = pipeline.transfer(accounts[2], recipient, 1, after=[first])
+
+    # Act
+    # Test that the run reports the failed step and the step waiting on it
+    with pytest.raises(PipelineError) as error:
+        pipeline.run()
+
+    # Assert
+    failures = error.value.failures
+    assert set(failures) == {broken, dependent}
+    assert isinstance(failures[broken], ValueError)
+    assert failures[dependent] == "dependency failed"
+    assert pipeline.receipt(dependent) is None
+    assert pipeline.receipt(first).status == 1
+    assert pipeline.receipt(independent).status == 1
+    assert recipient.balance() == balance + 2
+
+
+def test_nonces_stay_gap_free_after_a_send_error():
+
+    # Arrange
+    sender = accounts[3]
+    nonce = sender.nonce
+    pipeline = TxPipeline()
+    first = pipeline.transfer(sender, accounts[5], 1)
+    pipeline.add(sender, refused, name="broken")
+    last = pipeline.transfer(sender, accounts[5], 1)
+
+    # Act
+    with pytest.raises(PipelineError):
+        pipeline.run()
+
+    # Assert
+    # the nonce of the refused send went to the next transaction
+    assert pipeline.receipt(first).nonce == nonce
+    assert pipeline.receipt(last).nonce == nonce + 1
+    assert pipeline.receipt(last).status == 1
+    assert sender.nonce == nonce + 2
+    assert pipeline.next_nonce(sender) == nonce + 2
@@ -1,12 +1,12 @@
-from brownie import Voting, accounts, exceptions, web3
+from brownie import accounts, exceptions, web3
 import pytest
 
 
-def teststartVotingPeriod():
+def teststartVotingPeriod(deployed_voting):
 
     # Arrange
     account = accounts[0]
-    voting = Voting.deploy({"from": account})
+    voting = deployed_voting
 
     # Test that only the owner can call this function
     with pytest.raises(exceptions.VirtualMachineError):
@@ -25,12 +25,12 @@ def teststartVotingPeriod():
         transaction.wait(1)
 
 
-def testrunAsCandidate():
+def testrunAsCandidate(deployed_voting):
 
     print("I'm starting testrunAsCandidate")
     # Arrange
     account = accounts[0]
-    voting = Voting.deploy({"from": account})
+    voting = deployed_voting
     candidate_name = "Michel"
 
     # Test that the voting period is open
@@ -57,11 +57,11 @@ def testrunAsCandidate():
         transaction.wait(1)
 
 
-def testvote():
+def testvote(deployed_voting):
 
     # Arrange
     account = accounts[0]
-    voting = Voting.deploy({"from": account})
+    voting = deployed_voting
 
     # Test that the voting period is open
     with pytest.raises(exceptions.VirtualMachineError):
@@ -97,14 +97,14 @@ def testvote():
         transaction.wait(1)
 
 
-def testfund():
+def testfund(deployed_voting):
 
     # Arrange
     voter = accounts[0]
     candidate = accounts[1]
     goodfunding_amount = web3.toWei("0.05", "ether")
     badfunding_amount = web3.toWei("0.001", "ether")
-    voting = Voting.deploy({"from": voter})
+    voting = deployed_voting
     minimum_number_of_votes = 5
 
     # Test that the voting period is open
@@ -180,14 +180,14 @@ def testfund():
     assert name == "Michel"
 
 
-def testdelegate():
+def testdelegate(deployed_voting):
 
     # Arrange
     delegater = accounts[0]
     delegatee = accounts[1]
     funding_amount = web3.toWei("0.7", "ether")
 
-    voting = Voting.deploy({"from": delegater})
+    voting = deployed_voting
 
     # Test that the voting period is open
     with pytest.raises(exceptions.VirtualMachineError):
@@ -275,7 +275,7 @@ def testdelegate():
     assert name == "Michel"
 
 
-def test_electCandidate():
+def test_electCandidate(deployed_voting):
 
     # Arrange
     owner = accounts[0]
@@ -283,7 +283,7 @@ def test_electCandidate():
     candidate2 = accounts[2]
     candidate3 = accounts[3]
 
-    voting = Voting.deploy({"from": owner})
+    voting = deployed_voting
 
     # Test that the voting period is open
     with pytest.raises(exceptions.VirtualMachineError):
@@ -330,7 +330,7 @@ def test_electCandidate():
         transaction.wait(1)
 
 
-def test_electCandidate_with_funding():
+def test_electCandidate_with_funding(candidates_voting):
 
     # Arrange
     owner = accounts[0]
@@ -339,24 +339,14 @@ def test_electCandidate_with_funding():
     candidate3 = accounts[3]
     funding_amount = web3.toWei("0.7", "ether")
 
-    # Deploy
-    voting = Voting.deploy({"from": owner})
+    # Voting period started, Michel, Robert and Dave running
+    voting = candidates_voting
 
-    # Start voting period
-    transaction = voting.startVotingPeriod(1, {"from": owner})
-    transaction.wait(1)
-
-    # Candidates running, voting and funding
-    transaction = voting.runAsCandidate("Michel", {"from": candidate})
-    transaction.wait(1)
+    # Voting and funding
     transaction = voting.vote(candidate, {"from": candidate})
     transaction.wait(1)
-    transaction = voting.runAsCandidate("Robert", {"from": candidate2})
-    transaction.wait(1)
     transaction = voting.vote(candidate2, {"from": owner})
     transaction.wait(1)
-    transaction = voting.runAsCandidate("Dave", {"from": candidate3})
-    transaction.wait(1)
     transaction = voting.vote(candidate3, {"from": candidate3})
     transaction.wait(1)
     transaction = voting.fund(candidate2, {"from": owner, "value": funding_amount})
@@ -368,28 +358,16 @@ def test_electCandidate_with_funding():
     assert voting.electedCandidate() == candidate2
 
 
-def test_electCandidate_with_history():
+def test_electCandidate_with_history(candidates_voting):
 
     # Arrange
     owner = accounts[0]
     candidate = accounts[1]
-    candidate2 = accounts[2]
-    candidate3 = accounts[3]
 
-    # Deploy
-    voting = Voting.deploy({"from": owner})
-
-    # Start voting period
-    transaction = voting.startVotingPeriod(1, {"from": owner})
-    transaction.wait(1)
+    # Voting period started, Michel, Robert and Dave running
+    voting = candidates_voting
 
-    # Candidates running, voting and funding
-    transaction = voting.runAsCandidate("Michel", {"from": candidate})
-    transaction.wait(1)
-    transaction = voting.runAsCandidate("Robert", {"from": candidate2})
-    transaction.wait(1)
-    transaction = voting.runAsCandidate("Dave", {"from": candidate3})
-    transaction.wait(1)
+    # Election
     transaction = voting.electCandidate({"from": owner})
     transaction.wait(1)
 
@@ -397,17 +375,13 @@ def test_electCandidate_with_history():
     assert voting.electedCandidate() == candidate
 
 
-def test_ElectedCandidateFundClaim():
+def test_ElectedCandidateFundClaim(candidates_voting):
 
     # Arrange
     owner = accounts[0]
     candidate = accounts[1]
     funding_amount = web3.toWei("0.7", "ether")
-    voting = Voting.deploy({"from": owner})
-    transaction = voting.startVotingPeriod(1, {"from": owner})
-    transaction.wait(1)
-    transaction = voting.runAsCandidate("Michel", {"from": candidate})
-    transaction.wait(1)
+    voting = candidates_voting
 
     # Test that the candidate has been elected
     with pytest.raises(exceptions.VirtualMachineError):
@@ -441,7 +415,7 @@ def test_ElectedCandidateFundClaim():
     assert balance_after == balance_before - funding_amount
 
 
-def test_voterFundClaim():
+def test_voterFundClaim(open_voting):
 
     # Arrange
     owner = accounts[0]
@@ -454,9 +428,7 @@ def test_voterFundClaim():
     funding_amount_1 = web3.toWei("0.7", "ether")
     funding_amount_2 = web3.toWei("0.3", "ether")
     funding_amount_3 = web3.toWei("0.2", "ether")
-    voting = Voting.deploy({"from": owner})
-    transaction = voting.startVotingPeriod(1, {"from": owner})
-    transaction.wait(1)
+    voting = open_voting
     transaction = voting.runAsCandidate("Michel", {"from": electedCandidate})
     transaction.wait(1)
     transaction = voting.runAsCandidate("Robert", {"from": nonElectedCandidate})
@@ -0,0 +1,67 @@
+from brownie import Multicall, accounts, chain
+from scripts.multicall import BatchReader
+from scripts.view_cache import ViewCache
+import pytest
+
+
+def test_view_cache_hits_until_next_block(voted_voting):
+
+    # Arrange
+    voting = ViewCache(voted_voting, head_interval=0)
+
+    # Act
+    profile = voting.candidateToProfile(accounts[1])
+    again = voting.candidateToProfile(accounts[1])
+    transaction = voting.vote(accounts[1], {"from": accounts[0]})
+    transaction.wait(1)
+
+    # Assert
+    assert again == profile
+    assert voting.stats()["hits"] == 1
+    # the vote is a transaction, not cached, and moved the head
+    assert voting.candidateToProfile(accounts[1])[2] == profile[2] + 1
+    assert voting.stats()["invalidations"] == 1
+
+
+def test_view_cache_prefetch_and_eviction(voted_voting):
+
+    # Arrange
+    reader = BatchReader(Multicall.deploy({"from": accounts[0]}))
+    voting = ViewCache(voted_voting, head_interval=60, reader=reader)
+    calls = [("voterToCandidate", (voter,)) for voter in accounts[4:10]]
+
+    # Act
+    voting.prefetch(calls)
+    candidates = [voting.voterToCandidate(voter) for voter in accounts[4:10]]
+
+    # Assert
+    assert candidates == [accounts[1 + i // 2] for i in range(6)]
+    assert voting.stats()["misses"] == 0
+    assert reader.eth_calls == 1
+
+    # Arrange
+    small = ViewCache(voted_voting, max_bytes=1, head_interval=60)
+
+    # Act
+    for voter in accounts[4:10]:
+        small.voterToCandidate(voter)
+
+    # Assert
+    assert small.stats()["entries"] == 1
+    assert small.stats()["evictions"] == 5
+
+
+def test_view_cache_prefetch_refuses_names_outside_the_abi(voted_voting):
+
+    # Arrange
+    reader = BatchReader(Multicall.deploy({"from": accounts[0]}))
+    voting = ViewCache(voted_voting, head_interval=60, reader=reader)
+
+    # Test that balance, transactions and typos are refused before any call
+    for name in ["balance", "vote", "candidateProfile"]:
+        with pytest.raises(ValueError):
+            voting.prefetch([("electedCandidate", ()), (name, (accounts[1],))])
+
+    # Assert
+    assert reader.eth_calls == 0
+    assert voting.stats()["entries"] == 0
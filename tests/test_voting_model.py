@@ -0,0 +1,119 @@
+from brownie import Voting, accounts, web3
+from scripts.voting_model import Revert, VotingModel, compare_with_contract
+import numpy as np
+import pytest
+
+
+def test_model_scalar_rules():
+
+    # Arrange
+    model = VotingModel("owner")
+    funding_amount = web3.toWei("0.7", "ether")
+
+    # Test that nothing can happen before the voting period is open
+    with pytest.raises(Revert):
+        model.run_as_candidate("michel", "Michel")
+
+    # Arrange
+    model.start_voting_period("owner", 1)
+    model.run_as_candidate("michel", "Michel")
+    model.run_as_candidate("robert", "Robert")
+
+    # Test that one voter cannot vote twice
+    model.vote("voter", "michel")
+    with pytest.raises(Revert):
+        model.vote("voter", "robert")
+
+    # Test that a voter can only fund the candidate he voted for
+    with pytest.raises(Revert):
+        model.fund("voter", "robert", funding_amount)
+    model.fund("voter", "michel", funding_amount)
+
+    # Test that delegating moves the votes but not the funds
+    model.vote("robert", "robert")
+    model.delegate("robert", "michel")
+    assert model.candidate_to_profile("michel") == (True, funding_amount, 2, "Michel")
+    assert model.candidate_to_profile("robert") == (False, 0, 0, "Robert")
+
+    # Assert
+    assert model.address_of(model.elect_candidate("owner")) == "michel"
+    with pytest.raises(Revert):
+        model.voter_fund_claim("voter")
+    assert model.elected_candidate_fund_claim("michel") == funding_amount
+    assert model.balance == 0
+
+
+def test_model_bulk_matches_scalar():
+
+    # Arrange
+    rng = np.random.default_rng(42)
+    bulk = VotingModel("owner")
+    scalar = VotingModel("owner")
+    for model in (bulk, scalar):
+        model.start_voting_period("owner", 2)
+        model.add_accounts(200)
+    candidates = np.arange(1, 11)
+    voters = rng.integers(1, 201, size=400)
+    choices = rng.integers(1, 16, size=400)
+    amounts = rng.integers(0, 3, size=400) * bulk.minimum_funding
+
+    # Act
+    bulk.run_as_candidates(candidates)
+    accepted_votes = bulk.vote_many(voters, choices)
+    accepted_funds = bulk.fund_many(voters, choices, amounts)
+    for candidate in candidates:
+        scalar.run_as_candidate(scalar.address_of(candidate), f"{candidate}")
+    for i, (voter, choice) in enumerate(zip(voters, choices)):
+        try:
+            scalar.vote(scalar.address_of(voter), scalar.address_of(choice))
+        except Revert:
+            assert not accepted_votes[i]
+        else:
+            assert accepted_votes[i]
+    for i, (voter, choice, amount) in enumerate(zip(voters, choices, amounts)):
+        try:
+            scalar.fund(
+                scalar.address_of(voter),
+                scalar.address_of(choice),
+                int(amount) * 10**9,
+            )
+        except Revert:
+            assert not accepted_funds[i]
+        else:
+            assert accepted_funds[i]
+
+    # Assert
+    assert (bulk.number_of_votes == scalar.number_of_votes).all()
+    assert (bulk.fund_amount == scalar.fund_amount).all()
+    assert (bulk.voter_to_amount_funded == scalar.voter_to_amount_funded).all()
+    assert bulk.balance == scalar.balance
+
+
+def test_model_matches_contract():
+
+    # Arrange
+    owner = accounts[0]
+    candidates = accounts[1:4]
+    voters = accounts[4:10]
+    funding_amount = web3.toWei("0.5", "ether")
+    voting = Voting.deploy({"from": owner})
+    model = VotingModel(owner)
+
+    calls = [("startVotingPeriod", owner, (1,), 0)]
+    calls += [("runAsCandidate", c, (n,), 0) for c, n in zip(candidates, "ABC")]
+    calls += [("vote", v, (candidates[i % 3],), 0) for i, v in enumerate(voters)]
+    calls += [
+        ("fund", v, (candidates[i % 3],), funding_amount) for i, v in enumerate(voters)
+    ]
+    calls += [("delegate", candidates[2], (candidates[0],), 0)]
+    calls += [("electCandidate", owner, (), 0)]
+    calls += [("voterFundClaim", v, (), 0) for v in voters[1:3]]
+
+    # Act
+    for function, sender, args, value in calls:
+        transaction = getattr(voting, function)(*args, {"from": sender, "value": value})
+        transaction.wait(1)
+        model.apply(function, sender, *args, value=value)
+
+    # Assert
+    assert compare_with_contract(model, voting, [owner] + candidates + voters) == []
@@ -0,0 +1,74 @@
+from brownie import ERC721Metadata, WSKCore, accounts
+from scripts.owner_tokens import tokens_of_owner
+from scripts.voting_model import ZERO_ADDRESS
+
+
+def test_transfer_moves_the_last_fighter_into_the_gap():
+
+    # Arrange
+    owner, buyer = accounts[0], accounts[1]
+    core = WSKCore.deploy({"from": owner})
+    transaction = core.createGen0Fighters(
+        [11, 12, 13, 14], [ZERO_ADDRESS] * 4, {"from": owner}
+    )
+    transaction.wait(1)
+    transaction = core.unpause({"from": owner})
+    transaction.wait(1)
+
+    # Act
+    transaction = core.transfer(buyer, 2, {"from": owner})
+    transaction.wait(1)
+
+    # Assert
+    assert transaction.events["Transfer"]["tokenId"] == 2
+    assert core.ownerOf(2) == buyer
+    assert core.balanceOf(owner) == 3
+    assert core.balanceOf(buyer) == 1
+    # fighter 4 took the place of fighter 2 in the list of the owner
+    assert core.tokensOfOwner["address"](owner) == [1, 4, 3]
+    assert core.tokensOfOwner["address"](buyer) == [2]
+
+
+def test_tokens_of_owner_pages():
+
+    # Arrange
+    owner = accounts[0]
+    core = WSKCore.deploy({"from": owner})
+    transaction = core.createGen0Fighters(
+        list(range(100, 105)), [ZERO_ADDRESS] * 5, {"from": owner}
+    )
+    transaction.wait(1)
+    page = core.tokensOfOwner["address,uint256,uint256"]
+
+    # Act
+    tokens = tokens_of_owner(core, owner, page_size=2)
+
+    # Assert
+    assert tokens == [1, 2, 3, 4, 5]
+    assert page(owner, 3, 10) == [4, 5]
+    assert page(owner, 5, 10) == []
+    assert page(accounts[1], 0, 10) == []
+
+
+def test_token_metadata_copies_partial_and_full_words():
+
+    # Arrange
+    owner = accounts[0]
+    core = WSKCore.deploy({"from": owner})
+    metadata = ERC721Metadata.deploy({"from": owner})
+    transaction = core.setMetadataAddress(metadata, {"from": owner})
+    transaction.wait(1)
+
+    # Act
+    # 15 bytes, one word and a half, four full words
+    short = core.tokenMetadata(1, "")
+    medium = core.tokenMetadata(2, "")
+    full = core.tokenMetadata(3, "")
+
+    # Assert
+    assert short == "Hello World! :D"
+    assert medium == "I would definitely choose a medium length string."
+    assert len(full) == 128
+    assert full.startswith("Lorem ipsum dolor sit amet, mi est accumsan")
+    assert full.endswith(" suscipit varius sapien aliquam.")
+    assert core.tokenMetadata(4, "") == ""